@@ -0,0 +1,225 @@
+"""Run the benchmark suite, store the results as JSON and compare against a baseline.
+
+Every benchmark runs in its own interpreter: server.app monkey-patches the
+standard library through eventlet on import, and the shared memory and Qt
+benchmarks create process wide state. A run is saved with --output and any
+saved run can be passed back as --baseline. Each measure() result is
+compared by its best time, the threaded and end-to-end benchmarks by the
+latency fields they report (median, p99, max, jitter, worst frame, ...);
+anything more than --threshold slower than the baseline counts as a
+regression and makes the exit status 1. Shared or
+laptop machines vary by tens of percent between runs, --rounds repeats the
+suite and keeps each benchmark's best time.
+
+Run with:
+	python -m benchmarks --output baseline.json
+	python -m benchmarks --baseline baseline.json --output latest.json --rounds 3
+	python -m benchmarks bench_map_coords bench_server_update
+"""
+from typing import Dict, Any, List, Optional
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from .harness import format_time
+
+# Microbenchmarks of the hot paths, each finishes in a few seconds
+SUITE = [
+	'bench_shared_memory',
+	'bench_state_record',
+	'bench_command_ring',
+	'bench_player_slots',
+	'bench_nearby_players',
+	'bench_server_update',
+	'bench_map_coords',
+	'bench_map_batch',
+	'bench_game_liveness'
+]
+# Threaded and end-to-end runs, noisier and slower, added with --all
+EXTENDED = [
+	'bench_command_channel',
+	'bench_notify_latency',
+	'bench_simulator_pipeline',
+	'bench_sync_worker',
+	'bench_native_map',
+	'bench_player_list',
+	'stress_seqlock'
+]
+
+# Scalar results named like these (or ending in _<name>) are seconds, lower is better
+LATENCY_FIELDS = ('median', 'mean', 'p50', 'p90', 'p99', 'max', 'jitter', 'gap', 'lateness', 'frame', 'per_second')
+
+CHILD_TIMEOUT = 600
+
+
+def run_child(name: str, path: str):
+	"""Child process: run one benchmark module and write its results to path"""
+	module = importlib.import_module(f"benchmarks.{name}")
+	results = module.run()
+	with open(path, 'w') as output:
+		json.dump(results, output, default=float)
+
+
+def run_module(name: str) -> Dict[str, Any]:
+	fd, path = tempfile.mkstemp(prefix=f"sansync-{name}-", suffix='.json')
+	os.close(fd)
+	env = dict(os.environ)
+	env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+	started = time.perf_counter()
+	try:
+		process = subprocess.run([sys.executable, '-m', 'benchmarks', '--child', name, path],
+								 env=env, capture_output=True, text=True, timeout=CHILD_TIMEOUT)
+		if process.returncode != 0:
+			error = process.stderr.strip().splitlines()
+			return {'error': error[-1] if error else f"exit status {process.returncode}"}
+		with open(path) as result:
+			return {'results': json.load(result), 'seconds': time.perf_counter() - started}
+	except subprocess.TimeoutExpired:
+		return {'error': f"timed out after {CHILD_TIMEOUT} s"}
+	finally:
+		os.remove(path)
+
+
+def git_commit() -> Optional[str]:
+	try:
+		return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+							  text=True, timeout=10).stdout.strip() or None
+	except (OSError, subprocess.SubprocessError):
+		return None
+
+
+def metadata() -> Dict[str, Any]:
+	return {
+		'time': datetime.datetime.now().isoformat(timespec='seconds'),
+		'commit': git_commit(),
+		'python': platform.python_version(),
+		'platform': platform.platform(),
+		'machine': platform.machine(),
+		'cpus': os.cpu_count()
+	}
+
+
+def is_latency(key: str) -> bool:
+	return any(key == field or key.endswith(f"_{field}") for field in LATENCY_FIELDS)
+
+
+def timings(results: Any, prefix: str = '') -> Dict[str, float]:
+	"""Flatten nested results to {'module/key/...': seconds}.
+
+	Takes the best time of every measure() result and every scalar latency
+	field, counts and rates are kept in the raw results only.
+	"""
+	if not isinstance(results, dict):
+		return {}
+	if 'best' in results and 'number' in results:
+		return {prefix: results['best']}
+	flat = {}
+	for key, value in results.items():
+		name = f"{prefix}/{key}" if prefix else str(key)
+		if isinstance(value, dict):
+			flat.update(timings(value, name))
+		elif isinstance(value, (int, float)) and not isinstance(value, bool) and is_latency(str(key)):
+			flat[name] = float(value)
+	return flat
+
+
+def unregistered() -> List[str]:
+	"""Benchmark modules in this package that neither suite runs"""
+	directory = os.path.dirname(os.path.abspath(__file__))
+	names = [name[:-3] for name in os.listdir(directory)
+			 if name.endswith('.py') and name.startswith(('bench_', 'stress_'))]
+	return sorted(set(names) - set(SUITE) - set(EXTENDED))
+
+
+def compare(current: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+	"""Print the change of every metric against the baseline, returns the regressed ones"""
+	regressions = []
+	width = max((len(name) for name in current), default=10)
+	print(f"\n{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>8}")
+	for name, seconds in current.items():
+		before = baseline.get(name)
+		if not before:
+			print(f"{name:<{width}}  {'-':>10}  {format_time(seconds):>10}  {'new':>8}")
+			continue
+		change = seconds / before - 1
+		flag = ''
+		if change > threshold:
+			regressions.append(name)
+			flag = '  slower'
+		elif change < -threshold:
+			flag = '  faster'
+		print(f"{name:<{width}}  {format_time(before):>10}  {format_time(seconds):>10}  {change:>+8.1%}{flag}")
+	missing = sorted(set(baseline) - set(current))
+	if missing:
+		print(f"{len(missing)} baseline benchmarks not run this time")
+	return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(prog='python -m benchmarks', description="SanSync benchmark suite")
+	parser.add_argument('modules', nargs='*', help="benchmark modules to run, the default suite if omitted")
+	parser.add_argument('--all', action='store_true', help="also run the extended end-to-end benchmarks")
+	parser.add_argument('--output', help="write the results to this JSON file")
+	parser.add_argument('--baseline', help="compare against the results in this JSON file")
+	parser.add_argument('--rounds', type=int, default=1, help="run each benchmark this many times, keep the best")
+	parser.add_argument('--threshold', type=float, default=0.10,
+						help="relative slowdown that counts as a regression (default 0.10)")
+	parser.add_argument('--child', nargs=2, metavar=('MODULE', 'PATH'), help=argparse.SUPPRESS)
+	args = parser.parse_args(argv)
+
+	if args.child:
+		run_child(*args.child)
+		return 0
+
+	names = args.modules or SUITE + (EXTENDED if args.all else [])
+	missing = unregistered()
+	if missing:
+		print(f"Not in any suite: {', '.join(missing)}")
+	run = {'meta': metadata(), 'rounds': args.rounds, 'benchmarks': {}, 'timings': {}}
+	failed = []
+	for name in names:
+		print(f"{name} ...", end=' ', flush=True)
+		seconds = 0.0
+		for _ in range(max(1, args.rounds)):
+			outcome = run_module(name)
+			if 'error' in outcome:
+				break
+			seconds += outcome['seconds']
+			# Raw results of the first round, the best time of every round
+			run['benchmarks'].setdefault(name, outcome['results'])
+			for metric, best in timings(outcome['results'], name).items():
+				run['timings'][metric] = min(best, run['timings'].get(metric, best))
+		if 'error' in outcome:
+			failed.append(name)
+			run['benchmarks'].pop(name, None)
+			run['timings'] = {metric: best for metric, best in run['timings'].items()
+							  if not metric.startswith(f"{name}/")}
+			print(f"failed: {outcome['error']}")
+			continue
+		count = sum(1 for metric in run['timings'] if metric.startswith(f"{name}/"))
+		print(f"{count} timings in {seconds:.1f} s")
+
+	if args.output:
+		with open(args.output, 'w') as output:
+			json.dump(run, output, indent=1)
+		print(f"Results written to {args.output}")
+
+	regressions = []
+	if args.baseline:
+		with open(args.baseline) as baseline:
+			saved = json.load(baseline)
+		print(f"Baseline: {saved['meta'].get('time')} at {saved['meta'].get('commit') or 'unknown commit'}")
+		regressions = compare(run['timings'], saved['timings'], args.threshold)
+		if regressions:
+			print(f"{len(regressions)} regressions over {args.threshold:.0%}")
+	return 1 if failed or regressions else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
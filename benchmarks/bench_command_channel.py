@@ -0,0 +1,67 @@
+"""Round trip latency of console requests through the command/response rings.
+
+Runs client.game_simulator on a background thread and a GTAInterface in
+simulator mode. Measures one request at a time, then a burst of requests
+submitted together that the simulator answers within one frame drain.
+
+Run with: python -m benchmarks.bench_command_channel
+"""
+import os
+import statistics
+import time
+from client.game_simulator import GameSimulator
+from client.game_interface import GTAInterface
+from .harness import format_time
+
+FPS = 60
+SEQUENTIAL = 200
+BURST = 64
+BURSTS = 20
+
+
+def run():
+	os.environ.setdefault('SHARED_MEMORY_NAME', f"SanSyncChannel{os.getpid()}")
+	simulator = GameSimulator(fps=FPS)
+	simulator.start()
+	interface = GTAInterface(simulator=True)
+	try:
+		assert interface.initialize()
+
+		sequential = []
+		for _ in range(SEQUENTIAL):
+			start = time.perf_counter()
+			interface.execute_console_command('heal').result(timeout=1)
+			sequential.append(time.perf_counter() - start)
+
+		bursts = []
+		for _ in range(BURSTS):
+			start = time.perf_counter()
+			futures = [interface.execute_console_command(f"tp {i} {i} 30") for i in range(BURST)]
+			for future in futures:
+				future.result(timeout=1)
+			bursts.append(time.perf_counter() - start)
+
+		stats = interface.command_channel.get_stats()
+	finally:
+		interface.close()
+		simulator.close()
+
+	sequential.sort()
+	return {
+		'round_trip_median': statistics.median(sequential),
+		'round_trip_p99': sequential[int(len(sequential) * 0.99) - 1],
+		'burst_median': statistics.median(bursts),
+		'channel': stats
+	}
+
+
+def main():
+	results = run()
+	print(f"single request round trip: median {format_time(results['round_trip_median'])}, "
+		  f"p99 {format_time(results['round_trip_p99'])}")
+	print(f"{BURST} requests in flight: all answered in {format_time(results['burst_median'])} (median of {BURSTS})")
+	print(f"channel {results['channel']}")
+
+
+if __name__ == '__main__':
+	main()
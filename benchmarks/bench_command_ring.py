@@ -0,0 +1,93 @@
+"""Command channel: SPSC ring against the original single command slot.
+
+Run with: python -m benchmarks.bench_command_ring
+"""
+import json
+import mmap
+from client.command_ring import CommandRing, ring_region_size, POLICY_DROP
+from .harness import measure, format_time
+
+CAPACITY = 65536
+BURST = 16  # Commands issued between two consumer polls
+
+
+class SingleSlot:
+	"""The pre-ring channel: one JSON slot terminated by '|', overwritten by each write"""
+
+	def __init__(self, buffer, size: int = 4096):
+		self.buffer = buffer
+		self.size = size
+
+	def write(self, payload: bytes) -> bool:
+		data = payload + b'|'
+		self.buffer[0:self.size] = data.ljust(self.size, b'\0')
+		return True
+
+	def read(self):
+		data = bytes(self.buffer[0:self.size]).rstrip(b'\0')
+		end = data.find(b'|')
+		if end <= 0:
+			return None
+		self.buffer[0:self.size] = bytes(self.size)
+		return data[:end]
+
+
+def make_payload(i: int) -> bytes:
+	return json.dumps({'type': 'console', 'command': f"tp {i} {i} 30", 'seq': i}).encode()
+
+
+def delivered(channel, polls: int = 200) -> int:
+	"""Issue BURST commands per poll and count how many the consumer sees"""
+	received = 0
+	seq = 0
+	for _ in range(polls):
+		for _ in range(BURST):
+			channel.write(make_payload(seq))
+			seq += 1
+		while channel.read() is not None:
+			received += 1
+	return received
+
+
+def run():
+	memory = mmap.mmap(-1, ring_region_size(CAPACITY))
+	ring = CommandRing(memory, 0, CAPACITY, POLICY_DROP)
+	ring.initialize()
+	slot_memory = mmap.mmap(-1, 4096)
+	slot = SingleSlot(slot_memory)
+
+	payload = make_payload(0)
+
+	def ring_round_trip():
+		ring.write(payload)
+		ring.read()
+
+	def slot_round_trip():
+		slot.write(payload)
+		slot.read()
+
+	results = {
+		'ring_round_trip': measure(ring_round_trip, number=20000),
+		'slot_round_trip': measure(slot_round_trip, number=20000),
+		'ring_delivered': delivered(ring),
+		'slot_delivered': delivered(slot),
+		'issued': 200 * BURST,
+		'ring_stats': ring.get_stats()
+	}
+	ring.release()
+	memory.close()
+	slot_memory.close()
+	return results
+
+
+def main():
+	results = run()
+	print(f"write+read      ring {format_time(results['ring_round_trip']['best'])}, "
+		  f"single slot {format_time(results['slot_round_trip']['best'])}")
+	print(f"bursts of {BURST}    ring delivered {results['ring_delivered']}/{results['issued']}, "
+		  f"single slot delivered {results['slot_delivered']}/{results['issued']}")
+	print(f"ring stats      {results['ring_stats']}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,46 @@
+"""Game liveness check: full process scan against the cached pid and heartbeat.
+
+Run with: python -m benchmarks.bench_game_liveness
+"""
+import os
+import psutil
+from client.game_watcher import GameWatcher
+from .harness import measure, format_time
+
+
+def full_scan(process_name: str) -> bool:
+	"""The pre-watcher is_game_running implementation"""
+	for proc in psutil.process_iter(['name', 'status']):
+		if proc.info['name'] == process_name and proc.info['status'] == psutil.STATUS_RUNNING:
+			return True
+	return False
+
+
+def run():
+	# Watch this process, so the cached path has a live pid to check
+	process_name = psutil.Process(os.getpid()).name()
+	watcher = GameWatcher(process_name=process_name)
+	watcher.attach(os.getpid())
+	heartbeat = iter(range(1 << 30))
+
+	def cached_check():
+		watcher.observe_heartbeat(next(heartbeat))
+		return watcher.status()
+
+	return {
+		'processes': len(psutil.pids()),
+		'full_scan': measure(lambda: full_scan(process_name), number=20, repeat=3),
+		'cached_pid_and_heartbeat': measure(cached_check, number=2000)
+	}
+
+
+def main():
+	results = run()
+	scan = results['full_scan']['best']
+	cached = results['cached_pid_and_heartbeat']['best']
+	print(f"{results['processes']} processes: full scan {format_time(scan)}, "
+		  f"cached pid + heartbeat {format_time(cached)} ({scan / cached:.0f}x)")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,99 @@
+"""Map marker traffic: one runJavaScript per update against frame-coalesced batches.
+
+Replays 30 remote players updating at 10 Hz, a third of them standing
+still with sub-pixel jitter, through MarkerBatch flushed at MAP_MAX_FPS.
+Counts the JavaScript evaluations each approach sends to the page.
+
+Run with: python -m benchmarks.bench_map_batch
+"""
+import random
+from client.game_sync import EntityStore
+from client.gui.map_batch import MarkerBatch, batch_script
+from .harness import measure, format_time
+
+PLAYERS = 30
+UPDATE_HZ = 10
+MAX_FPS = 30
+DURATION = 10.0
+VIEW = (800, 600)
+BOUNDS = (-4000, 4000, -4000, 4000)
+
+
+def replay(seed: int = 1):
+	rng = random.Random(seed)
+	store = EntityStore()
+	batch = MarkerBatch()
+	positions = {f"player{i}": [rng.uniform(-3000, 3000), rng.uniform(-3000, 3000)] for i in range(PLAYERS)}
+	moving = {player_id for i, player_id in enumerate(positions) if i % 3}
+
+	# Update arrival times, each player at UPDATE_HZ with a random phase
+	events = []
+	for player_id in positions:
+		phase = rng.uniform(0, 1.0 / UPDATE_HZ)
+		events.extend((phase + n / UPDATE_HZ, player_id) for n in range(int(DURATION * UPDATE_HZ)))
+	events.sort()
+
+	per_update_calls = 0
+	batched_calls = 0
+	payload = 0
+	frame = 1.0 / MAX_FPS
+	next_flush = frame
+	for when, player_id in events:
+		while when >= next_flush:
+			update = batch.take(store, BOUNDS, *VIEW)
+			if update is not None:
+				batched_calls += 1
+				payload += len(batch_script(update))
+			next_flush += frame
+		position = positions[player_id]
+		if player_id in moving:
+			position[0] += 2.0  # 20 m/s at 10 Hz
+		else:
+			position[0] += rng.uniform(-0.5, 0.5)  # Well under a pixel at 10 m/px
+		store.upsert(player_id, (position[0], position[1], 30.0))
+		batch.mark(player_id)
+		per_update_calls += 1
+
+	return {
+		'per_update_calls': per_update_calls,
+		'batched_calls': batched_calls,
+		'skipped': batch.skipped,
+		'payload_per_call': payload / max(batched_calls, 1)
+	}
+
+
+def flush_cost():
+	store = EntityStore()
+	batch = MarkerBatch()
+	ids = [f"player{i}" for i in range(PLAYERS)]
+	step = [0.0]
+
+	def flush_all():
+		step[0] += 20.0
+		for i, player_id in enumerate(ids):
+			store.upsert(player_id, (step[0] % 3000 + i, i * 10.0, 30.0))
+			batch.mark(player_id)
+		batch_script(batch.take(store, BOUNDS, *VIEW))
+
+	return measure(flush_all, number=200)
+
+
+def run():
+	return {'replay': replay(), 'flush': flush_cost()}
+
+
+def main():
+	results = run()
+	cost = results['flush']
+	results = results['replay']
+	seconds = DURATION
+	print(f"{PLAYERS} players at {UPDATE_HZ} Hz for {seconds:g} s, flushed at up to {MAX_FPS} fps")
+	print(f"  per-update runJavaScript: {results['per_update_calls']} calls ({results['per_update_calls'] / seconds:.0f}/s)")
+	print(f"  batched applyMarkerBatch:  {results['batched_calls']} calls ({results['batched_calls'] / seconds:.0f}/s), "
+		  f"{results['payload_per_call']:.0f} bytes each")
+	print(f"  sub-pixel moves skipped:  {results['skipped']}")
+	print(f"  build a {PLAYERS}-marker batch: {format_time(cost['median'])} (including store updates)")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,79 @@
+"""Map coordinate conversion: per-marker Python against EntityStore.map_coordinates.
+
+Projects N players from GTA world coordinates onto the 0-100 map space the
+map widgets draw in, once with the scalar formula per player and once with
+the vectorized store projection, for all rows and for a dirty subset by id.
+The last column is a full MarkerBatch.take, the conversion as MapWidget
+runs it, including the sub-pixel filter.
+
+Run with: python -m benchmarks.bench_map_coords
+"""
+import random
+from client.game_sync import EntityStore
+from client.gui.map_batch import MarkerBatch
+from .harness import measure, format_time
+
+BOUNDS = (-4000, 4000, -4000, 4000)  # MapWidget.MAP_BOUNDS
+VIEW = (800, 600)
+DIRTY_FRACTION = 0.25
+
+
+def scalar_coordinates(positions, bounds):
+	min_x, max_x, min_y, max_y = bounds
+	return [((x - min_x) / (max_x - min_x) * 100, (1 - (y - min_y) / (max_y - min_y)) * 100)
+			for x, y in positions]
+
+
+def build_store(count: int, seed: int = 1):
+	rng = random.Random(seed)
+	store = EntityStore()
+	for i in range(count):
+		store.upsert(f"player{i}", (rng.uniform(-3000, 3000), rng.uniform(-3000, 3000), 30.0))
+	return store
+
+
+def run():
+	results = {}
+	for count in (10, 100, 1000):
+		store = build_store(count)
+		ids = list(store.ids)
+		dirty = ids[:max(1, int(count * DIRTY_FRACTION))]
+		positions = [tuple(store.position[store.rows[entity_id], :2]) for entity_id in ids]
+		expected = scalar_coordinates(positions, BOUNDS)
+		assert abs(store.map_coordinates(BOUNDS)[-1, 1] - expected[-1][1]) < 1e-6
+
+		batch = MarkerBatch()
+		step = [0.0]
+
+		def take_dirty():
+			# Moved far enough to pass the sub-pixel filter every time
+			step[0] = 50.0 - step[0]
+			for entity_id in dirty:
+				row = store.rows[entity_id]
+				store.position[row, 0] += step[0]
+				batch.mark(entity_id)
+			batch.take(store, BOUNDS, *VIEW)
+
+		number = max(100, 20000 // count)
+		results[count] = {
+			'scalar': measure(lambda: scalar_coordinates(positions, BOUNDS), number=number),
+			'vectorized': measure(lambda: store.map_coordinates(BOUNDS), number=number),
+			'vectorized_dirty': measure(lambda: store.map_coordinates(BOUNDS, dirty), number=number),
+			'batch_take_dirty': measure(take_dirty, number=number)
+		}
+	return results
+
+
+def main():
+	results = run()
+	print(f"{'players':>8}  {'scalar':>10}  {'vectorized':>10}  {'dirty ids':>10}  {'batch take':>10}  {'speedup':>8}")
+	for count, result in results.items():
+		scalar = result['scalar']['best']
+		vectorized = result['vectorized']['best']
+		print(f"{count:>8}  {format_time(scalar):>10}  {format_time(vectorized):>10}  "
+			  f"{format_time(result['vectorized_dirty']['best']):>10}  "
+			  f"{format_time(result['batch_take_dirty']['best']):>10}  {scalar / vectorized:>7.1f}x")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,89 @@
+"""Frame time of the native map backend with 1,000 moving markers.
+
+Renders NativeMapWidget offscreen: every frame moves all markers in the
+entity store, flushes them into the marker index and paints the view into
+an image. Measured fitted (whole map, clustered) and zoomed in (culled).
+
+Run with: QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_native_map
+"""
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QImage, QPainter
+from client.game_sync import EntityStore
+from client.gui.native_map_widget import NativeMapWidget
+from .harness import format_time
+
+MARKERS = 1000
+FRAMES = 120
+VIEW_SIZE = (1200, 800)
+
+
+def render_frames(widget: NativeMapWidget, store: EntityStore, velocities, frames: int):
+	image = QImage(widget.view.viewport().size(), QImage.Format.Format_ARGB32_Premultiplied)
+	ids = store.ids[:]
+	timings = []
+	for _ in range(frames):
+		start = time.perf_counter()
+		store.position[:len(ids)] += velocities
+		store.version += 1
+		for player_id in ids:
+			widget.update_player_position(player_id)
+		widget.flush()
+		painter = QPainter(image)
+		widget.view.render(painter)
+		painter.end()
+		timings.append(time.perf_counter() - start)
+	return timings
+
+
+def run(seed: int = 1):
+	app = QApplication.instance() or QApplication([])
+	rng = random.Random(seed)
+	store = EntityStore()
+	widget = NativeMapWidget(store)
+	widget.resize(*VIEW_SIZE)
+	widget.show()
+	app.processEvents()
+
+	# A third of the players in the city, the rest spread over the map
+	for i in range(MARKERS):
+		if i % 3 == 0:
+			position = (200.0 + rng.uniform(-400, 400), -800.0 + rng.uniform(-400, 400), 30.0)
+		else:
+			position = (rng.uniform(-3500, 3500), rng.uniform(-3500, 3500), 30.0)
+		store.upsert(f"player{i}", position)
+		widget.add_player_marker(f"player{i}")
+	velocities = [[rng.uniform(-20, 20), rng.uniform(-20, 20), 0.0] for _ in range(MARKERS)]
+	widget.flush()
+
+	results = {}
+	fitted = render_frames(widget, store, velocities, FRAMES)
+	results['fitted'] = {'frame_median': statistics.median(fitted), 'painted': widget.layer.painted}
+
+	widget.view.fitted = True
+	widget.view.scale(6, 6)
+	widget.view.centerOn(widget.map_rect.center())
+	zoomed = render_frames(widget, store, velocities, FRAMES)
+	results['zoomed'] = {'frame_median': statistics.median(zoomed), 'painted': widget.layer.painted}
+
+	widget.close()
+	return results
+
+
+def main():
+	results = run()
+	print(f"{MARKERS} moving markers, {VIEW_SIZE[0]}x{VIEW_SIZE[1]} view, median of {FRAMES} frames")
+	for name, result in results.items():
+		frame_time = result['frame_median']
+		print(f"  {name:7} frame {format_time(frame_time)} ({1 / frame_time:.0f} fps), "
+			  f"{result['painted']} markers/clusters painted")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,72 @@
+"""Proximity queries: SpatialGrid against the original linear scan.
+
+Run with: python -m benchmarks.bench_nearby_players
+"""
+import random
+from client.game_sync import GameSyncManager, WORLD_MIN_X, WORLD_MAX_X, WORLD_MIN_Y, WORLD_MAX_Y
+from .harness import measure, format_time
+
+RADIUS = 100.0
+
+
+def linear_scan(manager: GameSyncManager, radius: float):
+	"""The pre-index get_nearby_players implementation"""
+	game_state = manager.game_state
+	local_pos = game_state.get_player_position(manager.local_player_id)
+	nearby = {}
+	for pid, state in game_state.player_states.items():
+		if pid == manager.local_player_id:
+			continue
+		pos = game_state.get_player_position(pid)
+		dist = ((pos[0] - local_pos[0])**2 +
+				(pos[1] - local_pos[1])**2 +
+				(pos[2] - local_pos[2])**2)**0.5
+		if dist <= radius:
+			nearby[pid] = state
+	return nearby
+
+
+def build_manager(count: int, seed: int = 1) -> GameSyncManager:
+	"""Local player in the city plus count entities, a third of them clustered around it"""
+	rng = random.Random(seed)
+	manager = GameSyncManager()
+	manager.set_local_player('local')
+	manager.update_local_state((200.0, -800.0, 30.0), 100)
+	for i in range(count):
+		if i % 3 == 0:
+			x, y = 200.0 + rng.uniform(-300, 300), -800.0 + rng.uniform(-300, 300)
+		else:
+			x, y = rng.uniform(WORLD_MIN_X, WORLD_MAX_X), rng.uniform(WORLD_MIN_Y, WORLD_MAX_Y)
+		manager.game_state.update_player_state(f"player{i}", {
+			'position': {'x': x, 'y': y, 'z': rng.uniform(0, 100)},
+			'health': 100
+		})
+	return manager
+
+
+def run():
+	results = {}
+	for count in (10, 100, 1000):
+		manager = build_manager(count)
+		assert set(linear_scan(manager, RADIUS)) == set(manager.get_nearby_players(RADIUS))
+		number = max(100, 20000 // count)
+		results[count] = {
+			'linear_scan': measure(lambda: linear_scan(manager, RADIUS), number=number),
+			'grid_radius': measure(lambda: manager.get_nearby_players(RADIUS), number=number),
+			'grid_nearest_5': measure(lambda: manager.get_nearest_players(5), number=number)
+		}
+	return results
+
+
+def main():
+	results = run()
+	print(f"{'entities':>8}  {'linear scan':>12}  {'grid radius':>12}  {'grid 5-NN':>12}  {'speedup':>8}")
+	for count, result in results.items():
+		linear = result['linear_scan']['best']
+		grid = result['grid_radius']['best']
+		print(f"{count:>8}  {format_time(linear):>12}  {format_time(grid):>12}  "
+			  f"{format_time(result['grid_nearest_5']['best']):>12}  {linear / grid:>7.1f}x")
+
+
+if __name__ == '__main__':
+	main()
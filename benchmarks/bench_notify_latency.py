@@ -0,0 +1,110 @@
+"""Command-to-consume latency: kernel wake-ups against the fixed 50 ms poll.
+
+A forked consumer process drains a CommandRing in an anonymous shared
+mapping, the way ProcessCommands does, while this process writes commands
+stamped with time.perf_counter() at random intervals. Linux only.
+
+Run with: python -m benchmarks.bench_notify_latency
+"""
+import mmap
+import multiprocessing
+import random
+import statistics
+import struct
+import sys
+import time
+from client.command_ring import CommandRing, ring_region_size
+from client.shm_notify import Notifier, FutexNotifier
+from .harness import format_time
+
+CAPACITY = 65536
+COMMANDS = 100
+IDLE_SECONDS = 1.0
+
+
+def consumer(memory, mode: str, connection):
+	ring = CommandRing(memory, 0)
+	notifier = FutexNotifier(memory, ring.head_offset) if mode == 'notify' else Notifier(memory, ring.head_offset)
+	latencies = []
+	while len(latencies) < COMMANDS:
+		if mode == 'notify':
+			notifier.wait(ring.tail, timeout=0.05)
+		else:
+			time.sleep(0.05 if mode == 'poll_50ms' else 0.001)
+		while True:
+			payload = ring.read()
+			if payload is None:
+				break
+			latencies.append(time.perf_counter() - struct.unpack('<d', payload)[0])
+
+	# Idle phase: nothing is written, only the wait strategy runs
+	idle_start_cpu = time.process_time()
+	idle_deadline = time.monotonic() + IDLE_SECONDS
+	while time.monotonic() < idle_deadline:
+		if mode == 'notify':
+			notifier.wait(ring.tail, timeout=idle_deadline - time.monotonic())
+		else:
+			time.sleep(0.05 if mode == 'poll_50ms' else 0.001)
+		ring.read()
+	idle_cpu = time.process_time() - idle_start_cpu
+
+	connection.send({
+		'latencies': latencies,
+		'idle_cpu': idle_cpu / IDLE_SECONDS
+	})
+	notifier.release()
+	ring.release()
+
+
+def run_mode(mode: str, seed: int = 1):
+	rng = random.Random(seed)
+	memory = mmap.mmap(-1, ring_region_size(CAPACITY), flags=mmap.MAP_SHARED)
+	ring = CommandRing(memory, 0, CAPACITY)
+	ring.initialize()
+	notifier = FutexNotifier(memory, ring.head_offset)
+
+	context = multiprocessing.get_context('fork')
+	receiver, sender = context.Pipe(duplex=False)
+	process = context.Process(target=consumer, args=(memory, mode, sender), daemon=True)
+	process.start()
+	time.sleep(0.1)
+
+	for _ in range(COMMANDS):
+		time.sleep(rng.uniform(0.005, 0.02))
+		ring.write(struct.pack('<d', time.perf_counter()))
+		notifier.notify()
+
+	result = receiver.recv()
+	process.join(5)
+	notifier.release()
+	ring.release()
+	memory.close()
+	return result
+
+
+def run():
+	if sys.platform != 'linux':
+		raise RuntimeError("bench_notify_latency needs fork and futex (Linux)")
+	results = {}
+	for mode in ('poll_50ms', 'poll_1ms', 'notify'):
+		result = run_mode(mode)
+		latencies = sorted(result['latencies'])
+		results[mode] = {
+			'median': statistics.median(latencies),
+			'p99': latencies[int(len(latencies) * 0.99) - 1],
+			'max': latencies[-1],
+			'idle_cpu': result['idle_cpu']
+		}
+	return results
+
+
+def main():
+	results = run()
+	print(f"{'mode':>10}  {'median':>10}  {'p99':>10}  {'max':>10}  {'idle CPU':>9}")
+	for mode, result in results.items():
+		print(f"{mode:>10}  {format_time(result['median']):>10}  {format_time(result['p99']):>10}  "
+			  f"{format_time(result['max']):>10}  {result['idle_cpu']:>8.2%}")
+
+
+if __name__ == '__main__':
+	main()
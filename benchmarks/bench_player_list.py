@@ -0,0 +1,127 @@
+"""GUI thread cost of the player list under sync traffic.
+
+Feeds 150 players updating at 20 Hz for two seconds of traffic into the
+original QListWidget implementation (setText per update) and into the
+batched table model refreshed at PLAYER_LIST_REFRESH_HZ, both rendered
+offscreen with an event loop turn per traffic frame. Reports GUI time per
+second of traffic and the worst single frame. The table also computes
+distance, speed and ping and keeps its rows sorted.
+
+Run with: QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_player_list
+"""
+import os
+import random
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication, QListWidget, QListWidgetItem
+from client.game_sync import GameSyncManager
+from client.gui.player_list_widget import PlayerListWidget
+from .harness import format_time
+
+PLAYERS = 150
+UPDATE_HZ = 20
+SECONDS = 2
+REFRESH_HZ = 4
+
+
+class ListWidgetBaseline:
+	"""The pre-model implementation: one multi-line setText per sync_update"""
+
+	def __init__(self, game_state):
+		self.game_state = game_state
+		self.items = {}
+		self.widget = QListWidget()
+
+	def add_player(self, player_id: str):
+		item = QListWidgetItem(f"Player: {player_id}")
+		self.widget.addItem(item)
+		self.items[player_id] = item
+
+	def remove_player(self, player_id: str):
+		self.widget.takeItem(self.widget.row(self.items.pop(player_id)))
+
+	def update_player_info(self, player_id: str):
+		item = self.items[player_id]
+		health = self.game_state.store.get_health(player_id)
+		vehicle = self.game_state.player_states.get(player_id, {}).get('vehicle', {})
+		info_text = f"Player: {player_id}\nHealth: {health:.0f}%\n"
+		if vehicle:
+			info_text += f"Vehicle: {vehicle.get('type', 'Unknown')}\nSpeed: {vehicle.get('speed', 0):.1f} mph"
+		item.setText(info_text)
+
+
+def traffic(seed: int = 1):
+	rng = random.Random(seed)
+	frames = []
+	for _ in range(UPDATE_HZ * SECONDS):
+		frame = []
+		for i in range(PLAYERS):
+			frame.append((f"player{i}", {
+				'position': {'x': rng.uniform(-1000, 1000), 'y': rng.uniform(-1000, 1000), 'z': 30.0},
+				'velocity': {'x': rng.uniform(-20, 20), 'y': rng.uniform(-20, 20), 'z': 0.0},
+				'health': rng.uniform(0, 200),
+				'local_timestamp': time.time(),
+				'vehicle': {'type': 'ADDER', 'speed': 50.0} if i % 2 else None
+			}))
+		frames.append(frame)
+	return frames
+
+
+def run_widget(make_widget, view, refresh, frames, app):
+	manager = GameSyncManager()
+	manager.set_local_player('local')
+	manager.update_local_state((0.0, 0.0, 30.0), 200)
+	target = make_widget(manager)
+	view(target).resize(400, 800)
+	view(target).show()
+	for i in range(PLAYERS):
+		target.add_player(f"player{i}")
+	refresh(target)
+	app.processEvents()
+
+	# The event loop gets a turn after every traffic frame, as it would between socket messages
+	refresh_every = UPDATE_HZ // REFRESH_HZ
+	frame_times = []
+	start = time.perf_counter()
+	for n, frame in enumerate(frames):
+		frame_start = time.perf_counter()
+		for player_id, state in frame:
+			manager.handle_remote_update(player_id, state)
+			target.update_player_info(player_id)
+		if n % refresh_every == refresh_every - 1:
+			refresh(target)
+		app.processEvents()
+		frame_times.append(time.perf_counter() - frame_start)
+	elapsed = time.perf_counter() - start
+	view(target).close()
+	return {'gui_per_second': elapsed / SECONDS, 'worst_frame': max(frame_times)}
+
+
+def run():
+	app = QApplication.instance() or QApplication([])
+	frames = traffic()
+	results = {'list_widget': run_widget(lambda manager: ListWidgetBaseline(manager.game_state),
+										 lambda target: target.widget, lambda target: None, frames, app)}
+	os.environ['PLAYER_LIST_REFRESH_HZ'] = str(REFRESH_HZ)
+	results['table_model'] = run_widget(PlayerListWidget, lambda target: target,
+										PlayerListWidget.apply_pending, frames, app)
+	return results
+
+
+def main():
+	results = run()
+	baseline = results['list_widget']
+	batched = results['table_model']
+	updates = PLAYERS * UPDATE_HZ * SECONDS
+	print(f"{PLAYERS} players at {UPDATE_HZ} Hz, {updates} updates over {SECONDS} s of traffic")
+	print(f"  QListWidget setText per update: {format_time(baseline['gui_per_second'])} GUI time per second, "
+		  f"worst frame {format_time(baseline['worst_frame'])}")
+	print(f"  batched table model at {REFRESH_HZ} Hz: {format_time(batched['gui_per_second'])} GUI time per second, "
+		  f"worst frame {format_time(batched['worst_frame'])} "
+		  f"({baseline['gui_per_second'] / batched['gui_per_second']:.1f}x)")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,67 @@
+"""Remote player sync frame: one slot table batch against one command per player.
+
+Run with: python -m benchmarks.bench_player_slots
+"""
+import json
+import mmap
+from client.command_ring import CommandRing, ring_region_size
+from client.player_slots import PlayerSlotTable, slot_table_size
+from .harness import measure, format_time
+
+
+def remote_states(count: int):
+	return {
+		f"player-{i:04d}": {
+			'position': {'x': 10.0 * i, 'y': -5.0 * i, 'z': 30.0},
+			'heading': float(i),
+			'velocity': {'x': 1.0, 'y': 0.0, 'z': 0.0},
+			'health': 200.0,
+			'timestamp': 1000.0 + i
+		}
+		for i in range(count)
+	}
+
+
+def run():
+	results = {}
+	ring_memory = mmap.mmap(-1, ring_region_size(65536))
+	ring = CommandRing(ring_memory, 0, 65536)
+	ring.initialize()
+	table_memory = mmap.mmap(-1, slot_table_size())
+	table = PlayerSlotTable(table_memory, 0, 64)
+	table.initialize()
+
+	for count in (1, 10, 32, 64):
+		states = remote_states(count)
+
+		def per_player_commands():
+			for player_id, state in states.items():
+				ring.write(json.dumps({'type': 'update_player', 'player_id': player_id, 'state': state}).encode('ascii'))
+			while ring.read() is not None:
+				pass
+
+		table.write_batch(states)
+		assert set(table.read_all()) == set(states)
+		results[count] = {
+			'commands': measure(per_player_commands, number=200),
+			'slot_batch': measure(lambda: table.write_batch(states), number=200),
+			'read_table': measure(table.read_all, number=200)
+		}
+
+	ring.release()
+	table.release()
+	ring_memory.close()
+	table_memory.close()
+	return results
+
+
+def main():
+	results = run()
+	print(f"{'players':>7}  {'commands':>10}  {'slot batch':>10}  {'read table':>10}")
+	for count, result in results.items():
+		print(f"{count:>7}  {format_time(result['commands']['best']):>10}  "
+			  f"{format_time(result['slot_batch']['best']):>10}  {format_time(result['read_table']['best']):>10}")
+
+
+if __name__ == '__main__':
+	main()
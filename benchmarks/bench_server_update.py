@@ -0,0 +1,101 @@
+"""Server player_update path with a fake socket layer.
+
+Calls server.app.handle_player_update directly for a session of N players.
+The fake layer stands in for Flask-SocketIO: current_player_id returns the
+sending player and emit encodes the packet once and queues it for every
+other member of the room, which is what the real broadcast does per
+recipient. Measured with emit as a no-op (validation and session state
+only), with the fake fan-out, and with the fan-out and stage profiling on.
+
+Run with: python -m benchmarks.bench_server_update
+"""
+from collections import deque
+import json
+import server.app as server_app
+from common.profiling import profiler
+from .harness import measure, format_time
+
+STATE = {'position': {'x': 215.3, 'y': -810.2, 'z': 30.7}, 'velocity': {'x': 4.0, 'y': 0.5, 'z': 0.0},
+		 'heading': 91.5, 'health': 200.0, 'armor': 50.0, 'timestamp': 1700000000.0,
+		 'vehicle': {'model': 1, 'health': 950.0, 'type': 'ADDER'}}
+
+
+class FakeSocketLayer:
+	"""Rooms of player ids with a bounded outbox each, the sender set by the caller"""
+
+	def __init__(self):
+		self.rooms = {}
+		self.outboxes = {}
+		self.sender = None
+		self.emitted = 0
+
+	def join(self, room: str, player_id: str):
+		self.rooms.setdefault(room, []).append(player_id)
+		self.outboxes[player_id] = deque(maxlen=64)
+
+	def current_player_id(self):
+		return self.sender
+
+	def emit(self, event, data, room=None, include_self=True):
+		packet = json.dumps([event, data])
+		for player_id in self.rooms.get(room, ()):
+			if include_self or player_id != self.sender:
+				self.outboxes[player_id].append(packet)
+		self.emitted += 1
+
+	def emit_nothing(self, event, data, room=None, include_self=True):
+		self.emitted += 1
+
+
+def build_session(layer: FakeSocketLayer, players: int) -> str:
+	session_id = f"bench{players}"
+	player_ids = [f"{session_id}-player{i}" for i in range(players)]
+	server_app.sessions[session_id] = server_app.Session(
+		id=session_id, host_id=player_ids[0], players=set(player_ids), created_at=0.0)
+	for player_id in player_ids:
+		server_app.player_sessions[player_id] = session_id
+		layer.join(session_id, player_id)
+	layer.sender = player_ids[0]
+	return session_id
+
+
+def run():
+	layer = FakeSocketLayer()
+	original_emit = server_app.emit
+	original_current = server_app.current_player_id
+	was_enabled = profiler.enabled
+	server_app.current_player_id = layer.current_player_id
+	results = {}
+	try:
+		for players in (2, 8, 32):
+			session_id = build_session(layer, players)
+
+			def update():
+				assert server_app.handle_player_update(dict(STATE))['status'] == 'success'
+
+			server_app.emit = layer.emit_nothing
+			handler = measure(update, number=5000)
+			server_app.emit = layer.emit
+			fanout = measure(update, number=5000)
+			profiler.enable()
+			profiled = measure(update, number=5000)
+			profiler.disable()
+			results[players] = {'handler': handler, 'fanout': fanout, 'profiled': profiled}
+			del server_app.sessions[session_id]
+	finally:
+		server_app.emit = original_emit
+		server_app.current_player_id = original_current
+		profiler.enabled = was_enabled
+	return results
+
+
+def main():
+	results = run()
+	print(f"{'players':>8}  {'handler':>10}  {'+ fan-out':>10}  {'+ profiling':>12}")
+	for players, result in results.items():
+		print(f"{players:>8}  {format_time(result['handler']['best']):>10}  "
+			  f"{format_time(result['fanout']['best']):>10}  {format_time(result['profiled']['best']):>12}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,47 @@
+"""Protocol layer costs on each portable shared memory backend.
+
+Run with: python -m benchmarks.bench_shared_memory
+"""
+import os
+from client.shared_memory import SharedMemoryInterface
+from .harness import measure, format_time
+
+BACKENDS = ('posix', 'file')
+
+COMMAND = {'type': 'update_player', 'player_id': 'bench', 'state': {'position': {'x': 1.0, 'y': 2.0, 'z': 3.0}, 'health': 100}}
+STATE = {'position': {'x': 215.3, 'y': -810.2, 'z': 30.7}, 'heading': 91.5, 'health': 200.0,
+		 'vehicle': {'model': 1, 'health': 950.0, 'type': 'ADDER'}}
+
+
+def run():
+	results = {}
+	os.environ.setdefault('SHARED_MEMORY_NAME', f"SanSyncBench{os.getpid()}")
+	for backend in BACKENDS:
+		interface = SharedMemoryInterface(create=True, backend=backend)
+		try:
+			def command_round_trip():
+				interface.write_command(dict(COMMAND))
+				interface.read_command()
+
+			interface.write_state(dict(STATE))
+			results[backend] = {
+				'command_round_trip': measure(command_round_trip, number=5000),
+				'write_state': measure(lambda: interface.write_state(dict(STATE)), number=5000),
+				'read_game_state': measure(interface.read_game_state, number=5000),
+				'read_if_changed': measure(interface.read_game_state_if_changed, number=20000)
+			}
+		finally:
+			interface.close()
+	return results
+
+
+def main():
+	results = run()
+	for backend, result in results.items():
+		print(backend)
+		for name, timing in result.items():
+			print(f"  {name:>20}  {format_time(timing['best']):>10}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,70 @@
+"""End-to-end shared memory pipeline against the game simulator.
+
+Runs client.game_simulator on a background thread and a GTAInterface in
+simulator mode, then measures how old each local state sample is when the
+client sees it and how many remote player batches the game side observes.
+
+Run with: python -m benchmarks.bench_simulator_pipeline
+"""
+import os
+import statistics
+import time
+from client.game_simulator import GameSimulator
+from client.game_interface import GTAInterface
+from .harness import format_time
+
+FPS = 60
+DURATION = 3.0
+REMOTE_PLAYERS = 16
+
+
+def run():
+	os.environ.setdefault('SHARED_MEMORY_NAME', f"SanSyncPipeline{os.getpid()}")
+	simulator = GameSimulator(fps=FPS)
+	simulator.start()
+	interface = GTAInterface(simulator=True)
+	try:
+		assert interface.initialize()
+		ages = []
+		flushes = 0
+		deadline = time.monotonic() + DURATION
+		while time.monotonic() < deadline:
+			state = interface.wait_for_player_state(0.1)
+			if state:
+				ages.append(time.time() - state['timestamp'])
+			# One remote batch per received frame, as the sync loop would do
+			for i in range(REMOTE_PLAYERS):
+				interface.queue_remote_player(f"remote-{i}", {
+					'position': {'x': float(i), 'y': time.monotonic() % 100, 'z': 30.0},
+					'health': 200.0
+				})
+			if interface.flush_remote_players():
+				flushes += 1
+		time.sleep(2.0 / FPS)
+		stats = simulator.get_stats()
+	finally:
+		interface.close()
+		simulator.close()
+
+	ages.sort()
+	return {
+		'frames': stats['frames'],
+		'samples': len(ages),
+		'age_median': statistics.median(ages),
+		'age_p99': ages[int(len(ages) * 0.99) - 1],
+		'flushes': flushes,
+		'remote_updates_seen': stats['remote_updates'],
+		'remote_players': stats['remote_players']
+	}
+
+
+def main():
+	results = run()
+	print(f"simulator frames {results['frames']}, client samples {results['samples']}")
+	print(f"state age at client: median {format_time(results['age_median'])}, p99 {format_time(results['age_p99'])}")
+	print(f"remote batches {results['flushes']}, slot changes seen by the game {results['remote_updates_seen']} "
+		  f"across {results['remote_players']} players")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,81 @@
+"""Local player state read and write: binary record against the original JSON block.
+
+Run with: python -m benchmarks.bench_state_record
+"""
+import json
+import mmap
+import threading
+import time
+from client.state_record import PlayerStateRecord, initialize_record, record_to_dict, dict_to_record
+from .harness import measure, format_time
+
+STATE_BUFFER_SIZE = 8192
+
+SAMPLE_STATE = {
+	'pid': 4242,
+	'position': {'x': 215.3, 'y': -810.2, 'z': 30.7},
+	'heading': 91.5,
+	'velocity': {'x': 12.0, 'y': -3.5, 'z': 0.0},
+	'health': 200.0,
+	'armor': 50.0,
+	'game_time': 123456,
+	'timestamp': time.time(),
+	'vehicle': {'model': 0xB779A091, 'health': 950.0, 'type': 'ADDER'}
+}
+
+
+def read_json_block(memory, lock):
+	"""The pre-record read_game_state implementation"""
+	with lock:
+		memory.seek(0)
+		state_bytes = memory.read(STATE_BUFFER_SIZE)
+		if b'|' not in state_bytes:
+			return None
+		state_data = state_bytes.split(b'|')[0].decode('ascii')
+		if not state_data:
+			return None
+		return json.loads(state_data)
+
+
+def run():
+	lock = threading.Lock()
+	json_memory = mmap.mmap(-1, STATE_BUFFER_SIZE)
+	json_memory.write((json.dumps(SAMPLE_STATE).encode('ascii') + b'|').ljust(STATE_BUFFER_SIZE, b'\0'))
+
+	record_memory = mmap.mmap(-1, STATE_BUFFER_SIZE)
+	record = PlayerStateRecord.from_buffer(record_memory, 0)
+	initialize_record(record)
+	dict_to_record(dict(SAMPLE_STATE), record)
+	decoded = record_to_dict(record)
+	for axis, value in read_json_block(json_memory, lock)['position'].items():
+		assert abs(decoded['position'][axis] - value) < 1e-3
+
+	results = {
+		'json_block': measure(lambda: read_json_block(json_memory, lock), number=20000),
+		'record_to_dict': measure(lambda: record_to_dict(record), number=20000),
+		'record_position': measure(lambda: tuple(record.position), number=20000)
+	}
+	writes = {
+		'json_encode': measure(lambda: (json.dumps(SAMPLE_STATE).encode('ascii') + b'|'), number=20000),
+		'dict_to_record': measure(lambda: dict_to_record(SAMPLE_STATE, record), number=20000)
+	}
+	results.update(writes)
+
+	del record
+	json_memory.close()
+	record_memory.close()
+	return results
+
+
+def main():
+	results = run()
+	for baseline, names in (('json_block', ('json_block', 'record_to_dict', 'record_position')),
+							('json_encode', ('json_encode', 'dict_to_record'))):
+		baseline_time = results[baseline]['best']
+		for name in names:
+			best = results[name]['best']
+			print(f"{name:>16}  {format_time(best):>10}  {baseline_time / best:>6.1f}x")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,118 @@
+"""Outbound sync: GUI thread QTimer versus the SyncWorker thread.
+
+Runs the game simulator and uploads the local player to a fake network
+client, first from a 100 ms QTimer on the event loop thread (the old
+MainWindow.sync_game_state) and then from SyncWorker. Halfway through each
+run the event loop is blocked for STALL seconds, the way a modal dialog
+would. Reports upload rate, interval jitter and the longest gap between
+uploads, then a second worker run with the player standing still to show
+the send filter.
+
+Run with: python -m benchmarks.bench_sync_worker
+"""
+import os
+import statistics
+import sys
+import time
+from PyQt6.QtCore import QCoreApplication, QTimer
+from client.game_simulator import GameSimulator
+from client.game_interface import GTAInterface
+from client.sync_worker import SyncWorker
+from .harness import format_time
+
+FPS = 60
+RATE_HZ = 10
+DURATION = 3.0
+STALL = 1.0
+
+
+class FakeNetworkClient:
+	player_id = 'local'
+
+	def __init__(self):
+		self.sent = []
+
+	def send_player_update(self, state):
+		self.sent.append(time.perf_counter())
+
+
+def _run_loop(app, stall_at: float):
+	def stall():
+		time.sleep(STALL)  # The event loop is stuck, like under QMessageBox.exec
+	QTimer.singleShot(int(stall_at * 1000), stall)
+	QTimer.singleShot(int(DURATION * 1000), app.quit)
+	app.exec()
+
+
+def _summary(sent):
+	intervals = [b - a for a, b in zip(sent, sent[1:])]
+	return {
+		'uploads': len(sent),
+		'rate': len(sent) / DURATION,
+		'jitter': statistics.pstdev(intervals) if len(intervals) > 1 else 0.0,
+		'max_gap': max(intervals) if intervals else DURATION
+	}
+
+
+def run():
+	os.environ.setdefault('SHARED_MEMORY_NAME', f"SanSyncWorker{os.getpid()}")
+	app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+	simulator = GameSimulator(fps=FPS)
+	simulator.start()
+	interface = GTAInterface(simulator=True)
+	results = {}
+	try:
+		assert interface.initialize()
+
+		# Old path: upload from a timer on the event loop thread
+		network = FakeNetworkClient()
+		def sync_game_state():
+			state = interface.poll_player_state()
+			if state:
+				network.send_player_update(dict(state))
+		timer = QTimer()
+		timer.timeout.connect(sync_game_state)
+		timer.start(int(1000 / RATE_HZ))
+		_run_loop(app, DURATION / 2)
+		timer.stop()
+		results['timer'] = _summary(network.sent)
+
+		# New path: the same event loop stall, uploads on the worker thread
+		network = FakeNetworkClient()
+		worker = SyncWorker(interface, network, rate_hz=RATE_HZ)
+		worker.start()
+		_run_loop(app, DURATION / 2)
+		worker.stop()
+		results['worker'] = _summary(network.sent)
+		results['worker'].update(worker.get_stats())
+
+		# Standing still, only keepalives pass the filter
+		simulator.speed = 0.0
+		network = FakeNetworkClient()
+		worker = SyncWorker(interface, network, rate_hz=RATE_HZ)
+		worker.start()
+		time.sleep(DURATION)
+		worker.stop()
+		results['idle'] = _summary(network.sent)
+		results['idle'].update(worker.get_stats())
+	finally:
+		interface.close()
+		simulator.close()
+	return results
+
+
+def main():
+	results = run()
+	print(f"{RATE_HZ} Hz uploads over {DURATION:.0f} s with a {STALL:.0f} s event loop stall")
+	for name in ('timer', 'worker'):
+		result = results[name]
+		print(f"{name:>6}: {result['uploads']} uploads ({result['rate']:.1f}/s), "
+			  f"jitter {format_time(result['jitter'])}, longest gap {format_time(result['max_gap'])}")
+	worker = results['worker']
+	print(f"worker: {worker['overruns']} overruns, worst wake-up {format_time(worker['max_lateness'])} late")
+	idle = results['idle']
+	print(f"standing still: {idle['sent']} sent, {idle['filtered']} filtered of {idle['samples']} samples")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,29 @@
+import time
+from typing import Callable, Dict, Any
+
+
+def measure(func: Callable, number: int = 1000, repeat: int = 5) -> Dict[str, Any]:
+	"""Time func, returns per-call seconds for the best and median of repeat runs"""
+	timings = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		for _ in range(number):
+			func()
+		timings.append((time.perf_counter() - start) / number)
+	timings.sort()
+	return {
+		'best': timings[0],
+		'median': timings[len(timings) // 2],
+		'number': number,
+		'repeat': repeat
+	}
+
+
+def format_time(seconds: float) -> str:
+	if seconds < 1e-6:
+		return f"{seconds * 1e9:.0f} ns"
+	if seconds < 1e-3:
+		return f"{seconds * 1e6:.2f} us"
+	if seconds < 1:
+		return f"{seconds * 1e3:.2f} ms"
+	return f"{seconds:.2f} s"
@@ -0,0 +1,125 @@
+"""Seqlock stress test: a writer process hammers the state record while this
+process reads it, with and without the seqlock protocol.
+
+Every sample the writer stores is derived from one counter, so a copy whose
+fields disagree with each other is a torn read. Linux only: the record lives
+in an anonymous MAP_SHARED mapping inherited through fork.
+
+Run with: python -m benchmarks.stress_seqlock [seconds]
+"""
+import ctypes
+import mmap
+import multiprocessing
+import sys
+import time
+from client.state_record import (PlayerStateRecord, SeqlockReader, STATE_RECORD_SIZE, STATE_UNCHANGED,
+								 initialize_record, dict_to_record)
+from .harness import measure, format_time
+
+
+def sample(i: int):
+	"""State whose every field encodes i, exact in float32 below 2**24"""
+	value = float(i % (1 << 24))
+	return {
+		'pid': i,
+		'game_time': i,
+		'timestamp': value,
+		'position': {'x': value, 'y': value, 'z': value},
+		'velocity': {'x': value, 'y': value, 'z': value},
+		'heading': value,
+		'health': value,
+		'armor': value,
+		'vehicle': {'model': i, 'health': value, 'type': f"V{i % 100000}"}
+	}
+
+
+def is_consistent(record: PlayerStateRecord) -> bool:
+	i = record.pid
+	value = float(i % (1 << 24))
+	fields = (record.timestamp, record.heading, record.health, record.armor, record.vehicle_health,
+			  *record.position, *record.velocity)
+	return (record.game_time == i and record.vehicle_model == i and all(field == value for field in fields)
+			and record.vehicle_name == f"V{i % 100000}".encode())
+
+
+def writer(memory, stop):
+	record = PlayerStateRecord.from_buffer(memory, 0)
+	i = 1
+	while not stop.is_set():
+		dict_to_record(sample(i), record)
+		i += 1
+
+
+def read_unprotected(record: PlayerStateRecord) -> PlayerStateRecord:
+	"""Plain copy without checking the sequence, what the reader did before"""
+	copy = PlayerStateRecord()
+	ctypes.memmove(ctypes.addressof(copy), ctypes.addressof(record), STATE_RECORD_SIZE)
+	return copy
+
+
+def hammer(record: PlayerStateRecord, duration: float):
+	reader = SeqlockReader(record)
+	reads = torn_plain = torn_seqlock = 0
+	deadline = time.monotonic() + duration
+	while time.monotonic() < deadline:
+		if record.pid == 0:
+			continue  # Writer has not started yet
+		reads += 1
+		if not is_consistent(read_unprotected(record)):
+			torn_plain += 1
+		copy = reader.snapshot()
+		if copy is not None and not is_consistent(copy):
+			torn_seqlock += 1
+	return {
+		'reads': reads,
+		'torn_plain': torn_plain,
+		'torn_seqlock': torn_seqlock,
+		'retries': reader.retries,
+		'failures': reader.failures
+	}
+
+
+def run(duration: float = 5.0):
+	if sys.platform != 'linux':
+		raise RuntimeError("stress_seqlock needs fork and anonymous shared mappings (Linux)")
+
+	memory = mmap.mmap(-1, STATE_RECORD_SIZE, flags=mmap.MAP_SHARED)
+	record = PlayerStateRecord.from_buffer(memory, 0)
+	initialize_record(record)
+
+	context = multiprocessing.get_context('fork')
+	stop = context.Event()
+	process = context.Process(target=writer, args=(memory, stop), daemon=True)
+	process.start()
+	try:
+		results = hammer(record, duration)
+	finally:
+		stop.set()
+		process.join(5)
+
+	# Idle cost once the writer has stopped
+	reader = SeqlockReader(record)
+	reader.read()
+	results['idle_read_if_changed'] = measure(reader.read_if_changed, number=100000)
+	results['full_read'] = measure(reader.read, number=20000)
+	assert reader.read_if_changed() is STATE_UNCHANGED
+
+	del reader, record
+	memory.close()
+	return results
+
+
+def main():
+	duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+	results = run(duration)
+	print(f"reads {results['reads']}, torn without seqlock {results['torn_plain']}, "
+		  f"torn with seqlock {results['torn_seqlock']}, retries {results['retries']}, "
+		  f"failures {results['failures']}")
+	print(f"idle read_if_changed {format_time(results['idle_read_if_changed']['best'])}, "
+		  f"full read {format_time(results['full_read']['best'])}")
+	if results['torn_seqlock']:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
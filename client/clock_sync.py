@@ -0,0 +1,114 @@
+from collections import deque
+from typing import Dict, Any, Optional
+import threading
+import time
+
+
+class ClockSync:
+	"""NTP-style estimate of the offset and drift between the local clock and the server clock.
+
+	Each probe yields four timestamps: client send (t0), server receive (t1),
+	server send (t2) and client receive (t3). Only the samples with the lowest
+	round trip times are trusted, since queuing delay is what skews an offset
+	estimate; drift is fitted over those samples with a least squares line.
+	"""
+
+	def __init__(self, window: int = 64, filter_ratio: float = 0.25, min_drift_span: float = 30.0):
+		self.samples = deque(maxlen=window)  # (local_time, offset, rtt)
+		self.filter_ratio = filter_ratio
+		self.min_drift_span = min_drift_span
+		self.lock = threading.Lock()
+
+		self.offset = 0.0  # server_time - local_time at reference_time
+		self.drift = 0.0  # change of offset per local second
+		self.rtt = None
+		self.error = None  # upper bound on the offset error in seconds
+		self.reference_time = time.time()
+		self.last_update = None
+
+	def add_sample(self, t0: float, t1: float, t2: float, t3: float) -> bool:
+		"""Add a probe result, returns False if the sample was rejected"""
+		rtt = (t3 - t0) - (t2 - t1)
+		if rtt < 0:
+			return False
+
+		offset = ((t1 - t0) + (t2 - t3)) / 2
+		with self.lock:
+			self.samples.append((t0 + (t3 - t0) / 2, offset, rtt))
+			self._recompute()
+		return True
+
+	def _recompute(self):
+		"""Re-estimate offset and drift from the min-RTT filtered samples"""
+		count = max(1, int(len(self.samples) * self.filter_ratio))
+		best = sorted(self.samples, key=lambda sample: sample[2])[:count]
+		min_rtt = best[0][2]
+		latest = max(sample[0] for sample in best)
+
+		drift = 0.0
+		if len(best) >= 3:
+			mean_t = sum(sample[0] for sample in best) / len(best)
+			mean_o = sum(sample[1] for sample in best) / len(best)
+			var_t = sum((sample[0] - mean_t) ** 2 for sample in best)
+			span = max(sample[0] for sample in best) - min(sample[0] for sample in best)
+			if var_t > 0 and span >= self.min_drift_span:
+				drift = sum((sample[0] - mean_t) * (sample[1] - mean_o) for sample in best) / var_t
+			offset = mean_o + drift * (latest - mean_t)
+		else:
+			offset = best[0][1]
+
+		self.offset = offset
+		self.drift = drift
+		self.reference_time = latest
+		self.rtt = min_rtt
+		self.error = min_rtt / 2
+		self.last_update = time.time()
+
+	def current_offset(self, local_time: Optional[float] = None) -> float:
+		"""Offset to add to a local timestamp to get server time"""
+		if local_time is None:
+			local_time = time.time()
+		return self.offset + self.drift * (local_time - self.reference_time)
+
+	def to_server_time(self, local_time: float) -> float:
+		return local_time + self.current_offset(local_time)
+
+	def to_local_time(self, server_time: float) -> float:
+		return server_time - self.current_offset(server_time - self.offset)
+
+	def server_time(self) -> float:
+		"""Current time on the server timeline"""
+		return self.to_server_time(time.time())
+
+	@property
+	def is_synchronized(self) -> bool:
+		return self.rtt is not None
+
+	@property
+	def confidence(self) -> float:
+		"""0..1 score combining sample count and offset error bound"""
+		if not self.is_synchronized:
+			return 0.0
+		fill = min(1.0, len(self.samples) / 8)
+		# A 10ms error bound counts as half confidence
+		return fill / (1.0 + self.error / 0.010)
+
+	def get_status(self) -> Dict[str, Any]:
+		return {
+			'offset': self.current_offset(),
+			'drift': self.drift,
+			'rtt': self.rtt,
+			'error': self.error,
+			'confidence': self.confidence,
+			'samples': len(self.samples)
+		}
+
+	def reset(self):
+		with self.lock:
+			self.samples.clear()
+			self.offset = 0.0
+			self.drift = 0.0
+			self.rtt = None
+			self.error = None
+			self.reference_time = time.time()
+			self.last_update = None
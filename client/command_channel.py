@@ -0,0 +1,155 @@
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, Tuple
+import threading
+import time
+
+# How often the reader wakes without a response to expire timed out requests
+EXPIRY_INTERVAL = 0.05
+
+
+class CommandError(Exception):
+	"""The game side answered a command with an error"""
+
+
+class CommandChannel:
+	"""Request/response layer over the shared memory command and response rings.
+
+	Every request gets an id, the game side answers with a response record
+	{'id', 'ok', 'result' | 'error'} on the response ring. A reader thread
+	waits on the response notifier and resolves the matching Future, so any
+	number of requests can be in flight and callers never block on the game.
+	"""
+
+	def __init__(self, shared_mem, default_timeout: float = 5.0):
+		self.shared_mem = shared_mem
+		self.default_timeout = default_timeout
+		self.lock = threading.Lock()
+		self.pending: Dict[int, Tuple[Future, str, float]] = {}  # id -> (future, type, deadline)
+		self.next_id = 1
+		self.running = False
+		self.thread: Optional[threading.Thread] = None
+
+		self.sent = 0
+		self.completed = 0
+		self.failed = 0
+		self.timed_out = 0
+		self.orphaned = 0  # Responses that arrived after their request expired
+
+	def start(self):
+		self.running = True
+		self.thread = threading.Thread(target=self._run, name="CommandChannel", daemon=True)
+		self.thread.start()
+
+	def submit(self, command_type: str, params: Optional[Dict[str, Any]] = None,
+			   timeout: Optional[float] = None) -> Future:
+		"""Send a command, the Future resolves with the game side result"""
+		future = Future()
+		future.set_running_or_notify_cancel()  # Only the channel completes it
+		if not self.running:
+			future.set_exception(RuntimeError("Command channel is closed"))
+			return future
+
+		timeout = self.default_timeout if timeout is None else timeout
+		with self.lock:
+			request_id = self.next_id
+			self.next_id += 1
+			self.pending[request_id] = (future, command_type, time.monotonic() + timeout)
+
+		command = dict(params or {})
+		command['type'] = command_type
+		command['id'] = request_id
+		if not self.shared_mem.write_command(command):
+			with self.lock:
+				self.pending.pop(request_id, None)
+			future.set_exception(RuntimeError(f"Failed to queue {command_type} command"))
+			return future
+
+		self.sent += 1
+		return future
+
+	def _run(self):
+		while self.running:
+			self.shared_mem.wait_for_response(EXPIRY_INTERVAL)
+			while self.running:
+				response = self.shared_mem.read_response()
+				if response is None:
+					break
+				self._resolve(response)
+			self._expire(time.monotonic())
+
+	def _resolve(self, response: Dict[str, Any]):
+		with self.lock:
+			entry = self.pending.pop(response.get('id'), None)
+		if entry is None:
+			self.orphaned += 1
+			return
+
+		future, command_type, _ = entry
+		if response.get('ok'):
+			self.completed += 1
+			future.set_result(response.get('result'))
+		else:
+			self.failed += 1
+			future.set_exception(CommandError(response.get('error') or f"{command_type} failed"))
+
+	def _expire(self, now: float):
+		with self.lock:
+			expired = [request_id for request_id, (_, _, deadline) in self.pending.items() if deadline <= now]
+			entries = [self.pending.pop(request_id) for request_id in expired]
+		for future, command_type, _ in entries:
+			self.timed_out += 1
+			future.set_exception(TimeoutError(f"No response to {command_type} command"))
+
+	def in_flight(self) -> int:
+		with self.lock:
+			return len(self.pending)
+
+	def get_stats(self) -> Dict[str, int]:
+		return {
+			'sent': self.sent,
+			'in_flight': self.in_flight(),
+			'completed': self.completed,
+			'failed': self.failed,
+			'timed_out': self.timed_out,
+			'orphaned': self.orphaned
+		}
+
+	def close(self):
+		"""Stop the reader and fail whatever is still waiting for a response"""
+		self.running = False
+		if self.thread:
+			self.thread.join(timeout=1)
+			self.thread = None
+		with self.lock:
+			entries = list(self.pending.values())
+			self.pending.clear()
+		for future, command_type, _ in entries:
+			future.set_exception(RuntimeError(f"Command channel closed before {command_type} completed"))
+
+
+def parse_console_command(text: str) -> Tuple[str, Dict[str, Any]]:
+	"""Turn a console line into a (command type, params) pair, raises ValueError with usage"""
+	parts = text.split()
+	if not parts:
+		raise ValueError("Empty command")
+	name, args = parts[0].lower(), parts[1:]
+
+	if name == 'tp':
+		if not args:
+			return 'teleport', {}  # Waypoint
+		if len(args) != 3:
+			raise ValueError("Usage: tp [x y z]")
+		try:
+			x, y, z = (float(arg) for arg in args)
+		except ValueError:
+			raise ValueError("Usage: tp [x y z] (coordinates must be numbers)")
+		return 'teleport', {'position': {'x': x, 'y': y, 'z': z}}
+	if name in ('vehicle', 'car'):
+		if len(args) != 1:
+			raise ValueError(f"Usage: {name} <model>")
+		return 'spawn_vehicle', {'model': args[0].lower()}
+	if name == 'heal':
+		return 'heal', {}
+	if name == 'repair':
+		return 'repair', {}
+	raise ValueError(f"Unknown command: {name}")
@@ -0,0 +1,183 @@
+import struct
+import time
+from typing import Dict, Optional
+
+# Control block layout, mirrored by CommandRingControl in injector/sansync.h.
+# Producer and consumer fields sit on separate cache lines.
+RING_MAGIC = 0x474E5253  # 'SRNG'
+RING_VERSION = 1
+RING_CONTROL_SIZE = 192
+RING_META_FORMAT = '<IIII'  # magic, version, capacity, policy
+HEAD_INDEX = 16  # u32 index of the producer line (byte offset 64)
+TAIL_INDEX = 32  # u32 index of the consumer line (byte offset 128)
+
+# Producer line: head, written, dropped, overflows, high_watermark
+WRITTEN_INDEX = HEAD_INDEX + 1
+DROPPED_INDEX = HEAD_INDEX + 2
+OVERFLOWS_INDEX = HEAD_INDEX + 3
+HIGH_WATERMARK_INDEX = HEAD_INDEX + 4
+# Consumer line: tail, read
+READ_INDEX = TAIL_INDEX + 1
+
+RECORD_HEADER_SIZE = 4
+RECORD_ALIGN = 4
+WRAP_MARKER = 0xFFFFFFFF
+
+# Overflow policies
+POLICY_DROP = 0  # Reject the new record and count it as dropped
+POLICY_BLOCK = 1  # Wait up to block_timeout for the consumer, then drop
+
+U32_MASK = 0xFFFFFFFF
+
+
+def ring_region_size(capacity: int) -> int:
+	return RING_CONTROL_SIZE + capacity
+
+
+class CommandRing:
+	"""Single-producer/single-consumer ring of length-prefixed records.
+
+	The ring lives in a shared buffer: a control block followed by capacity
+	data bytes. head and tail are free-running u32 byte counters, only the
+	producer writes head and only the consumer writes tail, so no lock is
+	shared between processes. Each record is a u32 length followed by the
+	payload, padded to 4 bytes. A record never straddles the end of the data
+	area; the producer writes WRAP_MARKER and continues at offset 0.
+
+	Ordering: the producer copies the payload before publishing head, the
+	consumer reads head before the payload and frees space by publishing tail
+	afterwards. Index updates are aligned 4-byte stores through a memoryview,
+	which x86-64 performs atomically and in program order. The C++ side pairs
+	them with acquire/release operations.
+	"""
+
+	def __init__(self, buffer, offset: int = 0, capacity: Optional[int] = None,
+				 policy: int = POLICY_DROP, block_timeout: float = 0.05):
+		view = memoryview(buffer)
+		if capacity is None:
+			capacity = struct.unpack_from(RING_META_FORMAT, view, offset)[2]
+		if capacity <= 0 or capacity & (capacity - 1):
+			raise ValueError(f"Ring capacity must be a power of two, got {capacity}")
+		if offset % 64:
+			raise ValueError("Ring control block must be cache line aligned")
+
+		self.capacity = capacity
+		self.mask = capacity - 1
+		self.policy = policy
+		self.block_timeout = block_timeout
+		self.control = view[offset:offset + RING_CONTROL_SIZE].cast('I')
+		self.data = view[offset + RING_CONTROL_SIZE:offset + RING_CONTROL_SIZE + capacity]
+		self._raw = view[offset:offset + RING_CONTROL_SIZE]
+
+	def initialize(self):
+		"""Reset the ring, only valid while neither side is active"""
+		self._raw[:] = bytes(RING_CONTROL_SIZE)
+		struct.pack_into(RING_META_FORMAT, self._raw, 0, RING_MAGIC, RING_VERSION, self.capacity, self.policy)
+
+	@property
+	def is_initialized(self) -> bool:
+		return self.control[0] == RING_MAGIC and self.control[2] == self.capacity
+
+	@property
+	def head_offset(self) -> int:
+		"""Byte offset of the head index, the word consumers wait on"""
+		return HEAD_INDEX * 4
+
+	@property
+	def tail(self) -> int:
+		return self.control[TAIL_INDEX]
+
+	def used(self) -> int:
+		return (self.control[HEAD_INDEX] - self.control[TAIL_INDEX]) & U32_MASK
+
+	def write(self, payload: bytes) -> bool:
+		"""Append a record, returns False if it was dropped"""
+		size = len(payload)
+		record_size = (RECORD_HEADER_SIZE + size + RECORD_ALIGN - 1) & ~(RECORD_ALIGN - 1)
+		if record_size > self.capacity:
+			self._count(DROPPED_INDEX)
+			return False
+
+		control = self.control
+		head = control[HEAD_INDEX]
+		pos = head & self.mask
+		to_end = self.capacity - pos
+		needed = record_size if record_size <= to_end else to_end + record_size
+
+		free = self.capacity - ((head - control[TAIL_INDEX]) & U32_MASK)
+		if needed > free:
+			self._count(OVERFLOWS_INDEX)
+			if not self._wait_for_space(head, needed):
+				self._count(DROPPED_INDEX)
+				return False
+
+		if record_size > to_end:
+			# Not enough room before the end, skip to the start of the data area
+			self.data[pos:pos + 4] = WRAP_MARKER.to_bytes(4, 'little')
+			head = (head + to_end) & U32_MASK
+			pos = 0
+
+		self.data[pos:pos + 4] = size.to_bytes(4, 'little')
+		self.data[pos + 4:pos + 4 + size] = payload
+		head = (head + record_size) & U32_MASK
+
+		# Publish: payload first, head last
+		control[HEAD_INDEX] = head
+		control[WRITTEN_INDEX] = (control[WRITTEN_INDEX] + 1) & U32_MASK
+		used = (head - control[TAIL_INDEX]) & U32_MASK
+		if used > control[HIGH_WATERMARK_INDEX]:
+			control[HIGH_WATERMARK_INDEX] = used
+		return True
+
+	def _wait_for_space(self, head: int, needed: int) -> bool:
+		if self.policy != POLICY_BLOCK:
+			return False
+		deadline = time.perf_counter() + self.block_timeout
+		while time.perf_counter() < deadline:
+			if self.capacity - ((head - self.control[TAIL_INDEX]) & U32_MASK) >= needed:
+				return True
+			time.sleep(0)
+		return False
+
+	def read(self) -> Optional[bytes]:
+		"""Pop the oldest record, None if the ring is empty"""
+		control = self.control
+		tail = control[TAIL_INDEX]
+		if tail == control[HEAD_INDEX]:
+			return None
+
+		pos = tail & self.mask
+		size = int.from_bytes(self.data[pos:pos + 4], 'little')
+		if size == WRAP_MARKER:
+			tail = (tail + self.capacity - pos) & U32_MASK
+			pos = 0
+			size = int.from_bytes(self.data[0:4], 'little')
+
+		payload = bytes(self.data[pos + 4:pos + 4 + size])
+		record_size = (RECORD_HEADER_SIZE + size + RECORD_ALIGN - 1) & ~(RECORD_ALIGN - 1)
+
+		# Release the space only after the payload has been copied out
+		control[TAIL_INDEX] = (tail + record_size) & U32_MASK
+		control[READ_INDEX] = (control[READ_INDEX] + 1) & U32_MASK
+		return payload
+
+	def _count(self, index: int):
+		self.control[index] = (self.control[index] + 1) & U32_MASK
+
+	def get_stats(self) -> Dict[str, int]:
+		control = self.control
+		return {
+			'capacity': self.capacity,
+			'used': self.used(),
+			'written': control[WRITTEN_INDEX],
+			'read': control[READ_INDEX],
+			'dropped': control[DROPPED_INDEX],
+			'overflows': control[OVERFLOWS_INDEX],
+			'high_watermark': control[HIGH_WATERMARK_INDEX]
+		}
+
+	def release(self):
+		"""Release the buffer views so the underlying mmap can be closed"""
+		self.control.release()
+		self.data.release()
+		self._raw.release()
@@ -0,0 +1,197 @@
+import builtins
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+_loaded = False
+
+# Lines per section of the import breakdown
+IMPORT_REPORT_LIMIT = 10
+
+
+def load_config(path: Optional[str] = None) -> bool:
+	"""Load .env into os.environ once, later calls are free.
+
+	Every module reads its settings with os.getenv, this only makes sure the
+	file is parsed a single time no matter how many constructors ask for it.
+	"""
+	global _loaded
+	if _loaded:
+		return False
+	load_dotenv(path)
+	_loaded = True
+	return True
+
+
+def _import_target(name: str, globals, fromlist, level: int) -> Optional[str]:
+	"""Module an import statement is about to load, None if it is loaded already"""
+	if level:
+		package = (globals or {}).get('__package__')
+		if not package:
+			return None
+		try:
+			name = importlib.util.resolve_name('.' * level + name, package)
+		except ImportError:
+			return None
+	if name not in sys.modules:
+		return name
+	# from package import submodule
+	if fromlist and fromlist[0] != '*' and not hasattr(sys.modules[name], fromlist[0]):
+		submodule = f"{name}.{fromlist[0]}"
+		if submodule not in sys.modules:
+			return submodule
+	return None
+
+
+class ImportTimer:
+	"""Per-module import times of the main thread while installed.
+
+	Wraps builtins.__import__; a statement that loads a new module records
+	its cumulative time (with everything it imported) and its own time
+	(without). Imports on other threads and of loaded modules pass straight
+	through, so the hook costs one call per import statement.
+	"""
+
+	def __init__(self):
+		self.cumulative: Dict[str, float] = {}
+		self.own: Dict[str, float] = {}
+		self.children: List[float] = []  # Nested import time per open import
+		self.thread = None
+		self.original = None
+		self.hook = self._import
+
+	def install(self):
+		if self.original is None:
+			self.thread = threading.get_ident()
+			self.original = builtins.__import__
+			builtins.__import__ = self.hook
+
+	def uninstall(self):
+		if self.original is not None:
+			if builtins.__import__ is self.hook:
+				builtins.__import__ = self.original
+			self.original = None
+
+	def measure(self, name: str, load):
+		self.children.append(0.0)
+		begin = time.perf_counter()
+		try:
+			return load()
+		finally:
+			seconds = time.perf_counter() - begin
+			nested = self.children.pop()
+			if self.children:
+				self.children[-1] += seconds
+			self.cumulative[name] = self.cumulative.get(name, 0.0) + seconds
+			self.own[name] = self.own.get(name, 0.0) + seconds - nested
+
+	def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+		original = self.original
+		if threading.get_ident() == self.thread:
+			target = _import_target(name, globals, fromlist, level)
+			if target is not None:
+				return self.measure(target, lambda: original(name, globals, locals, fromlist, level))
+		return original(name, globals, locals, fromlist, level)
+
+	def by_package(self) -> List[Tuple[str, float, int]]:
+		"""(top level package, own import seconds, modules) slowest first"""
+		totals: Dict[str, Tuple[float, int]] = {}
+		for name, seconds in self.own.items():
+			package = name.split('.')[0]
+			total, count = totals.get(package, (0.0, 0))
+			totals[package] = (total + seconds, count + 1)
+		return sorted(((package, total, count) for package, (total, count) in totals.items()),
+					  key=lambda item: item[1], reverse=True)
+
+	def slowest(self) -> List[Tuple[str, float, float]]:
+		"""(module, own seconds, cumulative seconds) by own time, slowest first"""
+		return sorted(((name, self.own[name], self.cumulative[name]) for name in self.own),
+					  key=lambda item: item[1], reverse=True)
+
+
+class StartupTimer:
+	"""Records how long each startup stage took, relative to the timer's creation.
+
+	stage() times a block, timed_import() an import together with the number
+	of modules it pulled in, mark() a point in time such as the first paint.
+	track_imports() adds a per-module breakdown of every import until the
+	report, and the report checks the first paint against STARTUP_TARGET_MS.
+	"""
+
+	def __init__(self):
+		self.start = time.perf_counter()
+		self.stages: List[Tuple[str, float, int]] = []  # (name, seconds, modules loaded)
+		self.marks: List[Tuple[str, float]] = []  # (name, seconds since start)
+		self.imports = ImportTimer()
+		self.window_mark = "first paint"
+		self.reported = False
+
+	def track_imports(self):
+		self.imports.install()
+
+	@contextmanager
+	def stage(self, name: str):
+		modules = len(sys.modules)
+		begin = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.stages.append((name, time.perf_counter() - begin, len(sys.modules) - modules))
+
+	def timed_import(self, module_name: str):
+		with self.stage(f"import {module_name}"):
+			if self.imports.original is None or module_name in sys.modules:
+				return importlib.import_module(module_name)
+			return self.imports.measure(module_name, lambda: importlib.import_module(module_name))
+
+	def mark(self, name: str) -> float:
+		elapsed = time.perf_counter() - self.start
+		self.marks.append((name, elapsed))
+		return elapsed
+
+	def elapsed(self, name: str) -> Optional[float]:
+		for mark, elapsed in self.marks:
+			if mark == name:
+				return elapsed
+		return None
+
+	def format_report(self) -> str:
+		lines = ["Startup timing:"]
+		for name, seconds, modules in self.stages:
+			suffix = f" ({modules} modules)" if modules else ""
+			lines.append(f"  {name:<40} {seconds * 1000:8.1f} ms{suffix}")
+		for name, elapsed in self.marks:
+			lines.append(f"  {name + ' at':<40} {elapsed * 1000:8.1f} ms")
+
+		if self.imports.own:
+			lines.append("Import time by package (own time, modules):")
+			for package, seconds, count in self.imports.by_package()[:IMPORT_REPORT_LIMIT]:
+				lines.append(f"  {package:<40} {seconds * 1000:8.1f} ms ({count} modules)")
+			lines.append("Slowest modules (own time, with imports):")
+			for name, own, cumulative in self.imports.slowest()[:IMPORT_REPORT_LIMIT]:
+				lines.append(f"  {name:<40} {own * 1000:8.1f} ms ({cumulative * 1000:.1f} ms)")
+
+		window = self.elapsed(self.window_mark)
+		if window is not None:
+			target = float(os.getenv('STARTUP_TARGET_MS', '1000')) / 1000
+			verdict = "within" if window <= target else f"{(window - target) * 1000:.0f} ms over"
+			lines.append(f"Time to window {window * 1000:.0f} ms, {verdict} the {target * 1000:.0f} ms target")
+		return "\n".join(lines)
+
+	def report(self):
+		"""Print the report once, later calls do nothing"""
+		if self.reported:
+			return
+		self.reported = True
+		self.imports.uninstall()
+		print(self.format_report())
+
+
+# Shared by main.py and the main window, main.py imports it before anything heavy
+startup = StartupTimer()
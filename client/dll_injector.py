@@ -51,8 +51,8 @@ class DLLInjector:
         self.kernel32.VirtualFreeEx.argtypes = [wintypes.HANDLE, c_void_p, c_size_t, wintypes.DWORD]
         self.kernel32.VirtualFreeEx.restype = wintypes.BOOL
 
-    def inject(self, process_id: int) -> bool:
-        """Inject DLL into target process"""
+    def inject(self, process_id: int, cancel_event=None, timeout: float = 10.0) -> bool:
+        """Inject DLL into target process, cancel_event aborts the wait for LoadLibrary"""
         try:
             print(f"Attempting to inject DLL: {self.dll_path}")
             print(f"DLL exists: {os.path.exists(self.dll_path)}")
@@ -147,11 +147,21 @@ class DLLInjector:
 
             print("Created remote thread, waiting for completion...")
 
-            # Wait for thread to complete
-            result = self.kernel32.WaitForSingleObject(thread_handle, 10000)  # 10 second timeout
-            if result != win32con.WAIT_OBJECT_0:
-                print(f"Wait for thread failed with result: {result}")
-                return False
+            # Wait for LoadLibrary in short slices so a cancel is noticed promptly
+            deadline = time.monotonic() + timeout
+            while True:
+                result = self.kernel32.WaitForSingleObject(thread_handle, 100)
+                if result == win32con.WAIT_OBJECT_0:
+                    break
+                if result != win32con.WAIT_TIMEOUT or time.monotonic() >= deadline:
+                    print(f"Wait for thread failed with result: {result}")
+                    self.kernel32.CloseHandle(thread_handle)
+                    return False
+                if cancel_event is not None and cancel_event.is_set():
+                    # The remote thread may still read the path, so its buffer is left allocated
+                    print("DLL injection cancelled")
+                    self.kernel32.CloseHandle(thread_handle)
+                    return False
 
             # Get thread exit code
             exit_code = wintypes.DWORD()
@@ -175,9 +185,7 @@ class DLLInjector:
                 print("DLL injection failed - LoadLibrary returned 0")
                 return False
 
-            # Give the DLL time to initialize
-            time.sleep(1)
-
+            # DllMain has run; readiness of the game side is confirmed by the shared memory handshake
             self.is_injected = True
             print("DLL injected successfully")
             return True
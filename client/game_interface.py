@@ -1,125 +1,287 @@
-import psutil
+from concurrent.futures import Future
 from typing import Dict, Tuple, Optional
 import time
 import ctypes
 import sys
 import os
+import threading
 from .shared_memory import SharedMemoryInterface
-from .dll_injector import DLLInjector
+from .state_record import STATE_UNCHANGED
+from .game_watcher import GameWatcher, GAME_RUNNING
+from .command_channel import CommandChannel, parse_console_command
+from common.tracing import tracer, TRACE_KEY, HOP_PEER_SHM_WRITE
+
+# Seconds to wait for the first game side heartbeat after mapping shared memory
+HANDSHAKE_TIMEOUT = 15.0
+HANDSHAKE_POLL_INTERVAL = 0.05
 
 
 class GTAInterface:
-	def __init__(self):
-		self.dll_injector = DLLInjector()
+	def __init__(self, simulator: Optional[bool] = None):
+		# Simulator mode talks to client.game_simulator instead of an injected game
+		if simulator is None:
+			simulator = os.getenv('GAME_SIMULATOR', '0').lower() in ('1', 'true', 'yes')
+		self.simulator = simulator
+		
+		# Created on the first inject, loading pywin32 and checking the DLL is not needed before that
+		self.dll_injector = None
 		self.shared_mem = None
+		self.command_channel = None
+		self.watcher = GameWatcher()
 		self.current_pid = None
 		self.is_initialized = False
 		self.last_error = None
+		
+		# The sync worker reads and writes shared memory on its own thread, close() waits for it
+		self.memory_lock = threading.RLock()
 
-	def initialize(self) -> bool:
-		"""Initialize connection to GTA5 process"""
+		# Remote player changes staged between sync frames
+		self.remote_lock = threading.Lock()
+		self.pending_remote: Dict[str, Dict] = {}
+		self.pending_removed = set()
+
+	def initialize(self, cancel_event: Optional[threading.Event] = None) -> bool:
+		"""Run every attach stage in order, blocking until the game is ready"""
 		try:
 			# Reset last error
 			self.last_error = None
 			
 			# Check admin rights first
-			if not self._is_admin():
-				self._request_admin()
+			if not self.check_admin():
 				return False
-			
-			# Find GTA5 process
-			pid = self._find_gta_process()
-			if not pid:
-				self.last_error = "GTA5 process not found"
-				print(self.last_error)
-				return False
-
-			# Store current PID
-			self.current_pid = pid
-			print(f"Found GTA5 process with PID: {pid}")
 
 			# Clean up any existing resources
 			self.close()
 
-			# Inject DLL
-			if not self.dll_injector.inject(pid):
-				self.last_error = "Failed to inject DLL"
-				print(self.last_error)
-				return False
+			if not self.simulator:
+				pid = self.discover()
+				if not pid or not self.inject(pid, cancel_event):
+					return False
 
-			# Initialize shared memory
-			try:
-				self.shared_mem = SharedMemoryInterface()
-				print("Shared memory interface initialized")
-			except Exception as e:
-				self.last_error = f"Failed to initialize shared memory: {e}"
-				print(self.last_error)
-				return False
+			return self.map_shared_memory() and self.handshake(cancel_event=cancel_event)
 
-			# Send initial command
-			try:
-				success = self.shared_mem.write_command({
-					'type': 'initialize',
-					'timestamp': time.time(),
-					'pid': pid
-				})
-				if not success:
-					print("Warning: Failed to send initial command")
-			except Exception as e:
-				print(f"Warning: Failed to send initial command: {e}")
+		except Exception as e:
+			self.last_error = f"Failed to initialize GTA interface: {e}"
+			print(self.last_error)
+			self.close()
+			return False
 
-			self.is_initialized = True
-			print("\n" + "=" * 50)
-			print("Game interface successfully initialized!")
-			print("=" * 50 + "\n")
+	def check_admin(self) -> bool:
+		"""Injection needs admin rights, request elevation if they are missing"""
+		if self.simulator or self._is_admin():
 			return True
+		self._request_admin()
+		return False
+
+	def discover(self) -> Optional[int]:
+		"""Attach stage 1: find the game process"""
+		pid = self._find_gta_process()
+		if not pid:
+			self.last_error = "GTA5 process not found"
+			print(self.last_error)
+			return None
+
+		self.current_pid = pid
+		print(f"Found GTA5 process with PID: {pid}")
+		return pid
+
+	def inject(self, pid: int, cancel_event: Optional[threading.Event] = None) -> bool:
+		"""Attach stage 2: load the DLL into the game, cancel_event aborts the wait"""
+		if self.dll_injector is None:
+			from .dll_injector import DLLInjector
+			self.dll_injector = DLLInjector()
+		if not self.dll_injector.inject(pid, cancel_event=cancel_event):
+			if cancel_event is not None and cancel_event.is_set():
+				self.last_error = "Attach cancelled"
+			else:
+				self.last_error = "Failed to inject DLL"
+			print(self.last_error)
+			return False
+		return True
 
+	def map_shared_memory(self) -> bool:
+		"""Attach stage 3: map the shared memory region"""
+		try:
+			if self.simulator:
+				# Attach to a running simulator, or create the region for one to attach to
+				try:
+					self.shared_mem = SharedMemoryInterface(create=False, probe=True)
+					print("Attached to game simulator shared memory")
+				except Exception:
+					self.shared_mem = SharedMemoryInterface(create=True)
+					print("Created shared memory, waiting for the game simulator to attach")
+			else:
+				self.shared_mem = SharedMemoryInterface()
+				print("Shared memory interface initialized")
+			self.command_channel = CommandChannel(self.shared_mem)
+			self.command_channel.start()
+			return True
 		except Exception as e:
-			self.last_error = f"Failed to initialize GTA interface: {e}"
+			self.last_error = f"Failed to initialize shared memory: {e}"
 			print(self.last_error)
-			self.close()
 			return False
 
-	def _find_gta_process(self) -> Optional[int]:
-		"""Find GTA5 process ID"""
+	def handshake(self, timeout: float = HANDSHAKE_TIMEOUT, cancel_event: Optional[threading.Event] = None) -> bool:
+		"""Attach stage 4: wait for the game side heartbeat, then send the initialize command.
+
+		The heartbeat only advances once the game script has set up its side of
+		the region, so it replaces the fixed sleeps that used to follow injection.
+		"""
+		initial, _, _ = self.shared_mem.read_heartbeat()
+		deadline = time.monotonic() + timeout
+		while True:
+			heartbeat, _, game_pid = self.shared_mem.read_heartbeat()
+			if heartbeat != initial:
+				break
+			if cancel_event is not None and cancel_event.is_set():
+				self.last_error = "Attach cancelled"
+				print(self.last_error)
+				return False
+			if time.monotonic() >= deadline:
+				self.last_error = "Game did not respond to the shared memory handshake"
+				print(self.last_error)
+				return False
+			if cancel_event is not None:
+				cancel_event.wait(HANDSHAKE_POLL_INTERVAL)
+			else:
+				time.sleep(HANDSHAKE_POLL_INTERVAL)
+
+		if self.simulator:
+			self.current_pid = game_pid or os.getpid()
+
+		# Send initial command
 		try:
-			for proc in psutil.process_iter(['pid', 'name', 'status']):
-				if proc.info['name'] == 'GTA5.exe' and proc.info['status'] == psutil.STATUS_RUNNING:
-					return proc.info['pid']
-			return None
+			success = self.shared_mem.write_command({
+				'type': 'initialize',
+				'timestamp': time.time(),
+				'pid': self.current_pid
+			})
+			if not success:
+				print("Warning: Failed to send initial command")
 		except Exception as e:
-			print(f"Error searching for GTA5 process: {e}")
-			return None
+			print(f"Warning: Failed to send initial command: {e}")
+
+		self.is_initialized = True
+		print("\n" + "=" * 50)
+		print("Game interface successfully initialized!" + (" (simulator)" if self.simulator else ""))
+		print("=" * 50 + "\n")
+		return True
+
+	def send_request(self, command_type: str, params: Optional[Dict] = None,
+					 timeout: Optional[float] = None) -> Future:
+		"""Send a command that the game answers, the Future resolves with its result"""
+		if not self.command_channel:
+			future = Future()
+			future.set_exception(RuntimeError("Game interface not initialized"))
+			return future
+		return self.command_channel.submit(command_type, params, timeout)
+
+	def execute_console_command(self, command: str) -> Future:
+		"""Run a console game command (tp, vehicle, heal, repair) without waiting for the game.
+
+		Raises ValueError for an unknown command or bad arguments.
+		"""
+		command_type, params = parse_console_command(command)
+		return self.send_request(command_type, params)
+
+	def _find_gta_process(self) -> Optional[int]:
+		"""Find GTA5 process ID, the watcher keeps it cached afterwards"""
+		return self.watcher.find_process(force=True)
+
+	def game_status(self) -> str:
+		"""GAME_RUNNING, GAME_HUNG or GAME_NOT_RUNNING, without a process scan once attached"""
+		heartbeat = None
+		with self.memory_lock:
+			# AttachWorker may close or remap the region on its own thread
+			shared_mem = self.shared_mem
+			if shared_mem:
+				heartbeat, _, game_pid = shared_mem.read_heartbeat()
+		if heartbeat is not None:
+			if self.watcher.process is None and game_pid:
+				self.watcher.attach(game_pid)
+			self.watcher.observe_heartbeat(heartbeat)
+		if self.simulator and self.watcher.process is None:
+			# No process name to scan for, the simulator announces its pid through the heartbeat
+			return GAME_RUNNING
+		return self.watcher.status()
 
 	def get_player_state(self) -> Dict:
 		"""Get player state from shared memory"""
+		with self.memory_lock:
+			if not self.is_initialized or not self.shared_mem:
+				return {}
+			return self.shared_mem.read_game_state() or {}
+
+	def poll_player_state(self) -> Optional[Dict]:
+		"""Player state if the game wrote a new sample since the last poll, otherwise None"""
+		with self.memory_lock:
+			if not self.is_initialized or not self.shared_mem:
+				return None
+			state = self.shared_mem.read_game_state_if_changed()
+		if state is STATE_UNCHANGED:
+			return None
+		return state
+
+	def wait_for_player_state(self, timeout: float) -> Optional[Dict]:
+		"""Block until the game writes a new sample, None on timeout (call off the GUI thread)"""
 		if not self.is_initialized or not self.shared_mem:
-			return {}
-		return self.shared_mem.read_game_state() or {}
+			return None
+		if not self.shared_mem.wait_for_state(timeout):
+			return None
+		return self.poll_player_state()
 
 	def update_remote_player(self, player_id: str, position: Tuple[float, float, float],
 						   health: float, vehicle_data: Optional[Dict] = None):
-		"""Update remote player state through shared memory"""
-		if not self.is_initialized or not self.shared_mem:
-			return
-
-		command = {
-			'type': 'update_player',
-			'player_id': player_id,
-			'state': {
-				'position': {
-					'x': position[0],
-					'y': position[1],
-					'z': position[2]
-				},
-				'health': health
-			}
+		"""Stage a remote player update for the next flush_remote_players"""
+		state = {
+			'position': {
+				'x': position[0],
+				'y': position[1],
+				'z': position[2]
+			},
+			'health': health
 		}
 		
 		if vehicle_data:
-			command['state']['vehicle'] = vehicle_data
+			state['vehicle'] = vehicle_data
 			
-		self.shared_mem.write_command(command)
+		self.queue_remote_player(player_id, state)
+
+	def queue_remote_player(self, player_id: str, state: Dict):
+		"""Stage the latest state of a remote player, newer updates replace older ones"""
+		with self.remote_lock:
+			previous = self.pending_remote.get(player_id)
+			if previous is not None and TRACE_KEY in previous and TRACE_KEY not in state:
+				# Keep a sampled trace on the update that replaces it
+				state[TRACE_KEY] = previous[TRACE_KEY]
+			self.pending_remote[player_id] = state
+			self.pending_removed.discard(player_id)
+
+	def remove_remote_player(self, player_id: str):
+		with self.remote_lock:
+			self.pending_remote.pop(player_id, None)
+			self.pending_removed.add(player_id)
+
+	def flush_remote_players(self) -> int:
+		"""Write every staged remote player change in one batch, returns the number of changes"""
+		with self.memory_lock:
+			if not self.is_initialized or not self.shared_mem:
+				return 0
+
+			with self.remote_lock:
+				if not self.pending_remote and not self.pending_removed:
+					return 0
+				updates, self.pending_remote = self.pending_remote, {}
+				removed, self.pending_removed = self.pending_removed, set()
+
+			written = self.shared_mem.write_remote_players(updates, removed)
+		if written:
+			written_at = time.time()
+			# Traced updates end here, the game picks them up on its next frame
+			for state in updates.values():
+				if TRACE_KEY in state:
+					tracer.record(tracer.stamp(state, HOP_PEER_SHM_WRITE, written_at))
+		return len(updates) + len(removed)
 
 	def _is_admin(self):
 		"""Check if running with admin privileges"""
@@ -136,6 +298,27 @@ class GTAInterface:
 
 	def close(self):
 		"""Clean up resources"""
+		# Cleared first so the sync worker stops touching shared memory, then wait out a tick in flight
+		self.is_initialized = False
+		with self.memory_lock:
+			self._close_shared_memory()
+
+		# Staged players belong to this attach, a later one starts from an empty table
+		with self.remote_lock:
+			self.pending_remote.clear()
+			self.pending_removed.clear()
+
+		if self.dll_injector:
+			self.dll_injector.cleanup()
+
+		self.current_pid = None
+		print("Game interface cleanup completed")
+
+	def _close_shared_memory(self):
+		if self.command_channel:
+			self.command_channel.close()
+			self.command_channel = None
+
 		if self.shared_mem:
 			try:
 				if self.current_pid:
@@ -154,10 +337,3 @@ class GTAInterface:
 			finally:
 				self.shared_mem = None
 
-		if self.dll_injector:
-			self.dll_injector.cleanup()
-
-		self.current_pid = None
-		self.is_initialized = False
-		print("Game interface cleanup completed")
-
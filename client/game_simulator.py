@@ -0,0 +1,238 @@
+"""Pure Python stand-in for the game side of the shared memory protocol.
+
+Plays the part of the DLL and game_hooks.lua: writes a moving local player
+state every frame, drains the command ring, answers console requests on
+the response ring and reads the remote player table the way the game
+would render it. Lets the client pipeline run
+without GTA V, ScriptHookV or DLL injection.
+
+Run with: python -m client.game_simulator [--fps 60] [--attach]
+"""
+import argparse
+import math
+import os
+import threading
+import time
+from collections import deque, Counter
+from typing import Dict, Any, Optional
+from .shared_memory import SharedMemoryInterface
+
+
+class GameSimulator:
+	"""Fake game process driving a SharedMemoryInterface from the game side"""
+
+	def __init__(self, fps: float = 60.0, attach: bool = False, center=(200.0, -800.0, 30.0),
+				 radius: float = 50.0, speed: float = 10.0, backend: Optional[str] = None):
+		self.fps = fps
+		self.attach = attach
+		self.center = center
+		self.radius = radius
+		self.speed = speed  # m/s along the circle
+		self.backend = backend
+
+		self.shared_mem: Optional[SharedMemoryInterface] = None
+		self.running = False
+		self.thread: Optional[threading.Thread] = None
+
+		self.session_active = False
+		self.frames = 0
+		self.command_counts = Counter()
+		self.commands = deque(maxlen=100)  # Most recent commands, oldest first
+		self.remote_players: Dict[str, Dict[str, Any]] = {}  # What the game would be rendering
+		self.remote_updates = 0  # Slot changes observed across frames
+		self.start_time = None
+
+		# Player state the console commands act on
+		self.health = 200.0
+		self.vehicle: Optional[Dict[str, Any]] = None
+		self.waypoint = None
+		self.responses = 0
+		self.handlers = {
+			'teleport': self.cmd_teleport,
+			'spawn_vehicle': self.cmd_spawn_vehicle,
+			'heal': self.cmd_heal,
+			'repair': self.cmd_repair
+		}
+
+	def open(self):
+		self.shared_mem = SharedMemoryInterface(create=not self.attach, backend=self.backend)
+
+	def local_state(self, elapsed: float) -> Dict[str, Any]:
+		"""Local player driving in a circle around center"""
+		omega = self.speed / self.radius
+		angle = elapsed * omega
+		cx, cy, cz = self.center
+		state = {
+			'position': {'x': cx + self.radius * math.cos(angle), 'y': cy + self.radius * math.sin(angle), 'z': cz},
+			'heading': math.degrees(angle + math.pi / 2) % 360,
+			'velocity': {'x': -self.speed * math.sin(angle), 'y': self.speed * math.cos(angle), 'z': 0.0},
+			'health': self.health,
+			'armor': 0.0,
+			'game_time': int(elapsed * 1000)
+		}
+		if self.vehicle:
+			state['vehicle'] = dict(self.vehicle)
+		return state
+
+	def handle_command(self, command: Dict[str, Any]):
+		command_type = command.get('type')
+		self.command_counts[command_type] += 1
+		self.commands.append(command)
+		if command_type in ('initialize', 'start_session'):
+			self.session_active = True
+		elif command_type in ('cleanup', 'stop_session'):
+			self.session_active = False
+
+		# Requests carry an id and expect an answer on the response ring
+		request_id = command.get('id')
+		if request_id is None:
+			return
+		handler = self.handlers.get(command_type)
+		try:
+			if handler is None:
+				raise ValueError(f"Unknown command: {command_type}")
+			response = {'id': request_id, 'ok': True, 'result': handler(command)}
+		except ValueError as e:
+			response = {'id': request_id, 'ok': False, 'error': str(e)}
+		if self.shared_mem.write_response(response):
+			self.responses += 1
+
+	def cmd_teleport(self, command: Dict[str, Any]) -> Dict[str, Any]:
+		target = command.get('position') or self.waypoint
+		if target is None:
+			raise ValueError("No waypoint set")
+		# Keep circling, now around the destination
+		self.center = (target['x'] - self.radius, target['y'], target['z'])
+		return {'message': f"Teleported to {target['x']:.1f}, {target['y']:.1f}, {target['z']:.1f}", 'position': target}
+
+	def cmd_spawn_vehicle(self, command: Dict[str, Any]) -> Dict[str, Any]:
+		name = str(command.get('model', ''))
+		if not name:
+			raise ValueError("No vehicle model given")
+		self.vehicle = {'model': joaat(name), 'health': 1000.0, 'type': name.upper()[:15]}
+		return {'message': f"Spawned {name}", 'model': self.vehicle['model']}
+
+	def cmd_heal(self, command: Dict[str, Any]) -> Dict[str, Any]:
+		self.health = 200.0
+		return {'message': "Health restored", 'health': self.health}
+
+	def cmd_repair(self, command: Dict[str, Any]) -> Dict[str, Any]:
+		if not self.vehicle:
+			raise ValueError("Not in a vehicle")
+		self.vehicle['health'] = 1000.0
+		return {'message': "Vehicle repaired", 'health': self.vehicle['health']}
+
+	def drain_commands(self) -> int:
+		count = 0
+		while True:
+			command = self.shared_mem.read_command()
+			if command is None:
+				return count
+			self.handle_command(command)
+			count += 1
+
+	def frame(self, elapsed: float):
+		self.shared_mem.write_heartbeat(os.getpid())
+		self.shared_mem.write_state(self.local_state(elapsed))
+
+		players = self.shared_mem.read_remote_players()
+		if players is not None:
+			for player_id, state in players.items():
+				previous = self.remote_players.get(player_id)
+				if previous is None or previous['sequence'] != state['sequence']:
+					self.remote_updates += 1
+			self.remote_players = players
+		self.frames += 1
+
+	def run(self, duration: Optional[float] = None):
+		"""Frame loop; commands are consumed as soon as they arrive, like game_hooks.lua"""
+		if self.shared_mem is None:
+			self.open()
+		self.running = True
+		self.start_time = time.monotonic()
+		frame_interval = 1.0 / self.fps
+		next_frame = self.start_time
+		try:
+			while self.running:
+				now = time.monotonic()
+				if duration is not None and now - self.start_time >= duration:
+					break
+				if now >= next_frame:
+					self.frame(now - self.start_time)
+					# Skip frames we were too slow for instead of bursting to catch up
+					next_frame = max(next_frame + frame_interval, now)
+				self.shared_mem.wait_for_command(max(0.0, next_frame - time.monotonic()))
+				self.drain_commands()
+		finally:
+			self.running = False
+
+	def start(self):
+		"""Run the frame loop on a background thread"""
+		if self.shared_mem is None:
+			self.open()
+		self.thread = threading.Thread(target=self.run, daemon=True)
+		self.thread.start()
+
+	def stop(self):
+		self.running = False
+		if self.thread:
+			self.thread.join(timeout=2)
+			self.thread = None
+
+	def close(self):
+		self.stop()
+		if self.shared_mem:
+			self.shared_mem.close()
+			self.shared_mem = None
+
+	def get_stats(self) -> Dict[str, Any]:
+		elapsed = time.monotonic() - self.start_time if self.start_time else 0.0
+		return {
+			'frames': self.frames,
+			'fps': self.frames / elapsed if elapsed > 0 else 0.0,
+			'session_active': self.session_active,
+			'commands': dict(self.command_counts),
+			'remote_players': len(self.remote_players),
+			'remote_updates': self.remote_updates,
+			'responses': self.responses
+		}
+
+
+def joaat(name: str) -> int:
+	"""Jenkins one-at-a-time hash, how the game turns model names into model hashes"""
+	value = 0
+	for byte in name.lower().encode('ascii', 'ignore'):
+		value = (value + byte) & 0xFFFFFFFF
+		value = (value + (value << 10)) & 0xFFFFFFFF
+		value ^= value >> 6
+	value = (value + (value << 3)) & 0xFFFFFFFF
+	value ^= value >> 11
+	return (value + (value << 15)) & 0xFFFFFFFF
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Simulate the game side of the SanSync shared memory protocol")
+	parser.add_argument('--fps', type=float, default=60.0, help="state writes per second")
+	parser.add_argument('--attach', action='store_true', help="attach to a region the client created instead of creating one")
+	parser.add_argument('--duration', type=float, default=None, help="stop after this many seconds")
+	parser.add_argument('--radius', type=float, default=50.0, help="radius of the driven circle in meters")
+	parser.add_argument('--speed', type=float, default=10.0, help="driving speed in m/s")
+	parser.add_argument('--backend', default=None, help="shared memory backend (windows, posix, file)")
+	args = parser.parse_args()
+
+	simulator = GameSimulator(fps=args.fps, attach=args.attach, radius=args.radius,
+							  speed=args.speed, backend=args.backend)
+	simulator.open()
+	print(f"[Simulator] {'Attached to' if args.attach else 'Created'} '{simulator.shared_mem.MEMORY_NAME}' "
+		  f"({simulator.shared_mem.backend.name} backend), pid {os.getpid()}, {args.fps:g} fps")
+	try:
+		simulator.run(args.duration)
+	except KeyboardInterrupt:
+		pass
+	finally:
+		print(f"[Simulator] {simulator.get_stats()}")
+		simulator.close()
+
+
+if __name__ == '__main__':
+	main()
@@ -1,27 +1,362 @@
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, List, Optional, Set
+import heapq
 import json
+import numpy as np
+from common.mission_state import MissionState
 import os
 import time
 
+# GTA5 playable area (approximate), about 8km across
+WORLD_MIN_X = -4000.0
+WORLD_MAX_X = 4000.0
+WORLD_MIN_Y = -4000.0
+WORLD_MAX_Y = 8000.0
+
+
+class SpatialGrid:
+	"""Uniform grid over the X/Y plane for proximity queries.
+
+	Entities are bucketed by their X/Y cell, distances are still compared in 3D.
+	All distance comparisons use squared values, no square roots are taken.
+	"""
+
+	def __init__(self, cell_size: float = 200.0):
+		self.cell_size = cell_size
+		self.cells: Dict[Tuple[int, int], Set[str]] = {}
+		self.entities: Dict[str, Tuple[float, float, float, Tuple[int, int]]] = {}
+
+	def __len__(self):
+		return len(self.entities)
+
+	def __contains__(self, entity_id: str):
+		return entity_id in self.entities
+
+	def _cell(self, x: float, y: float) -> Tuple[int, int]:
+		return (int((x - WORLD_MIN_X) // self.cell_size), int((y - WORLD_MIN_Y) // self.cell_size))
+
+	def update(self, entity_id: str, x: float, y: float, z: float):
+		"""Insert or move an entity"""
+		cell = self._cell(x, y)
+		previous = self.entities.get(entity_id)
+		if previous is not None and previous[3] != cell:
+			self._discard(entity_id, previous[3])
+		if previous is None or previous[3] != cell:
+			self.cells.setdefault(cell, set()).add(entity_id)
+		self.entities[entity_id] = (x, y, z, cell)
+
+	def remove(self, entity_id: str):
+		previous = self.entities.pop(entity_id, None)
+		if previous is not None:
+			self._discard(entity_id, previous[3])
+
+	def _discard(self, entity_id: str, cell: Tuple[int, int]):
+		members = self.cells.get(cell)
+		if members is not None:
+			members.discard(entity_id)
+			if not members:
+				del self.cells[cell]
+
+	def position(self, entity_id: str) -> Optional[Tuple[float, float, float]]:
+		entry = self.entities.get(entity_id)
+		return entry[:3] if entry is not None else None
+
+	def query_radius(self, x: float, y: float, z: float, radius: float,
+					 exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+		"""Entities within radius as (entity_id, squared distance) pairs"""
+		radius_sq = radius * radius
+		min_cx, min_cy = self._cell(x - radius, y - radius)
+		max_cx, max_cy = self._cell(x + radius, y + radius)
+		entities = self.entities
+		result = []
+
+		# Fall back to a full scan when the query box covers more cells than exist
+		if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self.cells):
+			candidates = [self.entities]
+		else:
+			candidates = [
+				self.cells[(cx, cy)]
+				for cx in range(min_cx, max_cx + 1)
+				for cy in range(min_cy, max_cy + 1)
+				if (cx, cy) in self.cells
+			]
+
+		for members in candidates:
+			for entity_id in members:
+				if entity_id == exclude:
+					continue
+				ex, ey, ez, _ = entities[entity_id]
+				dist_sq = (ex - x) ** 2 + (ey - y) ** 2 + (ez - z) ** 2
+				if dist_sq <= radius_sq:
+					result.append((entity_id, dist_sq))
+		return result
+
+	def nearest(self, x: float, y: float, z: float, k: int,
+				exclude: Optional[str] = None, max_radius: Optional[float] = None) -> List[Tuple[str, float]]:
+		"""k nearest entities as (entity_id, squared distance) pairs, closest first"""
+		if k <= 0 or not self.entities:
+			return []
+
+		origin_cx, origin_cy = self._cell(x, y)
+		max_ring = None
+		if max_radius is not None:
+			max_ring = int(max_radius // self.cell_size) + 1
+		max_radius_sq = max_radius * max_radius if max_radius is not None else None
+
+		best = []  # max-heap of (-dist_sq, entity_id)
+		visited = 0
+		ring = 0
+		while max_ring is None or ring <= max_ring:
+			ring_size = 8 * ring if ring else 1
+			if visited + ring_size > len(self.cells):
+				# Sparse grid, scanning every entity is cheaper than walking empty rings
+				return self._nearest_scan(x, y, z, k, exclude, max_radius_sq)
+			visited += ring_size
+
+			for cell in _ring_cells(origin_cx, origin_cy, ring):
+				for entity_id in self.cells.get(cell, ()):
+					if entity_id == exclude:
+						continue
+					ex, ey, ez, _ = self.entities[entity_id]
+					dist_sq = (ex - x) ** 2 + (ey - y) ** 2 + (ez - z) ** 2
+					if max_radius_sq is not None and dist_sq > max_radius_sq:
+						continue
+					if len(best) < k:
+						heapq.heappush(best, (-dist_sq, entity_id))
+					elif dist_sq < -best[0][0]:
+						heapq.heapreplace(best, (-dist_sq, entity_id))
+
+			# Cells beyond the next ring are at least ring * cell_size away in X/Y
+			if len(best) == k and (ring * self.cell_size) ** 2 >= -best[0][0]:
+				break
+			ring += 1
+
+		return sorted(((entity_id, -neg_dist) for neg_dist, entity_id in best), key=lambda item: item[1])
+
+	def _nearest_scan(self, x: float, y: float, z: float, k: int,
+					  exclude: Optional[str], max_radius_sq: Optional[float]) -> List[Tuple[str, float]]:
+		candidates = []
+		for entity_id, (ex, ey, ez, _) in self.entities.items():
+			if entity_id == exclude:
+				continue
+			dist_sq = (ex - x) ** 2 + (ey - y) ** 2 + (ez - z) ** 2
+			if max_radius_sq is None or dist_sq <= max_radius_sq:
+				candidates.append((entity_id, dist_sq))
+		return heapq.nsmallest(k, candidates, key=lambda item: item[1])
+
+	def within(self, first_id: str, second_id: str, radius: float) -> bool:
+		"""True if both entities are known and at most radius apart"""
+		first = self.entities.get(first_id)
+		second = self.entities.get(second_id)
+		if first is None or second is None:
+			return False
+		dist_sq = (first[0] - second[0]) ** 2 + (first[1] - second[1]) ** 2 + (first[2] - second[2]) ** 2
+		return dist_sq <= radius * radius
+
+
+def _ring_cells(cx: int, cy: int, ring: int):
+	"""Cells on the square ring at Chebyshev distance ring around (cx, cy)"""
+	if ring == 0:
+		yield (cx, cy)
+		return
+	for dx in range(-ring, ring + 1):
+		yield (cx + dx, cy - ring)
+		yield (cx + dx, cy + ring)
+	for dy in range(-ring + 1, ring):
+		yield (cx - ring, cy + dy)
+		yield (cx + ring, cy + dy)
+
+
+# Entity kinds in EntityStore
+KIND_PLAYER = 0
+KIND_NPC = 1
+KIND_VEHICLE = 2
+
+
+class EntityStore:
+	"""Columnar store of entity kinematics.
+
+	Position, velocity, health and timestamps live in contiguous NumPy arrays,
+	one row per entity, so distance, map projection and staleness checks run
+	as single vectorized operations. Rows stay packed: removing an entity moves
+	the last row into the freed slot.
+	"""
+
+	def __init__(self, capacity: int = 64):
+		self.ids: List[str] = []
+		self.rows: Dict[str, int] = {}
+		self.position = np.zeros((capacity, 3), dtype=np.float64)
+		self.velocity = np.zeros((capacity, 3), dtype=np.float64)
+		self.health = np.zeros(capacity, dtype=np.float64)
+		self.timestamp = np.zeros(capacity, dtype=np.float64)
+		self.kind = np.zeros(capacity, dtype=np.uint8)
+		self.version = 0  # Bumped on every change, lets readers skip unchanged frames
+
+	def __len__(self):
+		return len(self.ids)
+
+	def __contains__(self, entity_id: str):
+		return entity_id in self.rows
+
+	def _grow(self):
+		capacity = self.position.shape[0] * 2
+		for name in ('position', 'velocity', 'health', 'timestamp', 'kind'):
+			old = getattr(self, name)
+			new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+			new[:len(self.ids)] = old[:len(self.ids)]
+			setattr(self, name, new)
+
+	def upsert(self, entity_id: str, position: Optional[Tuple[float, float, float]] = None,
+			   velocity: Optional[Tuple[float, float, float]] = None, health: Optional[float] = None,
+			   timestamp: Optional[float] = None, kind: int = KIND_PLAYER) -> int:
+		"""Insert or update an entity, fields left as None keep their value"""
+		row = self.rows.get(entity_id)
+		if row is None:
+			row = len(self.ids)
+			if row == self.position.shape[0]:
+				self._grow()
+			self.ids.append(entity_id)
+			self.rows[entity_id] = row
+			self.position[row] = 0.0
+			self.velocity[row] = 0.0
+			self.health[row] = 0.0
+			self.kind[row] = kind
+			if timestamp is None:
+				timestamp = time.time()
+
+		if position is not None:
+			self.position[row] = position
+		if velocity is not None:
+			self.velocity[row] = velocity
+		if health is not None:
+			self.health[row] = health
+		if timestamp is not None:
+			self.timestamp[row] = timestamp
+		self.version += 1
+		return row
+
+	def remove(self, entity_id: str) -> bool:
+		row = self.rows.pop(entity_id, None)
+		if row is None:
+			return False
+
+		last = len(self.ids) - 1
+		if row != last:
+			moved = self.ids[last]
+			self.ids[row] = moved
+			self.rows[moved] = row
+			for array in (self.position, self.velocity, self.health, self.timestamp, self.kind):
+				array[row] = array[last]
+		self.ids.pop()
+		self.version += 1
+		return True
+
+	def get_position(self, entity_id: str) -> Optional[Tuple[float, float, float]]:
+		row = self.rows.get(entity_id)
+		if row is None:
+			return None
+		x, y, z = self.position[row]
+		return (float(x), float(y), float(z))
+
+	def get_health(self, entity_id: str) -> Optional[float]:
+		row = self.rows.get(entity_id)
+		return float(self.health[row]) if row is not None else None
+
+	def get_speed(self, entity_id: str) -> Optional[float]:
+		row = self.rows.get(entity_id)
+		return float(np.linalg.norm(self.velocity[row])) if row is not None else None
+
+	def positions(self) -> np.ndarray:
+		"""View of the (N, 3) position column"""
+		return self.position[:len(self.ids)]
+
+	def distances_sq(self, point: Tuple[float, float, float]) -> np.ndarray:
+		"""Squared distance from point to every entity, indexed by row"""
+		delta = self.position[:len(self.ids)] - np.asarray(point, dtype=np.float64)
+		return np.einsum('ij,ij->i', delta, delta)
+
+	def ids_within(self, point: Tuple[float, float, float], radius: float,
+				   exclude: Optional[str] = None, kind: Optional[int] = None) -> List[str]:
+		mask = self.distances_sq(point) <= radius * radius
+		if kind is not None:
+			mask &= self.kind[:len(self.ids)] == kind
+		if exclude is not None and exclude in self.rows:
+			mask[self.rows[exclude]] = False
+		return [self.ids[row] for row in np.flatnonzero(mask)]
+
+	def map_coordinates(self, bounds: Tuple[float, float, float, float],
+						entity_ids: Optional[List[str]] = None) -> np.ndarray:
+		"""Project X/Y onto a 0-100 map, bounds are (min_x, max_x, min_y, max_y).
+
+		Returns an (N, 2) array in row order, or in entity_ids order if given.
+		Map Y grows downwards, so world Y is inverted.
+		"""
+		min_x, max_x, min_y, max_y = bounds
+		if entity_ids is None:
+			xy = self.position[:len(self.ids), :2]
+		else:
+			xy = self.position[[self.rows[entity_id] for entity_id in entity_ids], :2]
+		result = np.empty_like(xy)
+		result[:, 0] = (xy[:, 0] - min_x) / (max_x - min_x) * 100
+		result[:, 1] = (1 - (xy[:, 1] - min_y) / (max_y - min_y)) * 100
+		return result
+
+	def stale_ids(self, max_age: float, now: Optional[float] = None) -> List[str]:
+		"""Entities whose last update is older than max_age seconds"""
+		if now is None:
+			now = time.time()
+		mask = self.timestamp[:len(self.ids)] < now - max_age
+		return [self.ids[row] for row in np.flatnonzero(mask)]
+
+
+def _vector(data: Optional[Dict[str, float]]) -> Optional[Tuple[float, float, float]]:
+	if not data:
+		return None
+	return (data.get('x', 0.0), data.get('y', 0.0), data.get('z', 0.0))
+
 
 class GameState:
 	def __init__(self):
+		# Raw payloads (vehicle data and other non-numeric fields), kinematics live in the store
 		self.player_states = {}
 		self.vehicles = {}
-		self.missions = {}
+		self.missions = MissionState()
+		self.store = EntityStore()
+		# One grid per entity kind, player queries never see vehicles or NPCs
+		self.spatial_indexes: Dict[int, SpatialGrid] = {KIND_PLAYER: SpatialGrid()}
+		self.spatial_index = self.spatial_indexes[KIND_PLAYER]
 		
+	def update_entity(self, entity_id: str, state: Dict[str, Any], kind: int = KIND_PLAYER):
+		"""Write the numeric fields of a state payload into the store"""
+		position = _vector(state.get('position'))
+		timestamp = state.get('local_timestamp', state.get('timestamp'))
+		self.store.upsert(entity_id, position, _vector(state.get('velocity')), state.get('health'),
+						  timestamp, kind)
+		if position:
+			index = self.spatial_indexes.get(kind)
+			if index is None:
+				index = self.spatial_indexes[kind] = SpatialGrid()
+			index.update(entity_id, *position)
+
 	def update_player_state(self, player_id: str, state: Dict[str, Any]):
 		self.player_states[player_id] = state
+		self.update_entity(player_id, state, KIND_PLAYER)
+		
+	def update_vehicle_state(self, vehicle_id: str, state: Dict[str, Any]):
+		self.vehicles[vehicle_id] = state
+		self.update_entity(vehicle_id, state, KIND_VEHICLE)
+		
+	def remove_entity(self, entity_id: str):
+		self.store.remove(entity_id)
+		for index in self.spatial_indexes.values():
+			index.remove(entity_id)
 		
 	def remove_player(self, player_id: str):
 		if player_id in self.player_states:
 			del self.player_states[player_id]
+		self.remove_entity(player_id)
 			
 	def get_player_position(self, player_id: str) -> Tuple[float, float, float]:
-		if player_id in self.player_states:
-			pos = self.player_states[player_id].get('position', {})
-			return (pos.get('x', 0.0), pos.get('y', 0.0), pos.get('z', 0.0))
-		return (0.0, 0.0, 0.0)
+		return self.store.get_position(player_id) or (0.0, 0.0, 0.0)
 
 class GameSyncManager:
 	def __init__(self):
@@ -62,24 +397,27 @@ class GameSyncManager:
 		self.game_state.remove_player(player_id)
 		# Here we would trigger ScriptHookV to remove the player model
 
+	def get_stale_players(self, max_age: float = 5.0):
+		"""Remote players without an update for max_age seconds"""
+		return [pid for pid in self.game_state.store.stale_ids(max_age)
+				if pid in self.game_state.player_states and pid != self.local_player_id]
+
 	def get_nearby_players(self, radius: float = 100.0) -> Dict[str, Dict[str, Any]]:
 		if not self.local_player_id:
 			return {}
 			
 		local_pos = self.game_state.get_player_position(self.local_player_id)
-		nearby = {}
-		
-		for pid, state in self.game_state.player_states.items():
-			if pid == self.local_player_id:
-				continue
-				
-			pos = self.game_state.get_player_position(pid)
-			# Simple distance check (can be improved with actual GTA5 world coordinates)
-			dist = ((pos[0] - local_pos[0])**2 + 
-				   (pos[1] - local_pos[1])**2 + 
-				   (pos[2] - local_pos[2])**2)**0.5
-				   
-			if dist <= radius:
-				nearby[pid] = state
-				
-		return nearby
\ No newline at end of file
+		states = self.game_state.player_states
+		matches = self.game_state.spatial_index.query_radius(*local_pos, radius, exclude=self.local_player_id)
+		return {pid: states[pid] for pid, _ in matches if pid in states}
+
+	def get_nearest_players(self, count: int, max_radius: Optional[float] = None) -> List[Tuple[str, float]]:
+		"""Closest remote players as (player_id, distance) pairs, closest first"""
+		if not self.local_player_id:
+			return []
+			
+		local_pos = self.game_state.get_player_position(self.local_player_id)
+		matches = self.game_state.spatial_index.nearest(*local_pos, count, exclude=self.local_player_id,
+														max_radius=max_radius)
+		states = self.game_state.player_states
+		return [(pid, dist_sq ** 0.5) for pid, dist_sq in matches if pid in states]
\ No newline at end of file
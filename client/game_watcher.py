@@ -0,0 +1,95 @@
+import os
+import time
+import psutil
+from typing import Optional
+
+# Liveness states reported by GameWatcher.status
+GAME_NOT_RUNNING = 'not_running'
+GAME_RUNNING = 'running'
+GAME_HUNG = 'hung'
+
+
+class GameWatcher:
+	"""Game process liveness without repeated full process scans.
+
+	Once the game process is known only that process is checked:
+	psutil.Process.is_running compares the creation time as well, so a reused
+	pid is not mistaken for the game. The heartbeat the game script bumps
+	every frame tells a hung game from a live one. Scans over every process
+	on the machine only run while no process is known, at most once per
+	scan_interval.
+	"""
+
+	def __init__(self, process_name: Optional[str] = None, scan_interval: Optional[float] = None,
+				 heartbeat_timeout: Optional[float] = None):
+		self.process_name = process_name or os.getenv('PROCESS_NAME', 'GTA5.exe')
+		self.scan_interval = scan_interval if scan_interval is not None else float(os.getenv('GAME_SCAN_INTERVAL', 10))
+		self.heartbeat_timeout = heartbeat_timeout if heartbeat_timeout is not None else float(os.getenv('HEARTBEAT_TIMEOUT', 5))
+
+		self.process: Optional[psutil.Process] = None
+		self.last_scan = None
+		self.scans = 0
+		self.last_heartbeat = None
+		self.last_heartbeat_change = None
+
+	@property
+	def pid(self) -> Optional[int]:
+		return self.process.pid if self.process else None
+
+	def attach(self, pid: int) -> bool:
+		"""Watch a known process from now on"""
+		try:
+			self.process = psutil.Process(pid)
+		except (psutil.NoSuchProcess, psutil.AccessDenied):
+			self.process = None
+			return False
+		self.last_heartbeat = None
+		self.last_heartbeat_change = None
+		return True
+
+	def detach(self):
+		self.process = None
+		self.last_heartbeat = None
+		self.last_heartbeat_change = None
+
+	def find_process(self, force: bool = False) -> Optional[int]:
+		"""Pid of the game, scanning all processes only if none is known and the throttle allows"""
+		if self.process is not None:
+			if self.process.is_running():
+				return self.process.pid
+			self.detach()
+
+		now = time.monotonic()
+		if not force and self.last_scan is not None and now - self.last_scan < self.scan_interval:
+			return None
+		self.last_scan = now
+		self.scans += 1
+
+		try:
+			for proc in psutil.process_iter(['pid', 'name', 'status']):
+				if proc.info['name'] == self.process_name and proc.info['status'] == psutil.STATUS_RUNNING:
+					self.attach(proc.info['pid'])
+					return proc.info['pid']
+		except Exception as e:
+			print(f"Error searching for {self.process_name} process: {e}")
+		return None
+
+	def observe_heartbeat(self, heartbeat: int):
+		"""Record the game side heartbeat counter read from shared memory"""
+		if heartbeat != self.last_heartbeat:
+			self.last_heartbeat = heartbeat
+			self.last_heartbeat_change = time.monotonic()
+
+	def heartbeat_age(self) -> Optional[float]:
+		"""Seconds since the heartbeat last moved, None before the first beat"""
+		if self.last_heartbeat_change is None or not self.last_heartbeat:
+			return None
+		return time.monotonic() - self.last_heartbeat_change
+
+	def status(self) -> str:
+		if self.find_process() is None:
+			return GAME_NOT_RUNNING
+		age = self.heartbeat_age()
+		if age is not None and age > self.heartbeat_timeout:
+			return GAME_HUNG
+		return GAME_RUNNING
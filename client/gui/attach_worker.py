@@ -0,0 +1,100 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+from typing import Optional
+import threading
+
+# Attach stages, in the order the worker runs them
+ATTACH_DISCOVER = "discover"
+ATTACH_INJECT = "inject"
+ATTACH_MAP = "map"
+ATTACH_HANDSHAKE = "handshake"
+ATTACH_READY = "ready"
+ATTACH_FAILED = "failed"
+ATTACH_CANCELLED = "cancelled"
+
+STAGE_LABELS = {
+	ATTACH_DISCOVER: "Looking for GTA5",
+	ATTACH_INJECT: "Injecting",
+	ATTACH_MAP: "Mapping shared memory",
+	ATTACH_HANDSHAKE: "Waiting for game",
+	ATTACH_READY: "Connected",
+	ATTACH_FAILED: "Failed to connect",
+	ATTACH_CANCELLED: "Cancelled"
+}
+
+
+class AttachWorker(QThread):
+	"""Attaches the game interface off the GUI thread.
+
+	Runs discover, inject, map and handshake in order and reports each stage
+	through stage_changed. Every wait checks the cancel event, so cancel()
+	followed by wait() returns within a poll interval.
+	"""
+	stage_changed = pyqtSignal(str)
+	attached = pyqtSignal()
+	failed = pyqtSignal(str)
+
+	def __init__(self, game_interface, discover_attempts: int = 10, retry_interval: float = 1.0, parent=None):
+		super().__init__(parent)
+		self.game_interface = game_interface
+		self.discover_attempts = discover_attempts
+		self.retry_interval = retry_interval
+		self.cancel_event = threading.Event()
+		self.stage = None
+
+	def cancel(self):
+		self.cancel_event.set()
+
+	def run(self):
+		interface = self.game_interface
+		try:
+			interface.last_error = None
+			interface.close()
+
+			if not interface.simulator:
+				self._enter(ATTACH_DISCOVER)
+				pid = self._discover()
+				if not pid:
+					return self._fail()
+
+				self._enter(ATTACH_INJECT)
+				if not interface.inject(pid, self.cancel_event):
+					return self._fail()
+
+			self._enter(ATTACH_MAP)
+			if self.cancel_event.is_set() or not interface.map_shared_memory():
+				return self._fail()
+
+			self._enter(ATTACH_HANDSHAKE)
+			if not interface.handshake(cancel_event=self.cancel_event):
+				return self._fail()
+
+			self._enter(ATTACH_READY)
+			self.attached.emit()
+		except Exception as e:
+			interface.last_error = f"Failed to initialize GTA interface: {e}"
+			print(interface.last_error)
+			self._fail()
+
+	def _discover(self) -> Optional[int]:
+		"""The game may still be starting, so the process scan is retried"""
+		for attempt in range(self.discover_attempts):
+			if self.cancel_event.is_set():
+				return None
+			pid = self.game_interface.discover()
+			if pid:
+				return pid
+			self.cancel_event.wait(self.retry_interval)
+		return None
+
+	def _enter(self, stage: str):
+		self.stage = stage
+		self.stage_changed.emit(stage)
+
+	def _fail(self):
+		self.game_interface.close()
+		if self.cancel_event.is_set():
+			self.game_interface.last_error = "Attach cancelled"
+			self._enter(ATTACH_CANCELLED)
+		else:
+			self._enter(ATTACH_FAILED)
+		self.failed.emit(self.game_interface.last_error or "Unknown error")
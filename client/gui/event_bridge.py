@@ -0,0 +1,128 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal, Qt
+from collections import deque
+from typing import Dict, Any
+import os
+import time
+from common.tracing import TRACE_KEY
+
+
+class EventBridge(QObject):
+	"""Hands network events from the socket thread to the GUI thread.
+
+	post_* are called on the socket or sync worker thread and never touch
+	Qt widgets. Sync updates land in a latest-per-player mailbox,
+	joins and leaves in an ordered queue. The first post after a drain emits
+	one queued signal; the GUI thread then drains everything at most
+	EVENT_BRIDGE_FPS times a second, so UI work per frame is bounded by the
+	number of players, not by how fast updates arrive.
+
+	Lock free under the GIL: dict item stores, dict.pop and deque
+	append/popleft are atomic, and the drain pops entries instead of swapping
+	the mailbox, so an update posted mid-drain is kept for the next frame.
+	"""
+	wakeup = pyqtSignal()
+	player_joined = pyqtSignal(str, dict)
+	player_left = pyqtSignal(str)
+	updates_ready = pyqtSignal(dict)  # player_id -> latest state, once per frame
+	local_state_ready = pyqtSignal(str, dict)  # Latest local sample from the sync worker
+	status_changed = pyqtSignal(str)
+
+	def __init__(self, parent=None, max_fps: float = None):
+		super().__init__(parent)
+		self.max_fps = max_fps if max_fps is not None else float(os.getenv('EVENT_BRIDGE_FPS', 30))
+		self.latest: Dict[str, Dict[str, Any]] = {}
+		self.membership = deque()  # ('joined' | 'left', player_id, data) in arrival order
+		self.local = None  # (player_id, state), replaced as a whole, a skipped sample is only a skipped repaint
+		self.status = deque(maxlen=1)  # Latest status text, never lost to a concurrent drain
+		self.scheduled = False
+		self.last_drain = 0.0
+
+		# Counters for the coalescing ratio
+		self.posted = 0
+		self.delivered = 0
+		self.drains = 0
+
+		self.drain_timer = QTimer(self)
+		self.drain_timer.setSingleShot(True)
+		self.drain_timer.timeout.connect(self.drain)
+		# Emitted from the socket thread, always runs on the bridge's thread
+		self.wakeup.connect(self._schedule_drain, Qt.ConnectionType.QueuedConnection)
+
+	def post_update(self, data: Dict[str, Any]):
+		"""Socket thread: keep only the newest state per player"""
+		player_id = data['player_id']
+		previous = self.latest.get(player_id)
+		if previous is not None and TRACE_KEY in previous and TRACE_KEY not in data:
+			# A sampled trace survives coalescing on the update that replaced it
+			data[TRACE_KEY] = previous[TRACE_KEY]
+		self.latest[player_id] = data
+		self.posted += 1
+		self._wake()
+
+	def post_joined(self, data: Dict[str, Any]):
+		self.membership.append(('joined', data['player_id'], data))
+		self._wake()
+
+	def post_left(self, data: Dict[str, Any]):
+		player_id = data['player_id']
+		# Anything still waiting for this player predates the leave
+		self.latest.pop(player_id, None)
+		self.membership.append(('left', player_id, None))
+		self._wake()
+
+	def post_local(self, player_id: str, state: Dict[str, Any]):
+		"""Sync worker thread: newest local player sample, for display only"""
+		self.local = (player_id, state)
+		self._wake()
+
+	def post_status(self, text: str):
+		self.status.append(text)
+		self._wake()
+
+	def _wake(self):
+		if not self.scheduled:
+			self.scheduled = True
+			self.wakeup.emit()
+
+	def _schedule_drain(self):
+		if self.drain_timer.isActive():
+			return
+		delay = self.last_drain + 1.0 / self.max_fps - time.monotonic()
+		self.drain_timer.start(max(0, int(delay * 1000)))
+
+	def drain(self):
+		"""GUI thread: deliver membership changes in order, then the latest state per player"""
+		# Cleared first, a post from now on schedules the next frame
+		self.scheduled = False
+		self.last_drain = time.monotonic()
+
+		while self.membership:
+			kind, player_id, data = self.membership.popleft()
+			if kind == 'joined':
+				self.player_joined.emit(player_id, data)
+			else:
+				self.player_left.emit(player_id)
+
+		local, self.local = self.local, None
+		if local is not None:
+			self.local_state_ready.emit(*local)
+		while self.status:
+			self.status_changed.emit(self.status.popleft())
+
+		updates = {}
+		for player_id in list(self.latest):
+			data = self.latest.pop(player_id, None)
+			if data is not None:
+				updates[player_id] = data
+		if updates:
+			self.delivered += len(updates)
+			self.updates_ready.emit(updates)
+		self.drains += 1
+
+	def get_stats(self) -> Dict[str, int]:
+		return {
+			'posted': self.posted,
+			'delivered': self.delivered,
+			'coalesced': self.posted - self.delivered - len(self.latest),
+			'drains': self.drains
+		}
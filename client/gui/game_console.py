@@ -3,16 +3,18 @@ from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QKeyEvent, QColor, QPalette
 import keyboard
 import os
-from dotenv import load_dotenv
+from ..config import load_config
 
 class GameConsole(QWidget):
 	command_executed = pyqtSignal(str)  # Signal emitted when a command is executed
+	result_received = pyqtSignal(str, str)  # Message and color, emitted from any thread
 
 	def __init__(self, parent=None):
 		super().__init__(parent)
 		self.setWindowFlags(Qt.WindowType.Tool | Qt.WindowType.FramelessWindowHint)
-		load_dotenv()
+		load_config()
 		self.setup_ui()
+		self.result_received.connect(self.print_message)
 		self.commands = {
 			'help': self.cmd_help,
 			'clear': self.cmd_clear,
@@ -113,6 +115,15 @@ class GameConsole(QWidget):
 		self.output.setTextColor(QColor(color))
 		self.output.append(message)
 
+	def report_result(self, command: str, future):
+		"""Print the outcome of an asynchronous game command, safe to call from any thread"""
+		error = future.exception()
+		if error is not None:
+			self.result_received.emit(f"{command}: {error}", "red")
+			return
+		result = future.result() or {}
+		self.result_received.emit(f"{command}: {result.get('message', 'done')}", "#55ff55")
+
 	def execute_command(self):
 		command = self.input.text().strip()
 		if not command:
@@ -168,6 +179,11 @@ Console Commands:
   help   - Show this help message
   clear  - Clear console output
   exit   - Hide console
+  netstat - Toggle the network statistics panel
+  profile [on|off|reset] - Sync pipeline stage timings
+  profile capture [seconds] [sample|cprofile] - Write a profile to a file
+  trace [on|off|reset] - Per-hop latency of sampled updates
+  trace export [json|chrome] [path] - Write recorded traces to a file
 
 Game Commands:
   tp [x y z]      - Teleport to coordinates or waypoint if no coords given
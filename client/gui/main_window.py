@@ -3,18 +3,24 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
 						   QLineEdit, QMessageBox, QDialog)
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QIcon, QPixmap
-import psutil
 import os
+import tempfile
 import time
-from dotenv import load_dotenv
 from typing import Dict, List
-from ..network_client import GTACoopClient
+from common.profiling import profiler, STAGE_APPLY
+from common.tracing import tracer
+from ..config import load_config, startup
 from ..game_interface import GTAInterface
-from .map_widget import MapWidget
+from ..sync_worker import SyncWorker
+from ..game_watcher import GAME_RUNNING, GAME_HUNG, GAME_NOT_RUNNING
+from ..game_sync import GameSyncManager
+from ..mission_sync import MissionSync
 from .session_widget import SessionWidget
 from .player_list_widget import PlayerListWidget
 from .settings_dialog import SettingsDialog
-from .game_console import GameConsole
+from .net_stats_widget import NetStatsWidget
+from .event_bridge import EventBridge
+from .attach_worker import AttachWorker, STAGE_LABELS, ATTACH_CANCELLED
 
 class MainWindow(QMainWindow):
 	def __init__(self):
@@ -23,27 +29,96 @@ class MainWindow(QMainWindow):
 		self.setMinimumSize(1200, 800)
 		
 		# Load environment variables
-		load_dotenv()
+		load_config()
 		
-		# Initialize interfaces
-		self.network_client = GTACoopClient()
+		# Initialize interfaces, the DLL injector is only created on the first attach
 		self.game_interface = GTAInterface()
+		self.attach_worker = None
+		
+		# Single source of player state for sync and every UI consumer
+		self.sync_manager = GameSyncManager()
+		
+		# Network events reach the widgets and shared memory only through the bridge, on this thread
+		self.event_bridge = EventBridge(self)
+		self.event_bridge.player_joined.connect(self.on_player_joined)
+		self.event_bridge.player_left.connect(self.on_player_left)
+		self.event_bridge.updates_ready.connect(self.on_sync_updates)
+		self.event_bridge.local_state_ready.connect(self.on_local_state)
+		self.event_bridge.status_changed.connect(self.on_sync_status)
 		
-		# Register network callbacks
-		self.network_client.register_callback('player_joined', self.on_player_joined)
-		self.network_client.register_callback('player_left', self.on_player_left)
-		self.network_client.register_callback('sync_update', self.on_sync_update)
+		# Created by the startup steps once the window has been painted
+		self.network_client = None
+		self.mission_sync = None
+		self.map_widget = None
+		self.game_console = None
+		self.sync_worker = None
+		self.startup_steps = [self.start_map, self.start_network, self.start_console, self.start_game_monitor]
+		self.startup_begun = False
 		
 		self.init_ui()
-		self.init_timers()
+
+	def paintEvent(self, event):
+		super().paintEvent(event)
+		if not self.startup_begun:
+			self.startup_begun = True
+			startup.mark("first paint")
+			# Let the first frame reach the screen before loading anything heavy
+			QTimer.singleShot(0, self.run_startup_step)
+			
+	def run_startup_step(self):
+		"""Run one deferred startup step per event loop turn so the window stays responsive"""
+		step = self.startup_steps.pop(0)
+		with startup.stage(step.__name__.replace('_', ' ')):
+			step()
+		if self.startup_steps:
+			QTimer.singleShot(0, self.run_startup_step)
+		else:
+			startup.mark("ready")
+			startup.report()
+			
+	def start_map(self):
+		# Before the network, so every player callback finds the map
+		self.map_widget = self._create_map_widget()
+		self._replace_placeholder(self.map_placeholder, self.map_widget)
 		
-		# Initialize game console
+	def start_network(self):
+		from ..network_client import GTACoopClient
+		self.network_client = GTACoopClient()
+		self.mission_sync = MissionSync(self.network_client, self.sync_manager.game_state.missions)
+		
+		# Register network callbacks, they run on the socket thread
+		self.network_client.register_callback('player_joined', self.event_bridge.post_joined)
+		self.network_client.register_callback('player_left', self.event_bridge.post_left)
+		self.network_client.register_callback('sync_update', self.event_bridge.post_update)
+		
+		self.session_widget = SessionWidget(self.network_client)
+		self._replace_placeholder(self.session_placeholder, self.session_widget)
+		self.net_stats = NetStatsWidget(self.network_client)
+		self.net_stats.hide()
+		self.left_layout.addWidget(self.net_stats)
+		self.net_stats_button.setEnabled(True)
+		
+	def start_console(self):
+		from .game_console import GameConsole
 		self.game_console = GameConsole(self)
 		self.game_console.command_executed.connect(self.handle_console_command)
 		self.game_console.hide()
 		
+	def start_game_monitor(self):
+		self.init_timers()
+		
+		# Uploads run on their own thread and keep going while a dialog blocks this one
+		self.sync_worker = SyncWorker(self.game_interface, self.network_client,
+									  publish=self.event_bridge.post_local, status=self.event_bridge.post_status)
+		self.sync_worker.start()
+		
 		# Start status monitoring
 		self.check_game_status()
+		
+	def _replace_placeholder(self, placeholder: QWidget, widget: QWidget):
+		layout = placeholder.parentWidget().layout()
+		layout.replaceWidget(placeholder, widget)
+		placeholder.deleteLater()
 
 	
 	def check_gta_path(self) -> bool:
@@ -61,7 +136,8 @@ class MainWindow(QMainWindow):
 		result = dialog.exec()
 		if result == QDialog.DialogCode.Accepted:
 			# Reload hotkey after settings change
-			self.game_console.register_hotkey()
+			if self.game_console:
+				self.game_console.register_hotkey()
 		elif first_run:
 			QMessageBox.critical(
 				self,
@@ -80,12 +156,12 @@ class MainWindow(QMainWindow):
 		left_panel = QWidget()
 		left_layout = QVBoxLayout(left_panel)
 		
-		# Session controls
-		self.session_widget = SessionWidget(self.network_client)
-		left_layout.addWidget(self.session_widget)
+		# Session controls, replaced once the network client is loaded
+		self.session_placeholder = QLabel("Loading network...")
+		left_layout.addWidget(self.session_placeholder)
 		
 		# Player list
-		self.player_list = PlayerListWidget()
+		self.player_list = PlayerListWidget(self.sync_manager)
 		left_layout.addWidget(self.player_list)
 		
 		# Game status
@@ -99,15 +175,23 @@ class MainWindow(QMainWindow):
 		self.sync_status = QLabel("Sync Status: Not Connected")
 		left_layout.addWidget(self.sync_status)
 		
+		# Network statistics, hidden until requested
+		self.net_stats_button = QPushButton("Show Network Stats")
+		self.net_stats_button.clicked.connect(self.toggle_net_stats)
+		self.net_stats_button.setEnabled(False)
+		left_layout.addWidget(self.net_stats_button)
+		self.left_layout = left_layout
+		
 		main_layout.addWidget(left_panel)
 		
 		# Right panel for map and game info
 		right_panel = QWidget()
 		right_layout = QVBoxLayout(right_panel)
 		
-		# Map widget
-		self.map_widget = MapWidget()
-		right_layout.addWidget(self.map_widget)
+		# Map widget, the renderer is loaded after the first paint
+		self.map_placeholder = QLabel("Loading map...")
+		self.map_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+		right_layout.addWidget(self.map_placeholder)
 		
 		main_layout.addWidget(right_panel)
 		
@@ -116,17 +200,21 @@ class MainWindow(QMainWindow):
 		main_layout.setStretch(1, 2)  # Right panel
 
 		
+	def _create_map_widget(self):
+		"""MAP_BACKEND picks the renderer, only the chosen one is imported"""
+		store = self.sync_manager.game_state.store
+		if os.getenv('MAP_BACKEND', 'web').lower() == 'native':
+			from .native_map_widget import NativeMapWidget
+			return NativeMapWidget(store)
+		from .map_widget import MapWidget
+		return MapWidget(store)
+		
 	def init_timers(self):
 		# Game status check timer
 		self.game_check_timer = QTimer()
 		self.game_check_timer.timeout.connect(self.check_game_status)
 		self.game_check_timer.start(5000)  # Check every 5 seconds
 		
-		# Game state sync timer
-		self.sync_timer = QTimer()
-		self.sync_timer.timeout.connect(self.sync_game_state)
-		self.sync_timer.start(100)  # Sync every 100ms
-		
 	def launch_game(self):
 		"""Launch GTA5 through Rockstar Games Launcher"""
 		try:
@@ -163,58 +251,50 @@ class MainWindow(QMainWindow):
 			QMessageBox.critical(self, "Launch Error", f"Failed to launch game: {str(e)}")
 			
 	def _initialize_game_interface(self):
-		"""Initialize connection to GTA5 process"""
-		try:
-			retry_count = 0
-			max_retries = 10  # Try for 10 seconds
-			
-			while retry_count < max_retries:
-				if self.game_interface.initialize():
-					self.sync_status.setText("Sync Status: Connected")
-					QMessageBox.information(self, "Success", "Game interface loaded successfully")
-					return True
-					
-				# Check if initialization failed due to missing ScriptHookV
-				if "Missing required file: ScriptHookV.dll" in self.game_interface.last_error:
-					QMessageBox.critical(self, "Missing Dependencies",
-						"ScriptHookV is not installed. Please check the README.md file for installation instructions.")
-					return False
-				elif "Missing required file: ScriptHookVDotNet" in self.game_interface.last_error:
-					QMessageBox.critical(self, "Missing Dependencies",
-						"ScriptHookVDotNet is not installed. Please check the README.md file for installation instructions.")
-					return False
-					
-				retry_count += 1
-				time.sleep(1)
-			
-			self.sync_status.setText("Sync Status: Failed to connect")
-			QMessageBox.warning(self, "Connection Error", 
-							  "Failed to connect to GTA5 process after multiple attempts.")
+		"""Start attaching to GTA5 in the background, progress is reported through signals"""
+		if self.attach_worker is not None and self.attach_worker.isRunning():
 			return False
-			
-		except Exception as e:
-			self.sync_status.setText(f"Sync Status: Error - {str(e)}")
-			QMessageBox.critical(self, "Error", 
-							   f"Failed to initialize game interface: {str(e)}")
+		if not self.game_interface.check_admin():
 			return False
-			
+
+		self.attach_worker = AttachWorker(self.game_interface, parent=self)
+		self.attach_worker.stage_changed.connect(self.on_attach_stage)
+		self.attach_worker.attached.connect(self.on_game_attached)
+		self.attach_worker.failed.connect(self.on_attach_failed)
+		self.attach_worker.start()
+		return True
+
+	def on_attach_stage(self, stage: str):
+		self.sync_status.setText(f"Sync Status: {STAGE_LABELS[stage]}")
+
+	def on_game_attached(self):
+		QMessageBox.information(self, "Success", "Game interface loaded successfully")
+
+	def on_attach_failed(self, error: str):
+		if self.attach_worker.stage == ATTACH_CANCELLED:
+			return
+		# Check if initialization failed due to missing ScriptHookV
+		if "Missing required file: ScriptHookV.dll" in error:
+			QMessageBox.critical(self, "Missing Dependencies",
+				"ScriptHookV is not installed. Please check the README.md file for installation instructions.")
+		elif "Missing required file: ScriptHookVDotNet" in error:
+			QMessageBox.critical(self, "Missing Dependencies",
+				"ScriptHookVDotNet is not installed. Please check the README.md file for installation instructions.")
+		else:
+			QMessageBox.warning(self, "Connection Error",
+							  f"Failed to connect to GTA5 process: {error}")
+
 	def is_game_running(self) -> bool:
 		"""Check if GTA5 is running"""
-		try:
-			process_name = os.getenv('PROCESS_NAME', 'GTA5.exe')
-			for proc in psutil.process_iter(['name', 'status']):
-				if proc.info['name'] == process_name and proc.info['status'] == psutil.STATUS_RUNNING:
-					return True
-			return False
-		except Exception as e:
-			print(f"Error checking game status: {e}")
-			return False
+		return self.game_interface.game_status() != GAME_NOT_RUNNING
 
 	def check_game_status(self):
 		"""Check GTA5 process status and update UI"""
 		try:
-			is_running = self.is_game_running()
-			self.game_status.setText(f"Game: {'Running' if is_running else 'Not Running'}")
+			status = self.game_interface.game_status()
+			is_running = status != GAME_NOT_RUNNING
+			labels = {GAME_RUNNING: "Running", GAME_HUNG: "Not Responding", GAME_NOT_RUNNING: "Not Running"}
+			self.game_status.setText(f"Game: {labels[status]}")
 			
 			# Check if game interface needs cleanup
 			if not is_running and self.game_interface.is_initialized:
@@ -229,69 +309,157 @@ class MainWindow(QMainWindow):
 			print(f"Error checking game status: {e}")
 			self.sync_status.setText("Sync Status: Error")
 			
-	def sync_game_state(self):
-		"""Synchronize game state with other players"""
-		if not self.game_interface.is_initialized:
-			return
+	def on_local_state(self, local_id: str, state: Dict):
+		"""Display the newest local sample, uploading already happened on the sync worker"""
+		if self.sync_manager.local_player_id != local_id:
+			self.sync_manager.set_local_player(local_id)
+		self.sync_manager.game_state.update_player_state(local_id, state)
+		
+		# Update local UI
+		if 'position' in state:
+			self.map_widget.update_player_position(local_id)
 			
-		try:
-			# Get local player state through shared memory
-			state = self.game_interface.get_player_state()
-			if state:
-				# Send state update to server
-				self.network_client.send_player_update(state)
-				
-				# Update local UI
-				if 'position' in state:
-					self.map_widget.update_player_position(
-						self.network_client.local_player_id,
-						state['position']
-					)
-		except Exception as e:
-			print(f"Failed to sync game state: {e}")
-			self.sync_status.setText(f"Sync Status: Error - {str(e)}")
+	def on_sync_status(self, text: str):
+		self.sync_status.setText(text)
 
 		
-	def on_player_joined(self, data: Dict):
-		self.player_list.add_player(data['player_id'])
-		self.map_widget.add_player_marker(data['player_id'])
+	def on_player_joined(self, player_id: str, data: Dict):
+		self.player_list.add_player(player_id)
+		self.map_widget.add_player_marker(player_id)
 		
-	def on_player_left(self, data: Dict):
-		self.player_list.remove_player(data['player_id'])
-		self.map_widget.remove_player_marker(data['player_id'])
+	def on_player_left(self, player_id: str):
+		self.sync_manager.handle_player_disconnect(player_id)
+		self.game_interface.remove_remote_player(player_id)
+		self.player_list.remove_player(player_id)
+		self.map_widget.remove_player_marker(player_id)
 		
-	def on_sync_update(self, data: Dict):
-		"""Handle state updates from other players"""
-		if not self.game_interface.is_initialized:
-			return
-			
-		try:
-			# Update game state for remote player
-			self.game_interface.update_remote_player(
-				data['player_id'],
-				(data['position']['x'], data['position']['y'], data['position']['z']),
-				data['health'],
-				data.get('vehicle')
-			)
-			
-			# Update UI
-			self.map_widget.update_player_position(data['player_id'], data['position'])
-			self.player_list.update_player_info(data['player_id'], data)
-			
-		except Exception as e:
-			print(f"Failed to handle sync update: {e}")
+	def on_sync_updates(self, updates: Dict[str, Dict]):
+		"""Handle the latest state of every player that sent one since the last frame"""
+		timing = profiler.enabled
+		if timing:
+			start = time.perf_counter()
+		for player_id, data in updates.items():
+			try:
+				self.sync_manager.handle_remote_update(player_id, data)
+				if self.game_interface.is_initialized:
+					# Stage the remote player for the next slot table flush
+					self.game_interface.queue_remote_player(player_id, data)
+				
+				# Update UI
+				self.map_widget.update_player_position(player_id)
+				self.player_list.update_player_info(player_id)
+				
+			except Exception as e:
+				print(f"Failed to handle sync update: {e}")
+		if timing:
+			profiler.lap(STAGE_APPLY, start)
+		
+	def toggle_net_stats(self):
+		"""Show or hide the network statistics panel"""
+		visible = not self.net_stats.isVisible()
+		self.net_stats.setVisible(visible)
+		self.net_stats_button.setText("Hide Network Stats" if visible else "Show Network Stats")
 		
 	def handle_console_command(self, command: str):
 		"""Handle commands from the game console"""
+		if command.split()[0].lower() == 'netstat':
+			if self.net_stats.isVisible():
+				self.game_console.print_message(self.net_stats.format_summary())
+			self.toggle_net_stats()
+			return
+		if command.split()[0].lower() == 'profile':
+			self.handle_profile_command(command.split()[1:])
+			return
+		if command.split()[0].lower() == 'trace':
+			self.handle_trace_command(command.split()[1:])
+			return
+			
 		if self.game_interface.is_initialized:
-			result = self.game_interface.execute_console_command(command)
-			self.game_console.print_message(result)
+			try:
+				future = self.game_interface.execute_console_command(command)
+			except ValueError as e:
+				self.game_console.print_message(f"Error: {e}", "red")
+				return
+			# Resolved by the command channel thread, the console marshals the result to the GUI thread
+			future.add_done_callback(lambda done: self.game_console.report_result(command, done))
 		else:
 			self.game_console.print_message("Error: Game not running", "red")
 			
+	def handle_profile_command(self, args: List[str]):
+		"""profile [on|off|reset|capture [seconds] [sample|cprofile]], no argument prints the stage report"""
+		action = args[0].lower() if args else 'report'
+		if action == 'on':
+			profiler.enable()
+			self.game_console.print_message("Profiling enabled")
+		elif action == 'off':
+			profiler.disable()
+			self.game_console.print_message("Profiling disabled")
+		elif action == 'reset':
+			profiler.reset()
+			self.game_console.print_message("Profiling histograms cleared")
+		elif action == 'capture':
+			try:
+				seconds = float(args[1]) if len(args) > 1 else 5.0
+				mode = args[2].lower() if len(args) > 2 else 'sample'
+				capture = profiler.start_capture(seconds, mode)
+			except (ValueError, RuntimeError) as e:
+				self.game_console.print_message(f"Error: {e}", "red")
+				return
+			self.game_console.print_message(f"Capturing {mode} profile for {seconds:g} s")
+			# cProfile only follows the thread that enabled it, which is this one, so it is stopped from here too
+			def finish():
+				self.game_console.print_message(f"Profile written to {capture.stop()}", "#55ff55")
+			QTimer.singleShot(int(seconds * 1000), finish)
+		elif action == 'report':
+			self.game_console.print_message(profiler.format_report())
+		else:
+			self.game_console.print_message("Usage: profile [on|off|reset|capture [seconds] [sample|cprofile]]", "red")
+			
+	def handle_trace_command(self, args: List[str]):
+		"""trace [on|off|reset|export [json|chrome] [path]], no argument prints the per-hop report"""
+		action = args[0].lower() if args else 'report'
+		if action == 'on':
+			tracer.enabled = True
+			self.game_console.print_message(f"Tracing every {tracer.sample_every}th update")
+		elif action == 'off':
+			tracer.enabled = False
+			self.game_console.print_message("Tracing disabled")
+		elif action == 'reset':
+			tracer.reset()
+			self.game_console.print_message("Traces cleared")
+		elif action == 'export':
+			export_format = args[1].lower() if len(args) > 1 else 'chrome'
+			if export_format not in ('json', 'chrome'):
+				self.game_console.print_message("Usage: trace export [json|chrome] [path]", "red")
+				return
+			path = args[2] if len(args) > 2 else os.path.join(
+				os.getenv('SANSYNC_PROFILE_DIR') or tempfile.gettempdir(),
+				f"sansync-trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+			try:
+				count = tracer.export_json(path) if export_format == 'json' else tracer.export_chrome(path)
+			except OSError as e:
+				self.game_console.print_message(f"Error: {e}", "red")
+				return
+			self.game_console.print_message(f"{count} traces written to {path}", "#55ff55")
+		elif action == 'report':
+			self.game_console.print_message(tracer.format_report())
+		else:
+			self.game_console.print_message("Usage: trace [on|off|reset|export [json|chrome] [path]]", "red")
+			
 	def closeEvent(self, event):
 		"""Handle application close"""
 		try:
+			# Stop an attach in progress before tearing the interface down
+			if self.attach_worker is not None and self.attach_worker.isRunning():
+				print("Cancelling game attach...")
+				self.attach_worker.cancel()
+				self.attach_worker.wait(5000)
+			
+			# Stop uploads before the shared memory they read goes away
+			if self.sync_worker:
+				print("Stopping sync worker...")
+				self.sync_worker.stop()
+
 			# Clean up game interface
 			if self.game_interface.is_initialized:
 				print("Cleaning up game interface...")
@@ -0,0 +1,76 @@
+import json
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# A move smaller than this on screen is not worth a DOM update
+MIN_MOVE_PIXELS = 0.5
+
+MarkerUpdate = Tuple[List[str], List[float], List[str]]  # ids, flat x/y percents, removed ids
+
+
+class MarkerBatch:
+	"""Dirty tracking for map markers, drained once per display frame.
+
+	Marker changes between two flushes collapse into one update carrying a
+	flat coordinate array. Positions are map percents; a marker whose move
+	since the last flushed position is under min_pixels on screen is left
+	out of the batch.
+	"""
+
+	def __init__(self, min_pixels: float = MIN_MOVE_PIXELS):
+		self.min_pixels = min_pixels
+		self.sent: Dict[str, Tuple[float, float]] = {}  # Last flushed position per marker
+		self.dirty = set()
+		self.removed = set()
+		self.skipped = 0  # Sub-pixel moves left out of a batch
+
+	@property
+	def pending(self) -> bool:
+		return bool(self.dirty or self.removed)
+
+	def mark(self, marker_id: str):
+		self.dirty.add(marker_id)
+
+	def remove(self, marker_id: str):
+		self.dirty.discard(marker_id)
+		if self.sent.pop(marker_id, None) is not None:
+			self.removed.add(marker_id)
+
+	def take(self, store, bounds: Tuple[float, float, float, float],
+			 width: int, height: int) -> Optional[MarkerUpdate]:
+		"""Collect everything changed since the last call, None if nothing needs drawing"""
+		ids = [marker_id for marker_id in self.dirty if marker_id in store]
+		self.dirty.clear()
+		removed = list(self.removed)
+		self.removed.clear()
+
+		if ids:
+			coords = store.map_coordinates(bounds, ids)
+			previous = np.array([self.sent.get(marker_id, (np.nan, np.nan)) for marker_id in ids])
+			scale = np.array([max(width, 1), max(height, 1)]) / 100
+			moved = np.abs(coords - previous) * scale
+			# NaN marks a marker the view has not drawn yet
+			keep = np.isnan(moved[:, 0]) | (moved >= self.min_pixels).any(axis=1)
+			self.skipped += len(ids) - int(keep.sum())
+			ids = [marker_id for marker_id, flag in zip(ids, keep) if flag]
+			coords = np.round(coords[keep], 2)
+			for marker_id, (x, y) in zip(ids, coords.tolist()):
+				self.sent[marker_id] = (x, y)
+			flat = coords.ravel().tolist()
+		else:
+			flat = []
+
+		if not ids and not removed:
+			return None
+		return ids, flat, removed
+
+	def clear(self):
+		self.sent.clear()
+		self.dirty.clear()
+		self.removed.clear()
+
+
+def batch_script(update: MarkerUpdate) -> str:
+	"""One applyMarkerBatch call for map.html"""
+	ids, coords, removed = update
+	return f"applyMarkerBatch({json.dumps(ids)},{json.dumps(coords)},{json.dumps(removed)});"
@@ -1,15 +1,35 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout
 from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtCore import QUrl, pyqtSlot
-import json
+from PyQt6.QtCore import QUrl, QTimer, pyqtSlot
 import os
-from typing import Dict, Tuple
+import time
+from typing import Dict, Tuple, Optional
+from common.profiling import profiler, STAGE_UI_MAP
+from ..game_sync import EntityStore
+from .map_batch import MarkerBatch, batch_script
 
 class MapWidget(QWidget):
-	def __init__(self):
+	# GTA5 map boundaries (approximate) covered by the map image
+	GTA_MIN_X = -4000
+	GTA_MAX_X = 4000
+	GTA_MIN_Y = -4000
+	GTA_MAX_Y = 4000
+	MAP_BOUNDS = (GTA_MIN_X, GTA_MAX_X, GTA_MIN_Y, GTA_MAX_Y)
+
+	def __init__(self, store: EntityStore):
 		super().__init__()
 		self.init_ui()
-		self.players = {}
+		self.store = store  # Positions are read from the shared entity store
+		self.markers = set()
+		
+		# Marker changes are coalesced and pushed to the page at most max_fps times a second
+		self.batch = MarkerBatch()
+		self.max_fps = float(os.getenv('MAP_MAX_FPS', 30))
+		self.last_flush = 0.0
+		self.flushes = 0
+		self.flush_timer = QTimer(self)
+		self.flush_timer.setSingleShot(True)
+		self.flush_timer.timeout.connect(self.flush)
 		
 	def init_ui(self):
 		layout = QVBoxLayout(self)
@@ -25,51 +45,45 @@ class MapWidget(QWidget):
 		layout.addWidget(self.web_view)
 		
 	def add_player_marker(self, player_id: str):
-		"""Add a new player marker to the map"""
-		script = f"""
-		addPlayerMarker('{player_id}', 0, 0);
-		"""
-		self.web_view.page().runJavaScript(script)
-		self.players[player_id] = (0, 0)
+		"""Add a new player marker to the map, drawn once the player has a position"""
+		self.markers.add(player_id)
+		self.batch.mark(player_id)
+		self._schedule_flush()
 		
 	def remove_player_marker(self, player_id: str):
 		"""Remove a player marker from the map"""
-		if player_id in self.players:
-			script = f"""
-			removePlayerMarker('{player_id}');
-			"""
-			self.web_view.page().runJavaScript(script)
-			del self.players[player_id]
+		if player_id in self.markers:
+			self.markers.discard(player_id)
+			self.batch.remove(player_id)
+			self._schedule_flush()
 			
-	def update_player_position(self, player_id: str, position: Dict[str, float]):
-		"""Update player marker position on the map"""
-		if player_id in self.players:
-			# Convert GTA5 coordinates to map coordinates
-			x = self._convert_x_coordinate(position['x'])
-			y = self._convert_y_coordinate(position['y'])
+	def update_player_position(self, player_id: str):
+		"""Queue a marker move to its position in the entity store"""
+		if player_id in self.markers:
+			self.batch.mark(player_id)
+			self._schedule_flush()
 			
-			script = f"""
-			updatePlayerPosition('{player_id}', {x}, {y});
-			"""
-			self.web_view.page().runJavaScript(script)
-			self.players[player_id] = (x, y)
-			
-	def _convert_x_coordinate(self, x: float) -> float:
-		"""Convert GTA5 X coordinate to map coordinate"""
-		# GTA5 map boundaries (approximate)
-		GTA_MIN_X = -4000
-		GTA_MAX_X = 4000
-		
-		# Normalize to 0-1 range
-		normalized = (x - GTA_MIN_X) / (GTA_MAX_X - GTA_MIN_X)
-		return normalized * 100  # Convert to percentage
+	def refresh_positions(self):
+		"""Queue every marker for the next flush"""
+		for player_id in self.markers:
+			self.batch.mark(player_id)
+		self._schedule_flush()
 		
-	def _convert_y_coordinate(self, y: float) -> float:
-		"""Convert GTA5 Y coordinate to map coordinate"""
-		# GTA5 map boundaries (approximate)
-		GTA_MIN_Y = -4000
-		GTA_MAX_Y = 4000
+	def _schedule_flush(self):
+		if self.flush_timer.isActive() or not self.batch.pending:
+			return
+		delay = self.last_flush + 1.0 / self.max_fps - time.monotonic()
+		self.flush_timer.start(max(0, int(delay * 1000)))
 		
-		# Normalize to 0-1 range and invert (GTA5 Y is inverted)
-		normalized = 1 - ((y - GTA_MIN_Y) / (GTA_MAX_Y - GTA_MIN_Y))
-		return normalized * 100  # Convert to percentage
\ No newline at end of file
+	def flush(self):
+		"""Push every pending marker change to the page in one JavaScript call"""
+		timing = profiler.enabled
+		if timing:
+			start = time.perf_counter()
+		self.last_flush = time.monotonic()
+		update = self.batch.take(self.store, self.MAP_BOUNDS, self.web_view.width(), self.web_view.height())
+		if update is not None:
+			self.web_view.page().runJavaScript(batch_script(update))
+			self.flushes += 1
+		if timing:
+			profiler.lap(STAGE_UI_MAP, start)
@@ -0,0 +1,294 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QGraphicsView, QGraphicsScene, QGraphicsItem
+from PyQt6.QtCore import Qt, QTimer, QRectF, QPointF
+from PyQt6.QtGui import QPainter, QPixmap, QColor, QPen, QBrush, QFont
+import os
+import time
+from typing import Dict, List, Set, Tuple
+from common.profiling import profiler, STAGE_UI_MAP
+from ..game_sync import EntityStore
+from .map_batch import MarkerBatch
+
+TILE_SIZE = 256  # Background tile edge in map image pixels
+INDEX_CELL_SIZE = 64  # Marker index cell edge in map image pixels
+CLUSTER_PIXELS = 24  # Markers closer than this on screen merge into a cluster
+MARKER_RADIUS = 6
+LABEL_SCALE = 2.0  # Zoom at which single markers get a name label
+MIN_SCALE = 0.25
+MAX_SCALE = 16.0
+
+
+class MarkerIndex:
+	"""Uniform grid over the map image for rectangle queries"""
+
+	def __init__(self, cell_size: float = INDEX_CELL_SIZE):
+		self.cell_size = cell_size
+		self.cells: Dict[Tuple[int, int], Set[str]] = {}
+		self.positions: Dict[str, Tuple[float, float, Tuple[int, int]]] = {}
+
+	def __len__(self):
+		return len(self.positions)
+
+	def _cell(self, x: float, y: float) -> Tuple[int, int]:
+		return (int(x // self.cell_size), int(y // self.cell_size))
+
+	def update(self, marker_id: str, x: float, y: float):
+		cell = self._cell(x, y)
+		previous = self.positions.get(marker_id)
+		if previous is not None and previous[2] != cell:
+			self._discard(marker_id, previous[2])
+		if previous is None or previous[2] != cell:
+			self.cells.setdefault(cell, set()).add(marker_id)
+		self.positions[marker_id] = (x, y, cell)
+
+	def remove(self, marker_id: str):
+		previous = self.positions.pop(marker_id, None)
+		if previous is not None:
+			self._discard(marker_id, previous[2])
+
+	def _discard(self, marker_id: str, cell: Tuple[int, int]):
+		members = self.cells.get(cell)
+		if members is not None:
+			members.discard(marker_id)
+			if not members:
+				del self.cells[cell]
+
+	def query_rect(self, rect: QRectF) -> List[Tuple[str, float, float]]:
+		"""Markers inside rect as (marker_id, x, y)"""
+		min_cx, min_cy = self._cell(rect.left(), rect.top())
+		max_cx, max_cy = self._cell(rect.right(), rect.bottom())
+		left, top, right, bottom = rect.left(), rect.top(), rect.right(), rect.bottom()
+		# Walk the covered cells when zoomed in, the occupied ones when zoomed out
+		if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) < len(self.cells):
+			candidates = [self.cells.get((cx, cy), ()) for cx in range(min_cx, max_cx + 1)
+						  for cy in range(min_cy, max_cy + 1)]
+		else:
+			candidates = self.cells.values()
+		result = []
+		for members in candidates:
+			for marker_id in members:
+				x, y, _ = self.positions[marker_id]
+				if left <= x <= right and top <= y <= bottom:
+					result.append((marker_id, x, y))
+		return result
+
+
+class MarkerLayer(QGraphicsItem):
+	"""All markers drawn by one item.
+
+	Only markers inside the exposed rectangle are painted, and markers that
+	land in the same CLUSTER_PIXELS screen cell are drawn as a single
+	cluster with a count. Markers keep their on-screen size at any zoom.
+	"""
+
+	def __init__(self, index: MarkerIndex, rect: QRectF):
+		super().__init__()
+		self.index = index
+		self.rect = rect
+		self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+		self.marker_brush = QBrush(QColor('#ff0000'))
+		self.cluster_brush = QBrush(QColor('#ffaa00'))
+		self.outline = QPen(QColor('#ffffff'), 2)
+		self.font = QFont('Arial', 9)
+		self.painted = 0  # Markers and clusters drawn by the last paint
+
+	def boundingRect(self) -> QRectF:
+		return self.rect
+
+	def paint(self, painter: QPainter, option, widget=None):
+		transform = painter.worldTransform()
+		scale = transform.m11()
+
+		# Cull to what reaches the paint device, the exposed rect alone can be the whole map
+		area = option.exposedRect
+		inverse, invertible = transform.inverted()
+		if invertible:
+			device = painter.device()
+			area = area.intersected(inverse.mapRect(QRectF(0, 0, device.width(), device.height())))
+		margin = CLUSTER_PIXELS / scale
+		visible = self.index.query_rect(area.adjusted(-margin, -margin, margin, margin))
+
+		# Bucket by screen cell, the bucket size in map pixels shrinks as the view zooms in
+		cell = CLUSTER_PIXELS / scale
+		buckets: Dict[Tuple[int, int], List[Tuple[str, float, float]]] = {}
+		for marker in visible:
+			buckets.setdefault((int(marker[1] // cell), int(marker[2] // cell)), []).append(marker)
+
+		# Draw in device pixels so sizes and text do not scale with the map
+		painter.save()
+		painter.resetTransform()
+		painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+		painter.setPen(self.outline)
+		painter.setFont(self.font)
+		for members in buckets.values():
+			if len(members) == 1:
+				marker_id, x, y = members[0]
+				point = transform.map(QPointF(x, y))
+				painter.setBrush(self.marker_brush)
+				painter.drawEllipse(point, MARKER_RADIUS, MARKER_RADIUS)
+				if scale >= LABEL_SCALE:
+					painter.drawText(point + QPointF(MARKER_RADIUS + 2, 4), marker_id)
+			else:
+				x = sum(member[1] for member in members) / len(members)
+				y = sum(member[2] for member in members) / len(members)
+				point = transform.map(QPointF(x, y))
+				radius = MARKER_RADIUS + min(len(members), 40) ** 0.5 * 2
+				painter.setBrush(self.cluster_brush)
+				painter.drawEllipse(point, radius, radius)
+				painter.drawText(QRectF(point.x() - radius, point.y() - radius, radius * 2, radius * 2),
+								 Qt.AlignmentFlag.AlignCenter, str(len(members)))
+		painter.restore()
+		self.painted = len(buckets)
+
+
+class MapView(QGraphicsView):
+	"""Zoomable, draggable view drawing the map image as tiles"""
+
+	def __init__(self, scene: QGraphicsScene, tiles: List[Tuple[QRectF, QPixmap]]):
+		super().__init__(scene)
+		self.tiles = tiles
+		self.fitted = False
+		self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+		self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+		self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate)
+		self.setBackgroundBrush(QColor(20, 20, 20))
+		self.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+
+	def drawBackground(self, painter: QPainter, rect: QRectF):
+		super().drawBackground(painter, rect)
+		# Only the tiles under the exposed area are drawn
+		for tile_rect, pixmap in self.tiles:
+			if tile_rect.intersects(rect):
+				painter.drawPixmap(tile_rect, pixmap, QRectF(pixmap.rect()))
+
+	def wheelEvent(self, event):
+		factor = 1.25 if event.angleDelta().y() > 0 else 0.8
+		scale = self.transform().m11() * factor
+		if MIN_SCALE <= scale <= MAX_SCALE:
+			self.fitted = True
+			self.scale(factor, factor)
+
+	def resizeEvent(self, event):
+		super().resizeEvent(event)
+		if not self.fitted:
+			self.fitInView(self.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+
+	def mousePressEvent(self, event):
+		self.fitted = True  # Keep the user's zoom from now on
+		super().mousePressEvent(event)
+
+
+class NativeMapWidget(QWidget):
+	"""Map backend drawn with QGraphicsView, selected with MAP_BACKEND=native.
+
+	Same interface as MapWidget without loading Chromium. Marker changes are
+	coalesced like in MapWidget and applied to a grid index that the marker
+	layer queries for the visible area.
+	"""
+	GTA_MIN_X = -4000
+	GTA_MAX_X = 4000
+	GTA_MIN_Y = -4000
+	GTA_MAX_Y = 4000
+	MAP_BOUNDS = (GTA_MIN_X, GTA_MAX_X, GTA_MIN_Y, GTA_MAX_Y)
+
+	def __init__(self, store: EntityStore):
+		super().__init__()
+		self.store = store  # Positions are read from the shared entity store
+		self.markers = set()
+		self.index = MarkerIndex()
+		self.init_ui()
+
+		self.batch = MarkerBatch()
+		self.max_fps = float(os.getenv('MAP_MAX_FPS', 30))
+		self.last_flush = 0.0
+		self.flushes = 0
+		self.flush_timer = QTimer(self)
+		self.flush_timer.setSingleShot(True)
+		self.flush_timer.timeout.connect(self.flush)
+
+	def init_ui(self):
+		layout = QVBoxLayout(self)
+
+		map_path = os.path.join(os.path.dirname(__file__), 'resources', 'gta_map.jpg')
+		image = QPixmap(map_path)
+		if image.isNull():
+			print(f"Map image not found: {map_path}")
+			self.map_rect = QRectF(0, 0, 1000, 1000)
+		else:
+			self.map_rect = QRectF(image.rect())
+
+		self.scene = QGraphicsScene(self.map_rect, self)
+		# A single item that moves all the time, the BSP index would only be rebuilt
+		self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+		self.layer = MarkerLayer(self.index, self.map_rect)
+		self.scene.addItem(self.layer)
+
+		self.view = MapView(self.scene, self._cut_tiles(image))
+		self.view.setMinimumHeight(600)
+		layout.addWidget(self.view)
+
+	@staticmethod
+	def _cut_tiles(image: QPixmap) -> List[Tuple[QRectF, QPixmap]]:
+		tiles = []
+		if image.isNull():
+			return tiles
+		for top in range(0, image.height(), TILE_SIZE):
+			for left in range(0, image.width(), TILE_SIZE):
+				width = min(TILE_SIZE, image.width() - left)
+				height = min(TILE_SIZE, image.height() - top)
+				tiles.append((QRectF(left, top, width, height), image.copy(left, top, width, height)))
+		return tiles
+
+	def add_player_marker(self, player_id: str):
+		"""Add a new player marker to the map, drawn once the player has a position"""
+		self.markers.add(player_id)
+		self.batch.mark(player_id)
+		self._schedule_flush()
+
+	def remove_player_marker(self, player_id: str):
+		"""Remove a player marker from the map"""
+		if player_id in self.markers:
+			self.markers.discard(player_id)
+			self.batch.remove(player_id)
+			self._schedule_flush()
+
+	def update_player_position(self, player_id: str):
+		"""Queue a marker move to its position in the entity store"""
+		if player_id in self.markers:
+			self.batch.mark(player_id)
+			self._schedule_flush()
+
+	def refresh_positions(self):
+		"""Queue every marker for the next flush"""
+		for player_id in self.markers:
+			self.batch.mark(player_id)
+		self._schedule_flush()
+
+	def _schedule_flush(self):
+		if self.flush_timer.isActive() or not self.batch.pending:
+			return
+		delay = self.last_flush + 1.0 / self.max_fps - time.monotonic()
+		self.flush_timer.start(max(0, int(delay * 1000)))
+
+	def flush(self):
+		"""Apply every pending marker change to the index and repaint once"""
+		timing = profiler.enabled
+		if timing:
+			start = time.perf_counter()
+		self.last_flush = time.monotonic()
+		scale = self.view.transform().m11()
+		update = self.batch.take(self.store, self.MAP_BOUNDS,
+								 int(self.map_rect.width() * scale), int(self.map_rect.height() * scale))
+		if update is None:
+			return
+		ids, coords, removed = update
+		for player_id in removed:
+			self.index.remove(player_id)
+		# Map percents to map image pixels
+		width = self.map_rect.width() / 100
+		height = self.map_rect.height() / 100
+		for i, player_id in enumerate(ids):
+			self.index.update(player_id, coords[2 * i] * width, coords[2 * i + 1] * height)
+		self.layer.update()
+		self.flushes += 1
+		if timing:
+			profiler.lap(STAGE_UI_MAP, start)
@@ -0,0 +1,142 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QGridLayout, QLabel, QGroupBox)
+from PyQt6.QtCore import Qt, QTimer, QPointF
+from PyQt6.QtGui import QPainter, QPen, QColor, QPolygonF
+from typing import Dict, List, Optional
+from common.tracing import tracer, END_TO_END
+
+
+class HistoryGraph(QWidget):
+	"""Rolling line graph of a few named series"""
+
+	def __init__(self, series: Dict[str, str], parent=None):
+		super().__init__(parent)
+		self.series = series  # name -> color
+		self.values: Dict[str, List[Optional[float]]] = {name: [] for name in series}
+		self.capacity = 120
+		self.setMinimumHeight(100)
+
+	def append(self, sample: Dict[str, Optional[float]]):
+		for name in self.series:
+			values = self.values[name]
+			values.append(sample.get(name))
+			if len(values) > self.capacity:
+				del values[0]
+		self.update()
+
+	def paintEvent(self, event):
+		painter = QPainter(self)
+		painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+		painter.fillRect(self.rect(), QColor(20, 20, 20))
+
+		width = self.width()
+		height = self.height() - 4
+		step = width / max(1, self.capacity - 1)
+
+		# Each series is scaled to its own peak so RTT and rates share the graph
+		for name, color in self.series.items():
+			values = self.values[name]
+			peak = max((value for value in values if value is not None), default=0)
+			if peak <= 0:
+				continue
+			points = QPolygonF()
+			offset = self.capacity - len(values)
+			for i, value in enumerate(values):
+				if value is None:
+					continue
+				points.append(QPointF((offset + i) * step, 2 + height - (value / peak) * height))
+			painter.setPen(QPen(QColor(color), 1.5))
+			painter.drawPolyline(points)
+
+		painter.end()
+
+
+class NetStatsWidget(QWidget):
+	"""Toggleable network statistics panel.
+
+	Collection in NetworkStats is switched on only while the panel is visible.
+	"""
+
+	def __init__(self, network_client, parent=None):
+		super().__init__(parent)
+		self.network_client = network_client
+		self.refresh_timer = QTimer(self)
+		self.refresh_timer.timeout.connect(self.refresh)
+		self.init_ui()
+
+	def init_ui(self):
+		layout = QVBoxLayout(self)
+
+		stats_group = QGroupBox("Network")
+		stats_layout = QVBoxLayout(stats_group)
+
+		grid = QGridLayout()
+		self.labels = {}
+		fields = [
+			('rtt', "RTT"), ('jitter', "Jitter"),
+			('send', "Send"), ('receive', "Receive"),
+			('loss', "Dropped / Out of order"), ('clock', "Clock offset"),
+			('trace', "End to end (traced)")
+		]
+		for row, (key, title) in enumerate(fields):
+			grid.addWidget(QLabel(f"{title}:"), row, 0)
+			self.labels[key] = QLabel("-")
+			self.labels[key].setAlignment(Qt.AlignmentFlag.AlignRight)
+			grid.addWidget(self.labels[key], row, 1)
+		stats_layout.addLayout(grid)
+
+		self.graph = HistoryGraph({'rtt': '#ffaa00', 'receive_rate': '#00aaff', 'send_rate': '#55ff55'})
+		stats_layout.addWidget(self.graph)
+		stats_layout.addWidget(QLabel("<span style='color:#ffaa00'>RTT</span> "
+									  "<span style='color:#00aaff'>recv/s</span> "
+									  "<span style='color:#55ff55'>send/s</span>"))
+
+		self.player_ages = QLabel("")
+		self.player_ages.setWordWrap(True)
+		stats_layout.addWidget(self.player_ages)
+
+		layout.addWidget(stats_group)
+
+	def showEvent(self, event):
+		self.network_client.stats.set_enabled(True)
+		self.refresh_timer.start(1000)
+		super().showEvent(event)
+
+	def hideEvent(self, event):
+		self.refresh_timer.stop()
+		self.network_client.stats.set_enabled(False)
+		super().hideEvent(event)
+
+	def refresh(self):
+		snapshot = self.network_client.stats.snapshot()
+		self.graph.append(snapshot)
+
+		rtt = snapshot['rtt']
+		self.labels['rtt'].setText(f"{rtt * 1000:.1f} ms" if rtt is not None else "-")
+		self.labels['jitter'].setText(f"{snapshot['jitter'] * 1000:.1f} ms")
+		self.labels['send'].setText(f"{snapshot['send_rate']:.1f}/s  {snapshot['send_bps'] / 1024:.1f} KB/s")
+		self.labels['receive'].setText(f"{snapshot['receive_rate']:.1f}/s  {snapshot['receive_bps'] / 1024:.1f} KB/s")
+		self.labels['loss'].setText(f"{snapshot['dropped']} / {snapshot['out_of_order']}")
+
+		clock = self.network_client.get_clock_status()
+		self.labels['clock'].setText(f"{clock['offset'] * 1000:+.1f} ms ({clock['confidence']:.0%})")
+		
+		# Filled by traces from peers, game write to our shared memory write
+		end_to_end = tracer.snapshot().get(END_TO_END)
+		if end_to_end:
+			self.labels['trace'].setText(f"p50 {end_to_end['p50'] * 1000:.1f} ms, p99 {end_to_end['p99'] * 1000:.1f} ms")
+
+		ages = []
+		for player_id, link in snapshot['players'].items():
+			age = link['age']
+			ages.append(f"{player_id[:8]}: {age * 1000:.0f} ms" if age is not None else f"{player_id[:8]}: -")
+		self.player_ages.setText("Update age: " + ", ".join(ages) if ages else "")
+
+	def format_summary(self) -> str:
+		"""One-shot text summary for the console"""
+		snapshot = self.network_client.stats.history[-1] if self.network_client.stats.history else None
+		if snapshot is None:
+			return "No network statistics collected yet"
+		rtt = f"{snapshot['rtt'] * 1000:.1f} ms" if snapshot['rtt'] is not None else "-"
+		return (f"RTT {rtt}, jitter {snapshot['jitter'] * 1000:.1f} ms, "
+				f"send {snapshot['send_rate']:.1f}/s, receive {snapshot['receive_rate']:.1f}/s, "
+				f"dropped {snapshot['dropped']}, out of order {snapshot['out_of_order']}")
@@ -1,60 +1,299 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QListWidget, QListWidgetItem,
-						   QLabel, QGroupBox)
-from PyQt6.QtCore import Qt
-from typing import Dict
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTableView, QLabel, QGroupBox, QLineEdit,
+						   QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import Qt, QTimer, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from typing import Dict, List, Set
+import os
+import time
+import numpy as np
+from common.profiling import profiler, STAGE_UI_PLAYERS
+from ..game_sync import GameSyncManager
+
+MPS_TO_MPH = 2.23694
+
+COLUMN_PLAYER = 0
+COLUMN_HEALTH = 1
+COLUMN_VEHICLE = 2
+COLUMN_SPEED = 3
+COLUMN_DISTANCE = 4
+COLUMN_PING = 5
+COLUMNS = ["Player", "Health", "Vehicle", "Speed", "Distance", "Ping"]
+RIGHT_ALIGNED = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+
+class PlayerTableModel(QAbstractTableModel):
+	"""One row per player, values computed when a batch is applied.
+
+	Rows are kept in insertion order with an id -> row map, a removal moves
+	the last row into the freed slot so it never scans the table.
+	"""
+
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self.ids: List[str] = []
+		self.rows: Dict[str, int] = {}
+		self.values: List[list] = []
+		self.display: List[List[str]] = []  # Formatted once per update, not per paint
+
+	def rowCount(self, parent=QModelIndex()) -> int:
+		return len(self.ids)
+
+	def columnCount(self, parent=QModelIndex()) -> int:
+		return len(COLUMNS)
+
+	def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+		if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+			return COLUMNS[section]
+		return None
+
+	def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+		# Called for every visible cell and role on each repaint, keep it to lookups
+		if role == Qt.ItemDataRole.DisplayRole:
+			return self.display[index.row()][index.column()]
+		if role == Qt.ItemDataRole.TextAlignmentRole and index.column() != COLUMN_PLAYER:
+			return RIGHT_ALIGNED
+		return None
+
+	def add_players(self, player_ids: List[str]):
+		new = [player_id for player_id in player_ids if player_id not in self.rows]
+		if not new:
+			return
+		first = len(self.ids)
+		self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+		for player_id in new:
+			self.rows[player_id] = len(self.ids)
+			self.ids.append(player_id)
+			self.values.append([player_id, None, "", None, None, None])
+			self.display.append([player_id, "-", "", "-", "-", "-"])
+		self.endInsertRows()
+
+	def remove_player(self, player_id: str):
+		row = self.rows.pop(player_id, None)
+		if row is None:
+			return
+		last = len(self.ids) - 1
+		if row != last:
+			moved = self.ids[last]
+			self.ids[row] = moved
+			self.values[row] = self.values[last]
+			self.display[row] = self.display[last]
+			self.rows[moved] = row
+			self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+		self.beginRemoveRows(QModelIndex(), last, last)
+		self.ids.pop()
+		self.values.pop()
+		self.display.pop()
+		self.endRemoveRows()
+
+	def update_rows(self, updates: Dict[str, list]):
+		"""Replace row values and announce the changed span with one dataChanged"""
+		changed = []
+		for player_id, values in updates.items():
+			row = self.rows.get(player_id)
+			if row is not None and self.values[row] != values:
+				self.values[row] = values
+				self.display[row] = [_format(column, value) for column, value in enumerate(values)]
+				changed.append(row)
+		if changed:
+			self.dataChanged.emit(self.index(min(changed), COLUMN_HEALTH),
+								  self.index(max(changed), len(COLUMNS) - 1))
+		return len(changed)
+
+	def update_column(self, column: int, values: Dict[str, object]):
+		"""Replace one column for many rows, for values that change without a player update"""
+		changed = []
+		for player_id, value in values.items():
+			row = self.rows.get(player_id)
+			if row is not None and self.values[row][column] != value:
+				self.values[row][column] = value
+				self.display[row][column] = _format(column, value)
+				changed.append(row)
+		if changed:
+			self.dataChanged.emit(self.index(min(changed), column), self.index(max(changed), column))
+		return len(changed)
+
+
+class PlayerSortProxy(QSortFilterProxyModel):
+	"""Compares the model's raw values directly, data() is not called per comparison"""
+
+	def __init__(self, model: PlayerTableModel, parent=None):
+		super().__init__(parent)
+		self.model = model
+		self.setSourceModel(model)
+
+	def lessThan(self, left: QModelIndex, right: QModelIndex) -> bool:
+		column = left.column()
+		first = self.model.values[left.row()][column]
+		second = self.model.values[right.row()][column]
+		# Unknown values sort first
+		if first is None or second is None:
+			return first is None and second is not None
+		return first < second
+
 
 class PlayerListWidget(QWidget):
-	def __init__(self):
+	"""Player table fed in batches.
+
+	add_player, remove_player and update_player_info only record what
+	changed; a timer applies the pending changes to the model at most
+	PLAYER_LIST_REFRESH_HZ times a second, reading kinematics from the
+	entity store in one vectorized pass.
+	"""
+
+	def __init__(self, sync_manager: GameSyncManager):
 		super().__init__()
-		self.players = {}
+		self.sync_manager = sync_manager
+		self.game_state = sync_manager.game_state  # Player data is read from the shared game state
+		self.pending_added: List[str] = []
+		self.pending_removed: Set[str] = set()
+		self.dirty: Set[str] = set()
+		self.pings: Dict[str, float] = {}  # Update latency at receipt, seconds
+		self.local_position = None  # Local player position the distance column was computed from
 		self.init_ui()
 
+		refresh_hz = float(os.getenv('PLAYER_LIST_REFRESH_HZ', 4))
+		self.refresh_timer = QTimer(self)
+		self.refresh_timer.timeout.connect(self.apply_pending)
+		self.refresh_timer.start(int(1000 / refresh_hz))
+
 	def init_ui(self):
 		layout = QVBoxLayout(self)
-		
+
 		# Players group
 		players_group = QGroupBox("Players")
 		players_layout = QVBoxLayout(players_group)
-		
+
 		# Player count
 		self.player_count = QLabel("Players: 0")
 		players_layout.addWidget(self.player_count)
-		
-		# Player list
-		self.player_list = QListWidget()
-		players_layout.addWidget(self.player_list)
-		
+
+		self.filter_input = QLineEdit()
+		self.filter_input.setPlaceholderText("Filter players")
+		players_layout.addWidget(self.filter_input)
+
+		# Player table, sorting and filtering happen in the proxy
+		self.model = PlayerTableModel(self)
+		self.proxy = PlayerSortProxy(self.model, self)
+		# Re-sorted once per batch in apply_pending instead of row by row on every dataChanged
+		self.proxy.setDynamicSortFilter(False)
+		self.proxy.setFilterKeyColumn(COLUMN_PLAYER)
+		self.proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+		self.filter_input.textChanged.connect(self.proxy.setFilterFixedString)
+
+		self.player_table = QTableView()
+		self.player_table.setModel(self.proxy)
+		self.player_table.setSortingEnabled(True)
+		self.player_table.sortByColumn(COLUMN_DISTANCE, Qt.SortOrder.AscendingOrder)
+		self.player_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+		self.player_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+		self.player_table.verticalHeader().hide()
+		# Fixed row heights and column widths, so an update never triggers a relayout
+		self.player_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+		self.player_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+		self.player_table.horizontalHeader().setSectionResizeMode(COLUMN_PLAYER, QHeaderView.ResizeMode.Stretch)
+		players_layout.addWidget(self.player_table)
+
 		layout.addWidget(players_group)
 
 	def add_player(self, player_id: str):
-		if player_id not in self.players:
-			item = QListWidgetItem(f"Player: {player_id}")
-			item.setData(Qt.ItemDataRole.UserRole, player_id)
-			self.player_list.addItem(item)
-			self.players[player_id] = item
-			self._update_player_count()
+		self.pending_removed.discard(player_id)
+		self.pending_added.append(player_id)
+		self.dirty.add(player_id)
 
 	def remove_player(self, player_id: str):
-		if player_id in self.players:
-			self.player_list.takeItem(self.player_list.row(self.players[player_id]))
-			del self.players[player_id]
-			self._update_player_count()
-
-	def update_player_info(self, player_id: str, data: Dict):
-		if player_id in self.players:
-			item = self.players[player_id]
-			health = data.get('health', 100)
-			vehicle = data.get('vehicle', {})
-			
-			# Update player info display
-			info_text = f"Player: {player_id}\n"
-			info_text += f"Health: {health}%\n"
-			
-			if vehicle:
-				info_text += f"Vehicle: {vehicle.get('type', 'Unknown')}\n"
-				info_text += f"Speed: {vehicle.get('speed', 0):.1f} mph"
-			
-			item.setText(info_text)
+		self.pending_removed.add(player_id)
+		self.dirty.discard(player_id)
+		self.pings.pop(player_id, None)
+
+	def update_player_info(self, player_id: str):
+		state = self.game_state.player_states.get(player_id)
+		if state and 'local_timestamp' in state:
+			self.pings[player_id] = time.time() - state['local_timestamp']
+		self.dirty.add(player_id)
+
+	def apply_pending(self):
+		"""Apply everything recorded since the last refresh to the model"""
+		timing = profiler.enabled
+		if timing:
+			start = time.perf_counter()
+		added, removed = [], set()
+		if self.pending_removed:
+			removed, self.pending_removed = self.pending_removed, set()
+			self.pending_added = [player_id for player_id in self.pending_added if player_id not in removed]
+			for player_id in removed:
+				self.model.remove_player(player_id)
+		if self.pending_added:
+			added, self.pending_added = self.pending_added, []
+			self.model.add_players(added)
+		changed = 0
+		if self.dirty:
+			dirty, self.dirty = self.dirty, set()
+			changed = self.model.update_rows(self._row_values([player_id for player_id in dirty if player_id in self.model.rows]))
+		# Distances of standing players change when the local player moves
+		local_position = self._local_position()
+		if local_position != self.local_position:
+			self.local_position = local_position
+			store = self.game_state.store
+			present = [player_id for player_id in self.model.ids if player_id in store]
+			distances = self._distances([store.rows[player_id] for player_id in present])
+			changed += self.model.update_column(COLUMN_DISTANCE, dict(zip(present, distances)))
+		if (changed or added or removed) and self.proxy.sortColumn() >= 0:
+			self.proxy.sort(self.proxy.sortColumn(), self.proxy.sortOrder())
+		self._update_player_count()
+		if timing:
+			profiler.lap(STAGE_UI_PLAYERS, start)
+
+	def _row_values(self, player_ids: List[str]) -> Dict[str, list]:
+		store = self.game_state.store
+		present = [player_id for player_id in player_ids if player_id in store]
+		if not present:
+			return {}
+		rows = [store.rows[player_id] for player_id in present]
+		health = store.health[rows]
+		speed = np.linalg.norm(store.velocity[rows], axis=1) * MPS_TO_MPH
+		distance = self._distances(rows)
+
+		updates = {}
+		for i, player_id in enumerate(present):
+			vehicle = self.game_state.player_states.get(player_id, {}).get('vehicle') or {}
+			updates[player_id] = [
+				player_id,
+				float(health[i]),
+				vehicle.get('type', 'Unknown') if vehicle else "",
+				float(speed[i]),
+				distance[i],
+				self.pings.get(player_id)
+			]
+		return updates
+
+	def _local_position(self):
+		store = self.game_state.store
+		local_id = self.sync_manager.local_player_id
+		if local_id is None or local_id not in store:
+			return None
+		return tuple(store.position[store.rows[local_id]].tolist())
+
+	def _distances(self, rows: List[int]) -> list:
+		"""Distance to the local player for store rows in one vectorized pass, None if it is unknown"""
+		store = self.game_state.store
+		local_id = self.sync_manager.local_player_id
+		if local_id is None or local_id not in store:
+			return [None] * len(rows)
+		delta = store.position[rows] - store.position[store.rows[local_id]]
+		return np.sqrt(np.einsum('ij,ij->i', delta, delta)).tolist()
 
 	def _update_player_count(self):
-		self.player_count.setText(f"Players: {len(self.players)}")
\ No newline at end of file
+		self.player_count.setText(f"Players: {self.model.rowCount()}")
+
+
+def _format(column: int, value) -> str:
+	if value is None:
+		return "-"
+	if column == COLUMN_HEALTH:
+		return f"{value:.0f}%"
+	if column == COLUMN_SPEED:
+		return f"{value:.1f} mph"
+	if column == COLUMN_DISTANCE:
+		return f"{value:.0f} m"
+	if column == COLUMN_PING:
+		return f"{value * 1000:.0f} ms"
+	return str(value)
@@ -1,15 +1,15 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, 
-							QLabel, QLineEdit, QMessageBox)
+							QLabel, QLineEdit, QMessageBox, QComboBox)
 from PyQt6.QtCore import Qt
 import os
-from dotenv import load_dotenv
+from ..config import load_config
 
 class SettingsDialog(QDialog):
 	def __init__(self, parent=None):
 		super().__init__(parent)
 		self.setWindowTitle("Settings")
 		self.setMinimumWidth(500)
-		load_dotenv()
+		load_config()
 		self.init_ui()
 		
 	def init_ui(self):
@@ -25,6 +25,18 @@ class SettingsDialog(QDialog):
 		hotkey_layout.addWidget(hotkey_label)
 		hotkey_layout.addWidget(self.hotkey_input)
 		
+		# Map renderer, applied on the next start
+		map_layout = QHBoxLayout()
+		map_label = QLabel("Map Renderer:")
+		self.map_backend_input = QComboBox()
+		self.map_backend_input.addItem("Web (Chromium)", 'web')
+		self.map_backend_input.addItem("Native (lightweight)", 'native')
+		index = self.map_backend_input.findData(os.getenv('MAP_BACKEND', 'web').lower())
+		self.map_backend_input.setCurrentIndex(max(index, 0))
+		
+		map_layout.addWidget(map_label)
+		map_layout.addWidget(self.map_backend_input)
+		
 		# Buttons
 		btn_layout = QHBoxLayout()
 		save_btn = QPushButton("Save")
@@ -37,11 +49,13 @@ class SettingsDialog(QDialog):
 		btn_layout.addWidget(cancel_btn)
 		
 		layout.addLayout(hotkey_layout)
+		layout.addLayout(map_layout)
 		layout.addLayout(btn_layout)
 
 	def save_settings(self):
 		"""Save settings to .env file"""
 		hotkey = self.hotkey_input.text()
+		map_backend = self.map_backend_input.currentData()
 		
 		try:
 			env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env')
@@ -56,12 +70,14 @@ class SettingsDialog(QDialog):
 							env_content[key] = value
 			
 			env_content['CONSOLE_HOTKEY'] = hotkey
+			env_content['MAP_BACKEND'] = map_backend
 			
 			with open(env_path, 'w') as f:
 				for key, value in env_content.items():
 					f.write(f"{key}={value}\n")
 			
 			os.environ['CONSOLE_HOTKEY'] = hotkey
+			os.environ['MAP_BACKEND'] = map_backend
 			self.accept()
 			
 		except Exception as e:
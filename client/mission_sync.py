@@ -0,0 +1,85 @@
+from typing import Dict, Any, Callable, Tuple
+from common.mission_state import (MissionState, OP_MISSION_STARTED, OP_OBJECTIVE_COMPLETED,
+								  OP_COUNTER_INCREMENTED, OP_ENTITY_SPAWNED, OP_ENTITY_DESPAWNED,
+								  OP_TRIGGER_FIRED)
+
+
+class MissionSync:
+	"""Client replica of the session mission state.
+
+	Local changes are submitted as operations and only applied once the server
+	relays them back with a version, so every peer sees the same order.
+	"""
+
+	def __init__(self, network_client, mission_state: MissionState):
+		self.network_client = network_client
+		self.state = mission_state
+		self.callbacks = {}
+		self._resyncing = False
+
+		network_client.register_callback('mission_op', self.on_mission_op)
+		network_client.register_callback('mission_state', self.on_mission_state)
+		network_client.register_callback('mission_reset', self.on_mission_reset)
+
+	def register_callback(self, event: str, callback: Callable):
+		self.callbacks[event] = callback
+
+	def on_mission_op(self, op: Dict[str, Any]):
+		applied = self.state.apply(op)
+		self.network_client.mission_version = self.state.version
+		if self.state.has_gap and not self._resyncing:
+			# Fetching runs off the socket thread, a blocking call here would stall it
+			self._resyncing = True
+			self.network_client.sio.start_background_task(self.resync)
+		for applied_op in applied:
+			if 'op_applied' in self.callbacks:
+				self.callbacks['op_applied'](applied_op)
+
+	def on_mission_state(self, snapshot: Dict[str, Any]):
+		self.state.load_snapshot(snapshot)
+		self.network_client.mission_version = self.state.version
+		if 'state_loaded' in self.callbacks:
+			self.callbacks['state_loaded'](self.state)
+
+	def on_mission_reset(self):
+		"""Left or switched sessions, the next session's versions start over"""
+		self.state.reset()
+		self.network_client.mission_version = self.state.version
+		if 'state_loaded' in self.callbacks:
+			self.callbacks['state_loaded'](self.state)
+
+	def resync(self):
+		"""Catch up from the server after a version gap"""
+		try:
+			response = self.network_client.request_mission_state(self.state.version)
+			if 'snapshot' in response:
+				self.on_mission_state(response['snapshot'])
+			for op in response.get('ops', []):
+				self.on_mission_op(op)
+		finally:
+			self._resyncing = False
+
+	def submit(self, op_type: str, **fields) -> Dict[str, Any]:
+		op = dict(fields, type=op_type)
+		error = MissionState.validate(op)
+		if error:
+			return {'status': 'failed', 'error': error}
+		return self.network_client.send_mission_op(op)
+
+	def start_mission(self, mission_id: str, objectives=()) -> Dict[str, Any]:
+		return self.submit(OP_MISSION_STARTED, mission_id=mission_id, objectives=list(objectives))
+
+	def complete_objective(self, objective_id: str) -> Dict[str, Any]:
+		return self.submit(OP_OBJECTIVE_COMPLETED, objective_id=objective_id)
+
+	def increment_counter(self, counter: str, amount: int = 1) -> Dict[str, Any]:
+		return self.submit(OP_COUNTER_INCREMENTED, counter=counter, amount=amount)
+
+	def spawn_entity(self, entity_id: str, model: str, position: Tuple[float, float, float]) -> Dict[str, Any]:
+		return self.submit(OP_ENTITY_SPAWNED, entity_id=entity_id, model=model, position=list(position))
+
+	def despawn_entity(self, entity_id: str) -> Dict[str, Any]:
+		return self.submit(OP_ENTITY_DESPAWNED, entity_id=entity_id)
+
+	def fire_trigger(self, trigger_id: str) -> Dict[str, Any]:
+		return self.submit(OP_TRIGGER_FIRED, trigger_id=trigger_id)
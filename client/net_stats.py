@@ -0,0 +1,134 @@
+from collections import deque
+from typing import Dict, Any, Optional
+import json
+import threading
+import time
+
+
+class PlayerLinkStats:
+	"""Receive-side counters for a single remote player"""
+
+	def __init__(self):
+		self.last_seq = None
+		self.last_receive = None
+		self.last_age = None
+		self.received = 0
+		self.dropped = 0
+		self.out_of_order = 0
+
+
+class NetworkStats:
+	"""Client-side network statistics.
+
+	Recording is a no-op while disabled, so the hooks can stay in the hot
+	path permanently. Rates are derived from the counter deltas between two
+	snapshots, which the stats panel takes once per refresh.
+
+	Recording runs on the socket thread and snapshots on the GUI thread, the
+	lock covers membership changes of the per-player dict.
+	"""
+
+	def __init__(self, history_size: int = 120):
+		self.enabled = False
+		self.lock = threading.Lock()
+		self.history = deque(maxlen=history_size)
+		self.reset()
+
+	def reset(self):
+		self.sent = 0
+		self.sent_bytes = 0
+		self.received = 0
+		self.received_bytes = 0
+		self.rtt = None
+		self.jitter = 0.0
+		with self.lock:
+			self.players: Dict[str, PlayerLinkStats] = {}
+		self.history.clear()
+		self._last_snapshot = (time.monotonic(), 0, 0, 0, 0)
+
+	def set_enabled(self, enabled: bool):
+		if enabled and not self.enabled:
+			self.reset()
+		self.enabled = enabled
+
+	def record_send(self, payload: Dict[str, Any]):
+		if not self.enabled:
+			return
+		self.sent += 1
+		self.sent_bytes += _payload_size(payload)
+
+	def record_receive(self, player_id: str, payload: Dict[str, Any], age: Optional[float] = None):
+		if not self.enabled:
+			return
+		self.received += 1
+		self.received_bytes += _payload_size(payload)
+
+		link = self.players.get(player_id)
+		if link is None:
+			with self.lock:
+				link = self.players.setdefault(player_id, PlayerLinkStats())
+		link.received += 1
+		link.last_receive = time.monotonic()
+		link.last_age = age
+
+		# Sender sequence numbers reveal gaps and reordering
+		seq = payload.get('seq')
+		if seq is not None:
+			if link.last_seq is not None:
+				if seq <= link.last_seq:
+					link.out_of_order += 1
+					return
+				link.dropped += seq - link.last_seq - 1
+			link.last_seq = seq
+
+	def record_rtt(self, rtt: float):
+		if not self.enabled:
+			return
+		if self.rtt is not None:
+			# RFC 3550 interarrival jitter estimator
+			self.jitter += (abs(rtt - self.rtt) - self.jitter) / 16
+		self.rtt = rtt
+
+	def remove_player(self, player_id: str):
+		with self.lock:
+			self.players.pop(player_id, None)
+
+	def snapshot(self) -> Dict[str, Any]:
+		"""Compute rates since the previous snapshot and append to the history"""
+		now = time.monotonic()
+		last_time, last_sent, last_sent_bytes, last_received, last_received_bytes = self._last_snapshot
+		elapsed = max(now - last_time, 1e-6)
+		self._last_snapshot = (now, self.sent, self.sent_bytes, self.received, self.received_bytes)
+		with self.lock:
+			links = list(self.players.items())
+
+		snapshot = {
+			'time': now,
+			'rtt': self.rtt,
+			'jitter': self.jitter,
+			'send_rate': (self.sent - last_sent) / elapsed,
+			'receive_rate': (self.received - last_received) / elapsed,
+			'send_bps': (self.sent_bytes - last_sent_bytes) / elapsed,
+			'receive_bps': (self.received_bytes - last_received_bytes) / elapsed,
+			'dropped': sum(link.dropped for _, link in links),
+			'out_of_order': sum(link.out_of_order for _, link in links),
+			'players': {
+				player_id: {
+					'age': link.last_age,
+					'since_last': now - link.last_receive if link.last_receive else None,
+					'dropped': link.dropped,
+					'out_of_order': link.out_of_order
+				}
+				for player_id, link in links
+			}
+		}
+		self.history.append(snapshot)
+		return snapshot
+
+
+def _payload_size(payload: Dict[str, Any]) -> int:
+	"""Approximate wire size of a JSON payload"""
+	try:
+		return len(json.dumps(payload, separators=(',', ':')))
+	except (TypeError, ValueError):
+		return 0
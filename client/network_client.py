@@ -1,10 +1,15 @@
 import socketio
 import json
 import os
+import time
 from typing import Dict, Any, Callable
-from dotenv import load_dotenv
+from .clock_sync import ClockSync
+from .net_stats import NetworkStats
+from .config import load_config
+from common.profiling import profiler, STAGE_ENCODE, STAGE_EMIT, STAGE_RECEIVE
+from common.tracing import tracer, HOP_CLIENT_SEND, HOP_PEER_RECEIVE
 
-load_dotenv()
+load_config()
 
 class GTACoopClient:
 	def __init__(self, server_url: str = None):
@@ -30,6 +35,22 @@ class GTACoopClient:
 		self.callbacks = {}
 		self.is_connected = False
 
+		# Resume state for reclaiming the session slot after a dropped socket
+		self.resume_token = None
+		self.last_session_seq = 0
+		self.mission_version = 0  # Maintained by the mission replica
+		self.session_players = set()  # Other players in the session, diffed against the roster on resume
+
+		# Clock offset estimate against the server timeline
+		self.clock = ClockSync()
+		tracer.to_common_time = self.clock.to_server_time  # Trace stamps share the server timeline
+		self.clock_sync_interval = float(os.getenv('CLOCK_SYNC_INTERVAL', '10'))
+		self.clock_sync_burst = int(os.getenv('CLOCK_SYNC_BURST', '8'))
+		self._clock_task = None
+
+		# Link statistics, only collected while someone is looking at them
+		self.stats = NetworkStats()
+		self._send_seq = 0
 		
 		# Register socket event handlers
 		self.sio.on('connect', self._on_connect)
@@ -38,6 +59,7 @@ class GTACoopClient:
 		self.sio.on('sync_update', self._on_sync_update)
 		self.sio.on('player_joined', self._on_player_joined)
 		self.sio.on('player_left', self._on_player_left)
+		self.sio.on('mission_op', self._on_mission_op)
 
 	def connect(self) -> bool:
 		"""Connect to the server"""
@@ -67,6 +89,10 @@ class GTACoopClient:
 	def _on_connect(self):
 		print("Connected to server")
 		self.is_connected = True
+		if self._clock_task is None:
+			self._clock_task = self.sio.start_background_task(self._clock_sync_loop)
+		if self.session_id and self.resume_token:
+			self.sio.start_background_task(self.resume_session)
 		if 'connect' in self.callbacks:
 			self.callbacks['connect']()
 
@@ -82,9 +108,16 @@ class GTACoopClient:
 			return {'status': 'failed', 'error': 'Not connected to server'}
 			
 		try:
+			# Reset before the call, ops of the new session can arrive before its response
+			self._reset_mission_replica()
 			response = self.sio.call('create_session', {'mode': mode})
 			if response.get('status') == 'created':
 				self.session_id = response['session_id']
+				self.last_session_seq = 0
+				self.session_players = set()
+				self._store_session_identity(response)
+				if 'mission_state' in response and 'mission_state' in self.callbacks:
+					self.callbacks['mission_state'](response['mission_state'])
 			return response
 		except Exception as e:
 			print(f"Failed to create session: {e}")
@@ -96,45 +129,203 @@ class GTACoopClient:
 			return {'status': 'failed', 'error': 'Not connected to server'}
 			
 		try:
+			self._reset_mission_replica()
 			response = self.sio.call('join_session', {'session_id': session_id})
 			if response.get('status') == 'joined':
 				self.session_id = session_id
+				self.last_session_seq = 0
+				self._store_session_identity(response)
+				self.session_players = set(response.get('players', [])) - {self.player_id}
+				if 'mission_state' in response and 'mission_state' in self.callbacks:
+					self.callbacks['mission_state'](response['mission_state'])
 			return response
 		except Exception as e:
 			print(f"Failed to join session: {e}")
 			return {'status': 'failed', 'error': str(e)}
 
+	def resume_session(self) -> Dict[str, Any]:
+		"""Reclaim the previous session slot after a reconnect"""
+		if not self.session_id or not self.resume_token:
+			return {'status': 'failed', 'error': 'Nothing to resume'}
+
+		try:
+			response = self.sio.call('resume_session', {
+				'resume_token': self.resume_token,
+				'last_seq': self.last_session_seq,
+				'mission_version': self.mission_version
+			}, timeout=5)
+		except Exception as e:
+			print(f"Failed to resume session: {e}")
+			response = {'status': 'failed', 'error': str(e)}
+
+		if response.get('status') == 'resumed':
+			self._store_session_identity(response)
+			print(f"Resumed session {self.session_id} with {len(response.get('deltas', []))} missed updates")
+			if 'players' in response:
+				self._apply_roster(response['players'])
+			for delta in response.get('deltas', []):
+				self._on_sync_update(delta)
+			if 'mission_state' in response and 'mission_state' in self.callbacks:
+				self.callbacks['mission_state'](response['mission_state'])
+			for op in response.get('mission_ops', []):
+				self._on_mission_op(op)
+			if 'session_resumed' in self.callbacks:
+				self.callbacks['session_resumed'](response)
+		else:
+			print(f"Session resume rejected: {response.get('error')}")
+			self.session_id = None
+			self.resume_token = None
+			self.last_session_seq = 0
+			self.session_players = set()
+			self._reset_mission_replica()
+			if 'session_lost' in self.callbacks:
+				self.callbacks['session_lost'](response)
+		return response
+
+	def _reset_mission_replica(self):
+		"""Mission versions are per session, drop the previous session's replica"""
+		self.mission_version = 0
+		if 'mission_reset' in self.callbacks:
+			self.callbacks['mission_reset']()
+
+	def _apply_roster(self, players):
+		"""Replay joins and leaves missed while disconnected as player_joined/player_left events"""
+		roster = set(players) - {self.player_id}
+		self.session_players.discard(self.player_id)
+		# Leaves first, a left player's pending updates are dropped before the deltas arrive
+		for player_id in sorted(self.session_players - roster):
+			self._on_player_left({'player_id': player_id})
+		for player_id in sorted(roster - self.session_players):
+			self._on_player_joined({'player_id': player_id})
+
+	def _store_session_identity(self, response: Dict[str, Any]):
+		self.player_id = response.get('player_id', self.player_id)
+		self.resume_token = response.get('resume_token', self.resume_token)
+		self.last_session_seq = max(self.last_session_seq, response.get('session_seq', 0))
+
 	def send_player_update(self, state_data: Dict[str, Any]):
 		if self.session_id:
+			timing = profiler.enabled
+			if timing:
+				start = time.perf_counter()
+			# Peers compare timestamps, so they travel on the server timeline
+			if 'timestamp' in state_data:
+				state_data['timestamp'] = self.clock.to_server_time(state_data['timestamp'])
+			self._send_seq += 1
+			state_data['seq'] = self._send_seq
+			self.stats.record_send(state_data)
+			if timing:
+				start = profiler.lap(STAGE_ENCODE, start)
+			tracer.stamp(state_data, HOP_CLIENT_SEND)
 			self.sio.emit('player_update', state_data)
+			if timing:
+				profiler.lap(STAGE_EMIT, start)
 
-	def register_callback(self, event: str, callback: Callable):
-		self.callbacks[event] = callback
+	def send_mission_op(self, op: Dict[str, Any]) -> Dict[str, Any]:
+		"""Submit a mission operation, the server assigns its version"""
+		if not self.session_id:
+			return {'status': 'failed', 'error': 'Not in session'}
+		try:
+			return self.sio.call('mission_op', op, timeout=5)
+		except Exception as e:
+			print(f"Failed to send mission op: {e}")
+			return {'status': 'failed', 'error': str(e)}
 
-	def _on_connect(self):
-		print("Connected to server")
-		if 'connect' in self.callbacks:
-			self.callbacks['connect']()
+	def request_mission_state(self, since_version: int = None) -> Dict[str, Any]:
+		"""Fetch missed mission ops after since_version, or a full snapshot"""
+		try:
+			return self.sio.call('get_mission_state', {'since_version': since_version}, timeout=5)
+		except Exception as e:
+			print(f"Failed to fetch mission state: {e}")
+			return {'status': 'failed', 'error': str(e)}
 
-	def _on_disconnect(self):
-		print("Disconnected from server")
-		if 'disconnect' in self.callbacks:
-			self.callbacks['disconnect']()
+	def sync_clock(self, samples: int = 1) -> bool:
+		"""Probe the server clock, returns True if at least one sample was accepted"""
+		accepted = False
+		for i in range(samples):
+			if not self.is_connected:
+				break
+			try:
+				t0 = time.time()
+				response = self.sio.call('time_sync', {'client_time': t0}, timeout=2)
+				t3 = time.time()
+				if response and self.clock.add_sample(t0, response['server_receive'], response['server_send'], t3):
+					accepted = True
+					self.stats.record_rtt((t3 - t0) - (response['server_send'] - response['server_receive']))
+			except Exception as e:
+				print(f"Clock sync probe failed: {e}")
+			if i < samples - 1:
+				self.sio.sleep(0.05)
+		return accepted
+
+	def _clock_sync_loop(self):
+		"""Burst of probes after connecting, then one probe per interval"""
+		try:
+			self.sync_clock(self.clock_sync_burst)
+			while self.is_connected:
+				# Probe every second while the stats panel needs live RTT
+				self.sio.sleep(1.0 if self.stats.enabled else self.clock_sync_interval)
+				self.sync_clock()
+		finally:
+			self._clock_task = None
+
+	def server_time(self) -> float:
+		"""Current time on the shared server timeline"""
+		return self.clock.server_time()
+
+	def get_clock_status(self) -> Dict[str, Any]:
+		"""Current clock offset, round trip time and confidence"""
+		return self.clock.get_status()
+
+	def register_callback(self, event: str, callback: Callable):
+		self.callbacks[event] = callback
 
 	def _on_sync_update(self, data):
+		tracer.stamp(data, HOP_PEER_RECEIVE)
+		timing = profiler.enabled
+		if timing:
+			start = time.perf_counter()
+		self.last_session_seq = max(self.last_session_seq, data.get('session_seq', 0))
+		# Sender timestamps are on the server timeline, keep a local copy for staleness checks
+		if 'timestamp' in data:
+			data['local_timestamp'] = self.clock.to_local_time(data['timestamp'])
+		if self.stats.enabled:
+			age = self.clock.server_time() - data['timestamp'] if 'timestamp' in data else None
+			self.stats.record_receive(data.get('player_id'), data, age)
 		if 'sync_update' in self.callbacks:
 			self.callbacks['sync_update'](data)
+		if timing:
+			profiler.lap(STAGE_RECEIVE, start)
+
+	def _on_mission_op(self, data):
+		if 'mission_op' in self.callbacks:
+			self.callbacks['mission_op'](data)
 
 	def _on_player_joined(self, data):
 		print(f"Player joined: {data['player_id']}")
+		if data['player_id'] != self.player_id:
+			self.session_players.add(data['player_id'])
 		if 'player_joined' in self.callbacks:
 			self.callbacks['player_joined'](data)
 
 	def _on_player_left(self, data):
 		print(f"Player left: {data['player_id']}")
+		self.session_players.discard(data['player_id'])
+		self.stats.remove_player(data['player_id'])
 		if 'player_left' in self.callbacks:
 			self.callbacks['player_left'](data)
 
 	def disconnect(self):
 		if self.sio.connected:
+			# Leave explicitly so the server does not hold the slot for a resume
+			if self.session_id:
+				try:
+					self.sio.call('leave_session', {'session_id': self.session_id}, timeout=2)
+				except Exception as e:
+					print(f"Failed to leave session: {e}")
+			self.session_id = None
+			self.resume_token = None
+			self.last_session_seq = 0
+			self.session_players = set()
+			self._reset_mission_replica()
 			self.sio.disconnect()
\ No newline at end of file
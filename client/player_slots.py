@@ -0,0 +1,189 @@
+import ctypes
+import time
+from typing import Dict, Any, Iterable, List, Optional
+
+# Remote player table, mirrored by RemotePlayerTable/RemotePlayerSlot in
+# injector/sansync.h and the ffi cdef in scripts/shared_memory.lua.
+SLOTS_MAGIC = 0x534C5052  # 'RPLS'
+SLOTS_VERSION = 1
+MAX_REMOTE_PLAYERS = 64
+PLAYER_ID_SIZE = 40
+VEHICLE_NAME_SIZE = 16
+
+# Slot flags
+SLOT_ACTIVE = 0x1
+SLOT_IN_VEHICLE = 0x2
+
+
+class RemotePlayerTableHeader(ctypes.Structure):
+	_fields_ = [
+		("magic", ctypes.c_uint32),
+		("version", ctypes.c_uint32),
+		("capacity", ctypes.c_uint32),
+		("slot_size", ctypes.c_uint32),
+		("generation", ctypes.c_uint32),  # Odd while a batch is being written
+		("active", ctypes.c_uint32),  # Number of active slots after the last batch
+		("reserved", ctypes.c_uint8 * 40)
+	]
+
+
+class RemotePlayerSlot(ctypes.Structure):
+	_fields_ = [
+		("player_id", ctypes.c_char * PLAYER_ID_SIZE),
+		("flags", ctypes.c_uint32),
+		("sequence", ctypes.c_uint32),  # Generation of the batch that last changed this slot
+		("position", ctypes.c_float * 3),
+		("heading", ctypes.c_float),
+		("velocity", ctypes.c_float * 3),
+		("health", ctypes.c_float),
+		("vehicle_model", ctypes.c_uint32),
+		("vehicle_health", ctypes.c_float),
+		("vehicle_name", ctypes.c_char * VEHICLE_NAME_SIZE),
+		("timestamp", ctypes.c_double),
+		("reserved", ctypes.c_uint8 * 16)
+	]
+
+
+assert ctypes.sizeof(RemotePlayerTableHeader) == 64, "RemotePlayerTable must match injector/sansync.h"
+assert ctypes.sizeof(RemotePlayerSlot) == 128, "RemotePlayerSlot must match injector/sansync.h"
+
+
+def slot_table_size(capacity: int = MAX_REMOTE_PLAYERS) -> int:
+	return ctypes.sizeof(RemotePlayerTableHeader) + capacity * ctypes.sizeof(RemotePlayerSlot)
+
+
+class PlayerSlotTable:
+	"""Fixed table of remote player slots, published in batches.
+
+	The client is the only writer. A batch makes the generation odd, rewrites
+	every changed slot and makes it even again, so the game side can read the
+	whole table once per frame with the same seqlock retry as the state
+	record. Slot indices are assigned on first sight of a player and reused
+	after the player is removed.
+	"""
+
+	def __init__(self, buffer, offset: int, capacity: Optional[int] = None):
+		self.header = RemotePlayerTableHeader.from_buffer(buffer, offset)
+		if capacity is None:
+			capacity = self.header.capacity
+		self.capacity = capacity
+		self.slots = (RemotePlayerSlot * capacity).from_buffer(buffer, offset + ctypes.sizeof(RemotePlayerTableHeader))
+		self.indices: Dict[str, int] = {}
+		self.free: List[int] = list(range(capacity - 1, -1, -1))
+
+	def initialize(self):
+		"""Clear every slot, only valid while the game side is not reading"""
+		ctypes.memset(ctypes.addressof(self.header), 0, slot_table_size(self.capacity))
+		self.header.magic = SLOTS_MAGIC
+		self.header.version = SLOTS_VERSION
+		self.header.capacity = self.capacity
+		self.header.slot_size = ctypes.sizeof(RemotePlayerSlot)
+		self.indices.clear()
+		self.free = list(range(self.capacity - 1, -1, -1))
+
+	@property
+	def is_initialized(self) -> bool:
+		return self.header.magic == SLOTS_MAGIC and self.header.capacity == self.capacity
+
+	@property
+	def generation_offset(self) -> int:
+		"""Byte offset of the generation word from the start of the table"""
+		return RemotePlayerTableHeader.generation.offset
+
+	def write_batch(self, updates: Dict[str, Dict[str, Any]], removed: Iterable[str] = ()) -> int:
+		"""Publish all updates and removals under one generation bump, returns slots written"""
+		header = self.header
+		generation = (header.generation + 1) & 0xFFFFFFFF
+		header.generation = generation  # Odd: batch in progress
+		written = 0
+
+		for player_id in removed:
+			index = self.indices.pop(player_id, None)
+			if index is None:
+				continue
+			slot = self.slots[index]
+			slot.flags = 0
+			slot.sequence = generation
+			slot.player_id = b''
+			self.free.append(index)
+			written += 1
+
+		for player_id, state in updates.items():
+			index = self.indices.get(player_id)
+			if index is None:
+				if not self.free:
+					print(f"Warning: Remote player table full, skipping {player_id}")
+					continue
+				index = self.indices[player_id] = self.free.pop()
+				self.slots[index].player_id = player_id.encode('ascii', 'replace')[:PLAYER_ID_SIZE - 1]
+			self._write_slot(self.slots[index], state, generation)
+			written += 1
+
+		header.active = len(self.indices)
+		header.generation = (generation + 1) & 0xFFFFFFFF
+		return written
+
+	def _write_slot(self, slot: RemotePlayerSlot, state: Dict[str, Any], generation: int):
+		position = state.get('position', {})
+		velocity = state.get('velocity', {})
+		vehicle = state.get('vehicle')
+
+		flags = SLOT_ACTIVE
+		if vehicle:
+			flags |= SLOT_IN_VEHICLE
+			slot.vehicle_model = int(vehicle.get('model', 0))
+			slot.vehicle_health = float(vehicle.get('health', 0.0))
+			slot.vehicle_name = str(vehicle.get('type', '')).encode('ascii', 'replace')[:VEHICLE_NAME_SIZE - 1]
+		else:
+			slot.vehicle_model = 0
+			slot.vehicle_health = 0.0
+			slot.vehicle_name = b''
+
+		slot.position[:] = (position.get('x', 0.0), position.get('y', 0.0), position.get('z', 0.0))
+		slot.heading = float(state.get('heading', 0.0))
+		slot.velocity[:] = (velocity.get('x', 0.0), velocity.get('y', 0.0), velocity.get('z', 0.0))
+		slot.health = float(state.get('health', 0.0))
+		slot.timestamp = float(state.get('timestamp', 0.0))
+		slot.flags = flags
+		slot.sequence = generation
+
+	def read_all(self, max_retries: int = 1000) -> Optional[Dict[str, Dict[str, Any]]]:
+		"""Consistent copy of all active slots keyed by player id (game side, used for testing)"""
+		header = self.header
+		size = ctypes.sizeof(self.slots)
+		copy = (RemotePlayerSlot * self.capacity)()
+		for attempt in range(max_retries):
+			start = header.generation
+			if not start & 1:
+				ctypes.memmove(ctypes.addressof(copy), ctypes.addressof(self.slots), size)
+				if header.generation == start:
+					return {slot.player_id.decode('ascii', 'replace'): _slot_to_dict(slot)
+							for slot in copy if slot.flags & SLOT_ACTIVE}
+			if attempt & 0xF == 0xF:
+				time.sleep(0)
+		return None
+
+	def release(self):
+		"""Drop the buffer references so the mapping can be closed"""
+		self.header = None
+		self.slots = None
+
+
+def _slot_to_dict(slot: RemotePlayerSlot) -> Dict[str, Any]:
+	x, y, z = slot.position
+	vx, vy, vz = slot.velocity
+	state = {
+		'position': {'x': x, 'y': y, 'z': z},
+		'heading': slot.heading,
+		'velocity': {'x': vx, 'y': vy, 'z': vz},
+		'health': slot.health,
+		'timestamp': slot.timestamp,
+		'sequence': slot.sequence
+	}
+	if slot.flags & SLOT_IN_VEHICLE:
+		state['vehicle'] = {
+			'model': slot.vehicle_model,
+			'health': slot.vehicle_health,
+			'type': slot.vehicle_name.decode('ascii', 'replace')
+		}
+	return state
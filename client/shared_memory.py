@@ -1,173 +1,170 @@
-import mmap
 import json
-from json.decoder import JSONDecodeError
 import threading
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import time
 import os
-from dotenv import load_dotenv
-import ctypes
-from ctypes import wintypes, windll, byref, get_last_error, WinError
-from ctypes.wintypes import DWORD, HANDLE, BOOL, LPVOID
-import sys
-
-# Add security descriptor structures
-class SECURITY_ATTRIBUTES(ctypes.Structure):
-	_fields_ = [
-		("nLength", DWORD),
-		("lpSecurityDescriptor", LPVOID),
-		("bInheritHandle", BOOL)
-	]
+from .config import load_config
+from .command_ring import CommandRing, ring_region_size, POLICY_DROP, POLICY_BLOCK
+from .state_record import PlayerStateRecord, SeqlockReader, initialize_record, dict_to_record
+from .shm_notify import create_notifier
+from .shm_backends import create_backend
+from .player_slots import PlayerSlotTable, MAX_REMOTE_PLAYERS, slot_table_size
+from .shm_header import SharedMemoryHeader, HEADER_MAGIC, HEADER_VERSION, HEADER_INITIALIZED
+
 
 class SharedMemoryInterface:
-	def __init__(self):
-		load_dotenv()
+	"""Client side of the shared memory protocol, independent of how the region is mapped.
+
+	create=True sets up a fresh region (header, command ring, state record),
+	create=False attaches to one another process created. The mapping itself
+	comes from a backend in shm_backends, chosen by SHARED_MEMORY_BACKEND.
+	probe=True marks an attach that is expected to fail when no region exists
+	yet, its failure raises without being logged as an error.
+	"""
+
+	def __init__(self, create: bool = True, backend: Optional[str] = None, probe: bool = False):
+		load_config()
+		self.backend = None
 		self.shared_mem = None
-		self.mapping_handle = None
+		self.command_ring = None
+		self.state_record = None
+		self.state_reader = None
+		self.command_notifier = None
+		self.state_notifier = None
+		self.player_slots = None
+		self.response_ring = None
+		self.response_notifier = None
+		self.header = None
 		self.lock = threading.Lock()
-		
-		# Check admin rights
-		if not self._is_admin():
-			self._request_admin()
-			sys.exit(0)  # Exit current instance
+		self.create = create
+		self.probe = probe
 			
 		# Load configuration from environment
 		self.MEMORY_NAME = os.getenv('SHARED_MEMORY_NAME', 'GTAVCoopSharedMem')
 		self.MEMORY_SIZE = int(os.getenv('SHARED_MEMORY_SIZE', 1048576))
 		
 		self.HEADER_SIZE = 128
-		self.COMMAND_BUFFER_SIZE = 4096
+		self.COMMAND_RING_CAPACITY = 65536
+		self.COMMAND_BUFFER_SIZE = ring_region_size(self.COMMAND_RING_CAPACITY)
 		self.STATE_BUFFER_SIZE = 8192
+		self.REMOTE_PLAYERS_OFFSET = self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE + self.STATE_BUFFER_SIZE
+		self.REMOTE_PLAYERS_SIZE = slot_table_size(MAX_REMOTE_PLAYERS)
+		self.RESPONSE_OFFSET = self.REMOTE_PLAYERS_OFFSET + self.REMOTE_PLAYERS_SIZE
+		self.RESPONSE_RING_CAPACITY = 16384
+		
+		# What to do when the game side falls behind on commands
+		self.overflow_policy = POLICY_BLOCK if os.getenv('COMMAND_OVERFLOW_POLICY', 'drop') == 'block' else POLICY_DROP
 		
-		self.kernel32 = windll.kernel32
+		self.backend = create_backend(self.MEMORY_NAME, self.MEMORY_SIZE, create, backend)
 		
 		if not self._initialize():
 			raise RuntimeError("Failed to initialize shared memory")
-			
-	def _is_admin(self):
-		"""Check if the current process has admin privileges"""
-		try:
-			return ctypes.windll.shell32.IsUserAnAdmin()
-		except:
-			return False
-			
-	def _request_admin(self):
-		"""Request elevation to admin privileges"""
-		script = os.path.abspath(sys.argv[0])
-		params = ' '.join(sys.argv[1:])
-		ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, f'"{script}" {params}', None, 1)
-
 
-		
 	def _verify_header(self) -> bool:
 		"""Verify header is properly initialized"""
-		try:
-			self.shared_mem.seek(0)
-			header_bytes = self.shared_mem.read(self.HEADER_SIZE)
-			if b'|' not in header_bytes:
-				print("No terminator found in header")
-				return False
-			
-			header_data = header_bytes.split(b'|')[0].decode('ascii')
-			if not header_data:
-				print("Empty header data")
-				return False
-				
-			header = json.loads(header_data)
-			return header.get('initialized', False)
-		except JSONDecodeError as e:
-			print(f"Failed to decode header JSON: {e}")
+		header = self.header
+		if header.magic != HEADER_MAGIC:
+			print("Shared memory header magic mismatch")
 			return False
-		except Exception as e:
-			print(f"Failed to verify header: {e}")
+		if header.version != HEADER_VERSION:
+			print(f"Shared memory layout version {header.version}, expected {HEADER_VERSION}")
 			return False
+		return bool(header.flags & HEADER_INITIALIZED)
 
 	def _initialize(self) -> bool:
 		try:
-			# Create security attributes
-			sa = SECURITY_ATTRIBUTES()
-			sa.nLength = ctypes.sizeof(SECURITY_ATTRIBUTES)
-			sa.bInheritHandle = True
-			sa.lpSecurityDescriptor = None  # NULL for default security
-
-			# Create file mapping with explicit security attributes
-			PAGE_READWRITE = 0x04
-			self.mapping_handle = self.kernel32.CreateFileMappingW(
-				HANDLE(-1),  # INVALID_HANDLE_VALUE
-				byref(sa),   # Security attributes
-				PAGE_READWRITE,
-				0,
-				self.MEMORY_SIZE,
-				self.MEMORY_NAME
-			)
-
-			if not self.mapping_handle:
-				raise WinError(get_last_error())
-
-			# Map view of file
-			FILE_MAP_ALL_ACCESS = 0xF001F
-			ptr = self.kernel32.MapViewOfFile(
-				self.mapping_handle,
-				FILE_MAP_ALL_ACCESS,
-				0,
-				0,
-				self.MEMORY_SIZE
-			)
-
-			if not ptr:
-				self.kernel32.CloseHandle(self.mapping_handle)
-				raise WinError(get_last_error())
-
-			# Create mmap object from handle
-			self.shared_mem = mmap.mmap(-1, self.MEMORY_SIZE, tagname=self.MEMORY_NAME)
-
-			# Initialize header
-			header = {
-				'version': 1,
-				'command_offset': self.HEADER_SIZE,
-				'state_offset': self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE,
-				'initialized': True,
-				'pid': os.getpid()
-			}
+			self.backend.open()
+			self.shared_mem = self.backend.buffer
+			self.header = SharedMemoryHeader.from_buffer(self.shared_mem, 0)
+			if self.create:
+				self.header.flags = 0  # Not attachable until _write_header completes
 			
-			header_json = json.dumps(header, ensure_ascii=True)
-			header_bytes = header_json.encode('ascii') + b'|'
-			
-			if len(header_bytes) > self.HEADER_SIZE:
-				raise ValueError(f"Header data too large: {len(header_bytes)} bytes > {self.HEADER_SIZE}")
-			
-			self.shared_mem.seek(0)
-			self.shared_mem.write(header_bytes.ljust(self.HEADER_SIZE, b'\0'))
+			if not self.create and not self._verify_header():
+				raise RuntimeError(f"Shared memory region '{self.MEMORY_NAME}' has not been initialized")
+
+			# Command ring right after the header, an attached ring reads its capacity from the control block
+			self.command_ring = CommandRing(self.shared_mem, self.HEADER_SIZE,
+											self.COMMAND_RING_CAPACITY if self.create else None,
+											policy=self.overflow_policy)
+			if self.create:
+				self.command_ring.initialize()
+			elif not self.command_ring.is_initialized:
+				raise RuntimeError("Command ring has not been initialized")
+
+			# Binary state record at the start of the state area, read in place
+			self.state_record = PlayerStateRecord.from_buffer(self.shared_mem, self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE)
+			if self.create:
+				initialize_record(self.state_record)
+			self.state_reader = SeqlockReader(self.state_record)
+
+			# Remote player slots after the state area, rewritten in one batch per sync frame
+			self.player_slots = PlayerSlotTable(self.shared_mem, self.REMOTE_PLAYERS_OFFSET,
+												MAX_REMOTE_PLAYERS if self.create else None)
+			if self.create:
+				self.player_slots.initialize()
+			elif not self.player_slots.is_initialized:
+				raise RuntimeError("Remote player table has not been initialized")
+
+			# Response ring after the remote player table, the game side is its producer
+			self.response_ring = CommandRing(self.shared_mem, self.RESPONSE_OFFSET,
+											 self.RESPONSE_RING_CAPACITY if self.create else None)
+			if self.create:
+				self.response_ring.initialize()
+			elif not self.response_ring.is_initialized:
+				raise RuntimeError("Response ring has not been initialized")
+
+			# Wake-ups on the ring head and the state sequence instead of polling
+			self.command_notifier = create_notifier(self.shared_mem, self.HEADER_SIZE + self.command_ring.head_offset,
+													f"{self.MEMORY_NAME}_Command")
+			self.state_notifier = create_notifier(self.shared_mem, self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE +
+												  PlayerStateRecord.sequence.offset, f"{self.MEMORY_NAME}_State")
+			self.response_notifier = create_notifier(self.shared_mem, self.RESPONSE_OFFSET + self.response_ring.head_offset,
+													 f"{self.MEMORY_NAME}_Response")
+
+			if self.create:
+				self._write_header()
 			
 			return True
 
 		except Exception as e:
-			print(f"[SharedMem] Critical error during initialization: {str(e)}")
+			if not self.probe:
+				print(f"[SharedMem] Critical error during initialization ({self.backend.name} backend): {str(e)}")
 			self.close()
 			return False
 
+	def _write_header(self):
+		"""Write the layout header, flagged initialized last so attachers never see a partial region"""
+		header = self.header
+		header.magic = HEADER_MAGIC
+		header.version = HEADER_VERSION
+		header.creator_pid = os.getpid()
+		header.command_offset = self.HEADER_SIZE
+		header.state_offset = self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE
+		header.remote_players_offset = self.REMOTE_PLAYERS_OFFSET
+		header.response_offset = self.RESPONSE_OFFSET
+		# game_pid and heartbeat belong to the game side, which may have attached first
+		header.flags = HEADER_INITIALIZED
 
-			
-	def _write_header(self, header: Dict):
-		"""Write header information to shared memory"""
-		if not self.shared_mem:
-			raise RuntimeError("Shared memory not initialized")
-			
-		with self.lock:
-			try:
-				self.shared_mem.seek(0)
-				header_data = json.dumps(header, ensure_ascii=True).encode('ascii') + b'|'
-				if len(header_data) > self.HEADER_SIZE:
-					raise ValueError(f"Header data too large: {len(header_data)} bytes > {self.HEADER_SIZE}")
-				self.shared_mem.write(header_data.ljust(self.HEADER_SIZE, b'\0'))
-			except Exception as e:
-				raise RuntimeError(f"Failed to write header: {e}") from e
+	def write_heartbeat(self, game_pid: int):
+		"""Game side liveness beat, once per frame (used by the simulator)"""
+		if not self.header:
+			return
+		self.header.game_pid = game_pid
+		self.header.heartbeat_time = time.time()
+		self.header.heartbeat = (self.header.heartbeat + 1) & 0xFFFFFFFF
+
+	def read_heartbeat(self) -> Tuple[int, float, int]:
+		"""(heartbeat counter, game side time of the last beat, game pid)"""
+		if not self.header:
+			return 0, 0.0, 0
+		header = self.header
+		return header.heartbeat, header.heartbeat_time, header.game_pid
 
 
 
 
 	def write_command(self, command: Dict):
-		"""Write command to shared memory for Lua script"""
+		"""Queue a command in the shared memory ring for the game side"""
 		if not self.shared_mem:
 			print("Error: Shared memory not initialized")
 			return False
@@ -179,38 +176,30 @@ class SharedMemoryInterface:
 			if 'pid' not in command:
 				command['pid'] = os.getpid()
 				
+			command_data = json.dumps(command, ensure_ascii=True).encode('ascii')
+			# The ring has a single producer, Python threads take turns
 			with self.lock:
-				command_data = json.dumps(command, ensure_ascii=True).encode('ascii') + b'|'
-				if len(command_data) > self.COMMAND_BUFFER_SIZE:
-					print(f"Error: Command data too large: {len(command_data)} bytes > {self.COMMAND_BUFFER_SIZE}")
+				if not self.command_ring.write(command_data):
+					print(f"Error: Command ring full, dropped {command.get('type')} command")
 					return False
-				self.shared_mem.seek(self.HEADER_SIZE)
-				self.shared_mem.write(command_data.ljust(self.COMMAND_BUFFER_SIZE, b'\0'))
-				return True
+			self.command_notifier.notify()
+			return True
 		except Exception as e:
 			print(f"Error: Failed to write command: {e}")
 			return False
 
 
 	def read_command(self) -> Optional[Dict]:
-		"""Read command from shared memory"""
+		"""Pop the oldest command from the ring (consumer side, used for testing)"""
 		if not self.shared_mem:
 			print("Error: Shared memory not initialized")
 			return None
 			
 		try:
-			with self.lock:
-				self.shared_mem.seek(self.HEADER_SIZE)
-				command_bytes = self.shared_mem.read(self.COMMAND_BUFFER_SIZE)
-				if b'|' not in command_bytes:
-					print("No terminator found in command data")
-					return None
-					
-				command_data = command_bytes.split(b'|')[0].decode('ascii')
-				if not command_data:
-					return None
-					
-				return json.loads(command_data)
+			command_data = self.command_ring.read()
+			if command_data is None:
+				return None
+			return json.loads(command_data)
 		except json.JSONDecodeError as e:
 			print(f"Error: Failed to decode command JSON: {e}")
 			return None
@@ -218,9 +207,58 @@ class SharedMemoryInterface:
 			print(f"Error: Failed to read command: {e}")
 			return None
 
+	def wait_for_command(self, timeout: Optional[float] = None) -> bool:
+		"""Block until the ring holds a command, returns False on timeout"""
+		if not self.command_ring:
+			return False
+		return self.command_notifier.wait(self.command_ring.tail, timeout)
+
+	def get_command_stats(self) -> Dict[str, int]:
+		"""Ring fill level and written/read/dropped/overflow counters"""
+		if not self.command_ring:
+			return {}
+		return self.command_ring.get_stats()
+
+	def write_response(self, response: Dict) -> bool:
+		"""Answer a command through the response ring (game side, used by the simulator)"""
+		if not self.response_ring:
+			return False
+			
+		try:
+			response_data = json.dumps(response, ensure_ascii=True).encode('ascii')
+			with self.lock:
+				if not self.response_ring.write(response_data):
+					print(f"Error: Response ring full, dropped response to command {response.get('id')}")
+					return False
+			self.response_notifier.notify()
+			return True
+		except Exception as e:
+			print(f"Error: Failed to write response: {e}")
+			return False
+
+	def read_response(self) -> Optional[Dict]:
+		"""Pop the oldest command response, None if there is none"""
+		if not self.response_ring:
+			return None
+			
+		try:
+			response_data = self.response_ring.read()
+			if response_data is None:
+				return None
+			return json.loads(response_data)
+		except json.JSONDecodeError as e:
+			print(f"Error: Failed to decode response JSON: {e}")
+			return None
+
+	def wait_for_response(self, timeout: Optional[float] = None) -> bool:
+		"""Block until the response ring holds a record, returns False on timeout"""
+		if not self.response_ring:
+			return False
+		return self.response_notifier.wait(self.response_ring.tail, timeout)
+
 	def write_state(self, state: Dict):
-		"""Write game state to shared memory"""
-		if not self.shared_mem:
+		"""Write game state to the binary state record (game side, used for testing)"""
+		if not self.state_record:
 			print("Error: Shared memory not initialized")
 			return False
 			
@@ -232,36 +270,58 @@ class SharedMemoryInterface:
 				state['pid'] = os.getpid()
 				
 			with self.lock:
-				state_data = json.dumps(state, ensure_ascii=True).encode('ascii') + b'|'
-				if len(state_data) > self.STATE_BUFFER_SIZE:
-					print(f"Error: State data too large: {len(state_data)} bytes > {self.STATE_BUFFER_SIZE}")
-					return False
-					
-				self.shared_mem.seek(self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE)
-				self.shared_mem.write(state_data.ljust(self.STATE_BUFFER_SIZE, b'\0'))
-				return True
+				dict_to_record(state, self.state_record)
+			self.state_notifier.notify()
+			return True
 		except Exception as e:
 			print(f"Error: Failed to write game state: {e}")
 			return False
 
 
 	def read_game_state(self) -> Optional[Dict]:
-		"""Read game state from shared memory"""
-		if not self.shared_mem:
+		"""Read a consistent copy of the local player state"""
+		if not self.state_reader:
 			return None
 			
+		try:
+			return self.state_reader.read()
+		except Exception:
+			return None
+
+	def wait_for_state(self, timeout: Optional[float] = None) -> bool:
+		"""Block until the game writes a sample newer than the last read, returns False on timeout"""
+		if not self.state_reader:
+			return False
+		if self.state_reader.last_sequence is None:
+			return True
+		return self.state_notifier.wait(self.state_reader.last_sequence, timeout)
+
+	def write_remote_players(self, updates: Dict[str, Dict], removed=()) -> bool:
+		"""Publish remote player updates and removals as one batch"""
+		if not self.player_slots:
+			return False
+			
 		try:
 			with self.lock:
-				self.shared_mem.seek(self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE)
-				state_bytes = self.shared_mem.read(self.STATE_BUFFER_SIZE)
-				if b'|' not in state_bytes:
-					return None
-					
-				state_data = state_bytes.split(b'|')[0].decode('ascii')
-				if not state_data:
-					return None
-					
-				return json.loads(state_data)
+				self.player_slots.write_batch(updates, removed)
+			return True
+		except Exception as e:
+			print(f"Error: Failed to write remote players: {e}")
+			return False
+
+	def read_remote_players(self) -> Optional[Dict[str, Dict]]:
+		"""Consistent copy of the remote player table (game side, used for testing)"""
+		if not self.player_slots:
+			return None
+		return self.player_slots.read_all()
+
+	def read_game_state_if_changed(self):
+		"""Like read_game_state, but returns STATE_UNCHANGED when no new sample was written"""
+		if not self.state_reader:
+			return None
+			
+		try:
+			return self.state_reader.read_if_changed()
 		except Exception:
 			return None
 
@@ -269,13 +329,31 @@ class SharedMemoryInterface:
 		
 	def close(self):
 		try:
-			if self.shared_mem:
-				self.shared_mem.close()
-				self.shared_mem = None
+			for notifier in (self.command_notifier, self.state_notifier, self.response_notifier):
+				if notifier:
+					notifier.release()
+			self.command_notifier = None
+			self.state_notifier = None
+			self.response_notifier = None
 			
-			if self.mapping_handle:
-				self.kernel32.CloseHandle(self.mapping_handle)
-				self.mapping_handle = None
+			if self.player_slots:
+				self.player_slots.release()
+				self.player_slots = None
+				
+			for ring in (self.command_ring, self.response_ring):
+				if ring:
+					ring.release()
+			self.command_ring = None
+			self.response_ring = None
+				
+			# Drop the record so the mmap has no exported buffers left
+			self.state_reader = None
+			self.state_record = None
+				
+			self.header = None
+			self.shared_mem = None
+			if self.backend:
+				self.backend.close()
 				
 			print("[SharedMem] Cleanup completed")
 		except Exception as e:
@@ -0,0 +1,178 @@
+import ctypes
+import mmap
+import os
+import sys
+import tempfile
+from typing import Optional
+
+
+class SharedMemoryBackend:
+	"""Owns a named shared mapping and exposes it as a writable buffer.
+
+	Backends only map memory; the layout on top of it lives in
+	SharedMemoryInterface. create=True makes a new region of size bytes,
+	create=False attaches to one another process created.
+	"""
+
+	name = 'base'
+
+	def __init__(self, memory_name: str, size: int, create: bool = True):
+		self.memory_name = memory_name
+		self.size = size
+		self.create = create
+		self.buffer = None
+
+	def open(self):
+		raise NotImplementedError
+
+	def close(self):
+		raise NotImplementedError
+
+
+class WindowsMappingBackend(SharedMemoryBackend):
+	"""Named file mapping in the page file, the region the DLL and Lua script open by name"""
+
+	name = 'windows'
+
+	def __init__(self, memory_name: str, size: int, create: bool = True):
+		super().__init__(memory_name, size, create)
+		self.mapping_handle = None
+		self.kernel32 = None
+
+	def open(self):
+		from ctypes import wintypes, get_last_error, WinError
+
+		class SECURITY_ATTRIBUTES(ctypes.Structure):
+			_fields_ = [
+				("nLength", wintypes.DWORD),
+				("lpSecurityDescriptor", wintypes.LPVOID),
+				("bInheritHandle", wintypes.BOOL)
+			]
+
+		self.kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+		self.kernel32.CreateFileMappingW.restype = wintypes.HANDLE
+		self.kernel32.OpenFileMappingW.restype = wintypes.HANDLE
+
+		FILE_MAP_ALL_ACCESS = 0xF001F
+		if self.create:
+			sa = SECURITY_ATTRIBUTES()
+			sa.nLength = ctypes.sizeof(SECURITY_ATTRIBUTES)
+			sa.bInheritHandle = True
+			sa.lpSecurityDescriptor = None  # NULL for default security
+
+			PAGE_READWRITE = 0x04
+			self.mapping_handle = self.kernel32.CreateFileMappingW(
+				wintypes.HANDLE(-1),  # INVALID_HANDLE_VALUE
+				ctypes.byref(sa),
+				PAGE_READWRITE,
+				0,
+				self.size,
+				self.memory_name
+			)
+		else:
+			self.mapping_handle = self.kernel32.OpenFileMappingW(FILE_MAP_ALL_ACCESS, False, self.memory_name)
+
+		if not self.mapping_handle:
+			raise WinError(get_last_error())
+
+		# The handle above keeps the mapping alive; mmap maps a view of it by tag name
+		self.buffer = mmap.mmap(-1, self.size, tagname=self.memory_name)
+
+	def close(self):
+		if self.buffer is not None:
+			self.buffer.close()
+			self.buffer = None
+		if self.mapping_handle:
+			self.kernel32.CloseHandle(self.mapping_handle)
+			self.mapping_handle = None
+
+
+class PosixSharedMemoryBackend(SharedMemoryBackend):
+	"""POSIX shm_open region through multiprocessing.shared_memory"""
+
+	name = 'posix'
+	created_here = set()  # Regions this process created and will unlink
+
+	def __init__(self, memory_name: str, size: int, create: bool = True):
+		super().__init__(memory_name, size, create)
+		self.shm = None
+
+	def open(self):
+		from multiprocessing import shared_memory, resource_tracker
+
+		if self.create:
+			try:
+				# Leftover from a crashed run, start from a clean region
+				stale = shared_memory.SharedMemory(name=self.memory_name)
+				stale.close()
+				stale.unlink()
+			except FileNotFoundError:
+				pass
+			self.shm = shared_memory.SharedMemory(name=self.memory_name, create=True, size=self.size)
+			self.created_here.add(self.memory_name)
+		else:
+			self.shm = shared_memory.SharedMemory(name=self.memory_name)
+			if self.memory_name not in self.created_here:
+				# Only the creator may unlink, keep the tracker from doing it when this process exits
+				resource_tracker.unregister(self.shm._name, 'shared_memory')
+		self.buffer = self.shm.buf
+
+	def close(self):
+		if self.shm is not None:
+			self.buffer = None
+			self.shm.close()
+			if self.create:
+				self.shm.unlink()
+				self.created_here.discard(self.memory_name)
+			self.shm = None
+
+
+class FileBackend(SharedMemoryBackend):
+	"""mmap of a regular file, works anywhere and leaves the region inspectable on disk"""
+
+	name = 'file'
+
+	def __init__(self, memory_name: str, size: int, create: bool = True, path: Optional[str] = None):
+		super().__init__(memory_name, size, create)
+		self.path = path or os.getenv('SHARED_MEMORY_FILE') or os.path.join(tempfile.gettempdir(), f"{memory_name}.shm")
+		self.file = None
+
+	def open(self):
+		if self.create:
+			self.file = open(self.path, 'w+b')
+			self.file.truncate(self.size)
+		else:
+			self.file = open(self.path, 'r+b')
+		self.buffer = mmap.mmap(self.file.fileno(), self.size)
+
+	def close(self):
+		if self.buffer is not None:
+			self.buffer.close()
+			self.buffer = None
+		if self.file is not None:
+			self.file.close()
+			self.file = None
+			if self.create:
+				try:
+					os.remove(self.path)
+				except OSError:
+					pass
+
+
+BACKENDS = {
+	WindowsMappingBackend.name: WindowsMappingBackend,
+	PosixSharedMemoryBackend.name: PosixSharedMemoryBackend,
+	FileBackend.name: FileBackend
+}
+
+
+def default_backend_name() -> str:
+	return 'windows' if sys.platform == 'win32' else 'posix'
+
+
+def create_backend(memory_name: str, size: int, create: bool = True, name: Optional[str] = None) -> SharedMemoryBackend:
+	"""Backend chosen by name, SHARED_MEMORY_BACKEND, or the platform default"""
+	name = name or os.getenv('SHARED_MEMORY_BACKEND') or default_backend_name()
+	if name not in BACKENDS:
+		raise ValueError(f"Unknown shared memory backend '{name}', expected one of {', '.join(BACKENDS)}")
+	return BACKENDS[name](memory_name, size, create)
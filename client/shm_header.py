@@ -0,0 +1,30 @@
+import ctypes
+
+# Region header, mirrored by SharedMemoryHeader in injector/sansync.h and the
+# ffi cdef in scripts/shared_memory.lua.
+HEADER_MAGIC = 0x4D485353  # 'SSHM'
+HEADER_VERSION = 6
+
+# flags
+HEADER_INITIALIZED = 0x1
+
+
+class SharedMemoryHeader(ctypes.Structure):
+	_fields_ = [
+		("magic", ctypes.c_uint32),
+		("version", ctypes.c_uint32),
+		("flags", ctypes.c_uint32),
+		("creator_pid", ctypes.c_uint32),
+		("command_offset", ctypes.c_uint32),
+		("state_offset", ctypes.c_uint32),
+		("remote_players_offset", ctypes.c_uint32),
+		("game_pid", ctypes.c_uint32),  # Written by the game side when it attaches
+		("heartbeat", ctypes.c_uint32),  # Incremented by the game script every frame
+		("response_offset", ctypes.c_uint32),
+		("heartbeat_time", ctypes.c_double),  # Game side wall clock at the last beat, seconds
+		("reserved", ctypes.c_uint8 * 80)
+	]
+
+
+HEADER_STRUCT_SIZE = ctypes.sizeof(SharedMemoryHeader)
+assert HEADER_STRUCT_SIZE == 128, "SharedMemoryHeader must match injector/sansync.h"
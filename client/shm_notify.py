@@ -0,0 +1,132 @@
+import ctypes
+import os
+import platform
+import sys
+import time
+from typing import Optional
+
+# futex(2) syscall numbers by architecture
+FUTEX_SYSCALLS = {
+	'x86_64': 202,
+	'amd64': 202,
+	'aarch64': 98,
+	'arm64': 98,
+	'i386': 240,
+	'i686': 240,
+	'armv7l': 240
+}
+FUTEX_WAIT = 0
+FUTEX_WAKE = 1
+INT_MAX = 0x7FFFFFFF
+
+WAIT_OBJECT_0 = 0
+INFINITE = 0xFFFFFFFF
+
+
+class _Timespec(ctypes.Structure):
+	_fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+class Notifier:
+	"""Wait for a u32 word in shared memory to move away from a known value.
+
+	The word is one the producer already updates (the command ring head, the
+	state record sequence), so no extra protocol state is needed: the producer
+	changes the word and then calls notify(). This base class only polls and
+	works everywhere; subclasses block in the kernel instead.
+	"""
+
+	def __init__(self, buffer, offset: int, poll_interval: float = 0.001):
+		self.word = ctypes.c_uint32.from_buffer(buffer, offset)
+		self.poll_interval = poll_interval
+
+	def notify(self):
+		pass
+
+	def wait(self, expected: int, timeout: Optional[float] = None) -> bool:
+		"""Block while the word equals expected, returns False on timeout"""
+		deadline = time.monotonic() + timeout if timeout is not None else None
+		while self.word.value == expected:
+			if deadline is not None and time.monotonic() >= deadline:
+				return False
+			time.sleep(self.poll_interval)
+		return True
+
+	def release(self):
+		"""Drop the buffer reference so the mapping can be closed"""
+		self.word = None
+
+
+class FutexNotifier(Notifier):
+	"""Linux futex on the word itself, works across processes sharing the mapping"""
+
+	def __init__(self, buffer, offset: int):
+		super().__init__(buffer, offset)
+		self.libc = ctypes.CDLL(None, use_errno=True)
+		self.syscall_number = FUTEX_SYSCALLS[platform.machine().lower()]
+		self.address = ctypes.addressof(self.word)
+
+	def notify(self):
+		self.libc.syscall(self.syscall_number, ctypes.c_void_p(self.address), FUTEX_WAKE, INT_MAX, None, None, 0)
+
+	def wait(self, expected: int, timeout: Optional[float] = None) -> bool:
+		deadline = time.monotonic() + timeout if timeout is not None else None
+		while self.word.value == expected:
+			timespec = None
+			if deadline is not None:
+				remaining = deadline - time.monotonic()
+				if remaining <= 0:
+					return False
+				timespec = ctypes.byref(_Timespec(int(remaining), int((remaining % 1) * 1e9)))
+			# The kernel re-checks the word, so a notify between the check and the call is not lost
+			self.libc.syscall(self.syscall_number, ctypes.c_void_p(self.address), FUTEX_WAIT,
+							  ctypes.c_uint32(expected), timespec, None, 0)
+		return True
+
+
+class EventNotifier(Notifier):
+	"""Windows named auto-reset event, shared with the DLL and the Lua script by name"""
+
+	def __init__(self, buffer, offset: int, name: str):
+		super().__init__(buffer, offset)
+		self.kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+		self.kernel32.CreateEventW.restype = ctypes.c_void_p
+		# Opens the event if the other side created it first
+		self.handle = self.kernel32.CreateEventW(None, False, False, name)
+		if not self.handle:
+			raise ctypes.WinError(ctypes.get_last_error())
+
+	def notify(self):
+		self.kernel32.SetEvent(ctypes.c_void_p(self.handle))
+
+	def wait(self, expected: int, timeout: Optional[float] = None) -> bool:
+		deadline = time.monotonic() + timeout if timeout is not None else None
+		while self.word.value == expected:
+			milliseconds = INFINITE
+			if deadline is not None:
+				remaining = deadline - time.monotonic()
+				if remaining <= 0:
+					return False
+				milliseconds = max(1, int(remaining * 1000))
+			# A notify before this call leaves the event set, so it returns at once
+			self.kernel32.WaitForSingleObject(ctypes.c_void_p(self.handle), milliseconds)
+		return True
+
+	def release(self):
+		if self.handle:
+			self.kernel32.CloseHandle(ctypes.c_void_p(self.handle))
+			self.handle = None
+		super().release()
+
+
+def create_notifier(buffer, offset: int, name: str) -> Notifier:
+	"""Best notifier for this platform, SHM_NOTIFY=poll forces the polling fallback"""
+	if os.getenv('SHM_NOTIFY', 'auto') != 'poll':
+		try:
+			if sys.platform == 'win32':
+				return EventNotifier(buffer, offset, name)
+			if sys.platform.startswith('linux') and platform.machine().lower() in FUTEX_SYSCALLS:
+				return FutexNotifier(buffer, offset)
+		except OSError as e:
+			print(f"[SharedMem] Falling back to polling notifications: {e}")
+	return Notifier(buffer, offset)
@@ -0,0 +1,164 @@
+import ctypes
+import time
+from typing import Dict, Any, Optional
+from common.profiling import profiler, STAGE_SHM_READ, STAGE_DECODE
+
+# Binary local player state, mirrored by PlayerStateRecord in injector/sansync.h
+# and the ffi cdef in scripts/shared_memory.lua.
+STATE_MAGIC = 0x54535053  # 'SPST'
+STATE_VERSION = 1
+
+# flags
+FLAG_VALID = 0x1  # Set once the game side has written a sample
+FLAG_IN_VEHICLE = 0x2
+
+VEHICLE_NAME_SIZE = 16
+
+
+class PlayerStateRecord(ctypes.Structure):
+	_fields_ = [
+		("magic", ctypes.c_uint32),
+		("version", ctypes.c_uint32),
+		("sequence", ctypes.c_uint32),  # Seqlock counter, odd while a write is in progress
+		("flags", ctypes.c_uint32),
+		("pid", ctypes.c_uint32),
+		("game_time", ctypes.c_uint32),  # GetGameTimer() in ms
+		("timestamp", ctypes.c_double),  # Writer wall clock in seconds
+		("position", ctypes.c_float * 3),
+		("heading", ctypes.c_float),
+		("velocity", ctypes.c_float * 3),
+		("health", ctypes.c_float),
+		("armor", ctypes.c_float),
+		("vehicle_model", ctypes.c_uint32),
+		("vehicle_health", ctypes.c_float),
+		("vehicle_name", ctypes.c_char * VEHICLE_NAME_SIZE),
+		("reserved", ctypes.c_uint8 * 36)
+	]
+
+
+STATE_RECORD_SIZE = ctypes.sizeof(PlayerStateRecord)
+assert STATE_RECORD_SIZE == 128, "PlayerStateRecord must match injector/sansync.h"
+
+# Returned by SeqlockReader.read_if_changed when no new sample was written
+STATE_UNCHANGED = object()
+
+
+def initialize_record(record: PlayerStateRecord):
+	"""Clear the record and stamp magic and version, no sample is valid yet"""
+	ctypes.memset(ctypes.addressof(record), 0, STATE_RECORD_SIZE)
+	record.magic = STATE_MAGIC
+	record.version = STATE_VERSION
+
+
+def record_to_dict(record: PlayerStateRecord) -> Optional[Dict[str, Any]]:
+	"""Decode a record into the state dict used by the sync layer, None if empty"""
+	if record.magic != STATE_MAGIC or not record.flags & FLAG_VALID:
+		return None
+
+	x, y, z = record.position
+	vx, vy, vz = record.velocity
+	state = {
+		'pid': record.pid,
+		'position': {'x': x, 'y': y, 'z': z},
+		'heading': record.heading,
+		'velocity': {'x': vx, 'y': vy, 'z': vz},
+		'health': record.health,
+		'armor': record.armor,
+		'game_time': record.game_time,
+		'timestamp': record.timestamp,
+		'sequence': record.sequence
+	}
+	if record.flags & FLAG_IN_VEHICLE:
+		state['vehicle'] = {
+			'model': record.vehicle_model,
+			'health': record.vehicle_health,
+			'type': record.vehicle_name.decode('ascii', 'replace')
+		}
+	return state
+
+
+def dict_to_record(state: Dict[str, Any], record: PlayerStateRecord):
+	"""Encode a state dict into record inside a seqlock write section"""
+	# Odd sequence tells readers the fields are being rewritten
+	record.sequence = (record.sequence + 1) & 0xFFFFFFFF
+
+	position = state.get('position', {})
+	velocity = state.get('velocity', {})
+	vehicle = state.get('vehicle')
+
+	flags = FLAG_VALID
+	if vehicle:
+		flags |= FLAG_IN_VEHICLE
+		record.vehicle_model = int(vehicle.get('model', 0))
+		record.vehicle_health = float(vehicle.get('health', 0.0))
+		record.vehicle_name = str(vehicle.get('type', '')).encode('ascii', 'replace')[:VEHICLE_NAME_SIZE - 1]
+	else:
+		record.vehicle_model = 0
+		record.vehicle_health = 0.0
+		record.vehicle_name = b''
+
+	record.pid = int(state.get('pid', 0))
+	record.game_time = int(state.get('game_time', 0)) & 0xFFFFFFFF
+	record.timestamp = float(state.get('timestamp', 0.0))
+	record.position[:] = (position.get('x', 0.0), position.get('y', 0.0), position.get('z', 0.0))
+	record.heading = float(state.get('heading', 0.0))
+	record.velocity[:] = (velocity.get('x', 0.0), velocity.get('y', 0.0), velocity.get('z', 0.0))
+	record.health = float(state.get('health', 0.0))
+	record.armor = float(state.get('armor', 0.0))
+	record.flags = flags
+	record.sequence = (record.sequence + 1) & 0xFFFFFFFF
+
+
+class SeqlockReader:
+	"""Consistent snapshots of a PlayerStateRecord written by another process.
+
+	The writer makes the sequence odd, rewrites the fields and makes it even
+	again. A reader copies the record between two reads of an even sequence
+	and retries if the sequence moved, so a torn copy is never decoded. On
+	x86-64 loads are not reordered with other loads, which is all the reader
+	side needs from Python.
+	"""
+
+	def __init__(self, record: PlayerStateRecord, max_retries: int = 1000):
+		self.record = record
+		self.address = ctypes.addressof(record)
+		self.max_retries = max_retries
+		self.last_sequence = None
+		self.retries = 0  # Reads that overlapped a write and were repeated
+		self.failures = 0  # Reads that gave up after max_retries
+
+	def snapshot(self) -> Optional[PlayerStateRecord]:
+		"""Private copy of the record taken outside any write section"""
+		record = self.record
+		copy = PlayerStateRecord()
+		for attempt in range(self.max_retries):
+			start = record.sequence
+			if not start & 1:
+				ctypes.memmove(ctypes.addressof(copy), self.address, STATE_RECORD_SIZE)
+				if record.sequence == start:
+					self.last_sequence = start
+					return copy
+			self.retries += 1
+			if attempt & 0xF == 0xF:
+				# The writer was preempted mid-write, give it the CPU
+				time.sleep(0)
+		self.failures += 1
+		return None
+
+	def read(self) -> Optional[Dict[str, Any]]:
+		timing = profiler.enabled
+		if timing:
+			start = time.perf_counter()
+		copy = self.snapshot()
+		if timing:
+			start = profiler.lap(STAGE_SHM_READ, start)
+		state = record_to_dict(copy) if copy is not None else None
+		if timing:
+			profiler.lap(STAGE_DECODE, start)
+		return state
+
+	def read_if_changed(self):
+		"""Like read, but returns STATE_UNCHANGED if the sequence matches the last read"""
+		if self.record.sequence == self.last_sequence:
+			return STATE_UNCHANGED
+		return self.read()
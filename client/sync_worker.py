@@ -0,0 +1,203 @@
+from typing import Dict, Any, Optional, Callable
+import math
+import os
+import threading
+import time
+from common.profiling import profiler, STAGE_FILTER
+from common.tracing import tracer, TRACE_KEY, HOP_GAME_WRITE, HOP_SHM_READ
+
+# The last stretch before a deadline is spun, sleeping can overshoot by a scheduler quantum
+SPIN_MARGIN = 0.001
+
+
+class SendFilter:
+	"""Decides whether a new local sample is worth uploading.
+
+	A sample is sent when it moved, turned, changed speed or changed any
+	discrete field since the last sent one, and at least every keepalive
+	seconds so peers never mark a standing player as stale.
+	"""
+
+	def __init__(self, min_distance: float = 0.05, min_heading: float = 2.0,
+				 min_speed_change: float = 0.1, keepalive: float = 1.0):
+		self.min_distance_sq = min_distance * min_distance
+		self.min_heading = min_heading
+		self.min_speed_change_sq = min_speed_change * min_speed_change
+		self.keepalive = keepalive
+		self.last_sent: Optional[Dict[str, Any]] = None
+		self.last_sent_at = 0.0
+
+	def should_send(self, state: Dict[str, Any], now: float) -> bool:
+		last = self.last_sent
+		if last is None or now - self.last_sent_at >= self.keepalive:
+			return True
+		if (state.get('health') != last.get('health') or state.get('armor') != last.get('armor')
+				or state.get('vehicle') != last.get('vehicle')):
+			return True
+		if _distance_sq(state.get('position'), last.get('position')) >= self.min_distance_sq:
+			return True
+		if _distance_sq(state.get('velocity'), last.get('velocity')) >= self.min_speed_change_sq:
+			return True
+		turn = abs(state.get('heading', 0.0) - last.get('heading', 0.0)) % 360.0
+		return min(turn, 360.0 - turn) >= self.min_heading
+
+	def sent(self, state: Dict[str, Any], now: float):
+		self.last_sent = state
+		self.last_sent_at = now
+
+	def reset(self):
+		self.last_sent = None
+
+
+def _distance_sq(a: Optional[Dict[str, float]], b: Optional[Dict[str, float]]) -> float:
+	if not a or not b:
+		return math.inf if a is not b else 0.0
+	dx = a.get('x', 0.0) - b.get('x', 0.0)
+	dy = a.get('y', 0.0) - b.get('y', 0.0)
+	dz = a.get('z', 0.0) - b.get('z', 0.0)
+	return dx * dx + dy * dy + dz * dz
+
+
+class SyncWorker:
+	"""Outbound sync loop on its own thread, independent of the GUI event loop.
+
+	Every tick flushes staged remote players to shared memory, reads the
+	local player's newest sample, filters it and hands it to the network
+	client. Ticks follow absolute deadlines spaced 1 / SYNC_RATE_HZ apart, so
+	the rate does not drift with the time a tick takes; a tick that overruns
+	skips the deadlines it missed instead of bursting to catch up.
+
+	The GUI only sees results: publish(player_id, state) for every new local
+	sample and status(text) when the sync status changes, both called on this
+	thread.
+	"""
+
+	def __init__(self, game_interface, network_client, publish: Optional[Callable[[str, Dict], None]] = None,
+				 status: Optional[Callable[[str], None]] = None, rate_hz: Optional[float] = None):
+		self.game_interface = game_interface
+		self.network_client = network_client
+		self.publish = publish
+		self.status = status
+		self.rate_hz = rate_hz if rate_hz is not None else float(os.getenv('SYNC_RATE_HZ', 10))
+		self.period = 1.0 / self.rate_hz
+		self.filter = SendFilter(
+			min_distance=float(os.getenv('SYNC_MIN_DISTANCE', 0.05)),
+			keepalive=float(os.getenv('SYNC_KEEPALIVE', 1.0))
+		)
+		self.stop_event = threading.Event()
+		self.thread: Optional[threading.Thread] = None
+		self.last_status = None
+
+		self.ticks = 0
+		self.samples = 0
+		self.sent = 0
+		self.filtered = 0
+		self.remote_flushed = 0
+		self.overruns = 0
+		self.errors = 0
+		self.max_lateness = 0.0  # Worst wake-up after a deadline, seconds
+
+	def start(self):
+		self.stop_event.clear()
+		self.thread = threading.Thread(target=self._run, name="SyncWorker", daemon=True)
+		self.thread.start()
+
+	def stop(self, timeout: float = 1.0):
+		self.stop_event.set()
+		if self.thread:
+			self.thread.join(timeout)
+			self.thread = None
+
+	@property
+	def is_running(self) -> bool:
+		return self.thread is not None and self.thread.is_alive()
+
+	def _run(self):
+		deadline = time.perf_counter()
+		while not self.stop_event.is_set():
+			self.tick()
+
+			deadline += self.period
+			now = time.perf_counter()
+			if now >= deadline:
+				# Overran, realign to the next deadline still ahead
+				self.overruns += 1
+				deadline += math.ceil((now - deadline) / self.period) * self.period
+			if not self._sleep_until(deadline):
+				return
+			lateness = time.perf_counter() - deadline
+			if lateness > self.max_lateness:
+				self.max_lateness = lateness
+
+	def _sleep_until(self, deadline: float) -> bool:
+		"""Wait for deadline, False if stopped meanwhile"""
+		remaining = deadline - time.perf_counter()
+		if remaining > SPIN_MARGIN and self.stop_event.wait(remaining - SPIN_MARGIN):
+			return False
+		while time.perf_counter() < deadline:
+			time.sleep(0)
+		return not self.stop_event.is_set()
+
+	def tick(self):
+		"""One sync frame, also callable directly for a single synchronous step"""
+		self.ticks += 1
+		if not self.game_interface.is_initialized:
+			self.filter.reset()
+			self.last_status = None
+			return
+
+		try:
+			# Publish remote player changes received since the last frame in one batch
+			self.remote_flushed += self.game_interface.flush_remote_players()
+
+			# Skipped when the game wrote nothing new
+			state = self.game_interface.poll_player_state()
+			if state:
+				read_at = time.time()
+				self.samples += 1
+				local_id = self.network_client.player_id or 'local'
+				if self.publish:
+					self.publish(local_id, state)
+
+				now = time.monotonic()
+				timing = profiler.enabled
+				if timing:
+					start = time.perf_counter()
+				send = self.filter.should_send(state, now)
+				if timing:
+					profiler.lap(STAGE_FILTER, start)
+				if send:
+					# The network client rewrites the timestamp in place, keep the published copy intact
+					payload = dict(state)
+					if tracer.should_sample():
+						payload[TRACE_KEY] = tracer.begin(local_id, [
+							(HOP_GAME_WRITE, state.get('timestamp', read_at)), (HOP_SHM_READ, read_at)])
+					self.network_client.send_player_update(payload)
+					self.filter.sent(state, now)
+					self.sent += 1
+				else:
+					self.filtered += 1
+			self._set_status("Sync Status: Connected")
+		except Exception as e:
+			self.errors += 1
+			print(f"Failed to sync game state: {e}")
+			self._set_status(f"Sync Status: Error - {str(e)}")
+
+	def _set_status(self, text: str):
+		if text != self.last_status:
+			self.last_status = text
+			if self.status:
+				self.status(text)
+
+	def get_stats(self) -> Dict[str, Any]:
+		return {
+			'rate_hz': self.rate_hz,
+			'ticks': self.ticks,
+			'samples': self.samples,
+			'sent': self.sent,
+			'filtered': self.filtered,
+			'remote_flushed': self.remote_flushed,
+			'overruns': self.overruns,
+			'errors': self.errors,
+			'max_lateness': self.max_lateness
+		}
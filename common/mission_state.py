@@ -0,0 +1,132 @@
+from collections import deque
+from typing import Dict, Any, List, Optional
+import copy
+
+# Operation types
+OP_MISSION_STARTED = 'mission_started'
+OP_OBJECTIVE_COMPLETED = 'objective_completed'
+OP_COUNTER_INCREMENTED = 'counter_incremented'
+OP_ENTITY_SPAWNED = 'entity_spawned'
+OP_ENTITY_DESPAWNED = 'entity_despawned'
+OP_TRIGGER_FIRED = 'trigger_fired'
+
+# Fields each operation type must carry besides 'type' and 'version'
+OP_FIELDS = {
+	OP_MISSION_STARTED: ('mission_id',),
+	OP_OBJECTIVE_COMPLETED: ('objective_id',),
+	OP_COUNTER_INCREMENTED: ('counter', 'amount'),
+	OP_ENTITY_SPAWNED: ('entity_id', 'model', 'position'),
+	OP_ENTITY_DESPAWNED: ('entity_id',),
+	OP_TRIGGER_FIRED: ('trigger_id',)
+}
+
+
+class MissionState:
+	"""Co-op mission state replicated through small versioned operations.
+
+	The server assigns every operation the next session version, so all peers
+	apply the same sequence. Operations that arrive ahead of a gap are held
+	until the gap is filled; late joiners start from snapshot().
+	"""
+
+	def __init__(self, log_size: int = 256):
+		self.mission_id = None
+		self.version = 0
+		self.objectives: Dict[str, bool] = {}
+		self.counters: Dict[str, int] = {}
+		self.entities: Dict[str, Dict[str, Any]] = {}
+		self.triggers = set()
+		self.log = deque(maxlen=log_size)  # Recently applied ops, for catching up
+		self.pending: Dict[int, Dict[str, Any]] = {}
+
+	@staticmethod
+	def validate(op: Dict[str, Any]) -> Optional[str]:
+		"""Returns an error message, or None if the operation is well formed"""
+		fields = OP_FIELDS.get(op.get('type'))
+		if fields is None:
+			return f"Unknown mission operation: {op.get('type')}"
+		missing = [field for field in fields if field not in op]
+		if missing:
+			return f"Missing fields for {op['type']}: {', '.join(missing)}"
+		return None
+
+	def apply(self, op: Dict[str, Any]) -> List[Dict[str, Any]]:
+		"""Apply an operation in version order, returns the operations applied"""
+		version = op['version']
+		if version <= self.version:
+			return []  # Duplicate or already covered by a snapshot
+		self.pending[version] = op
+
+		applied = []
+		while self.version + 1 in self.pending:
+			next_op = self.pending.pop(self.version + 1)
+			self._apply_op(next_op)
+			self.version = next_op['version']
+			self.log.append(next_op)
+			applied.append(next_op)
+		return applied
+
+	@property
+	def has_gap(self) -> bool:
+		return bool(self.pending)
+
+	def _apply_op(self, op: Dict[str, Any]):
+		op_type = op['type']
+		if op_type == OP_MISSION_STARTED:
+			self.mission_id = op['mission_id']
+			self.objectives = {objective_id: False for objective_id in op.get('objectives', [])}
+			self.counters = {}
+			self.entities = {}
+			self.triggers = set()
+		elif op_type == OP_OBJECTIVE_COMPLETED:
+			self.objectives[op['objective_id']] = True
+		elif op_type == OP_COUNTER_INCREMENTED:
+			self.counters[op['counter']] = self.counters.get(op['counter'], 0) + op['amount']
+		elif op_type == OP_ENTITY_SPAWNED:
+			self.entities[op['entity_id']] = {
+				'model': op['model'],
+				'position': op['position'],
+				'owner': op.get('player_id')
+			}
+		elif op_type == OP_ENTITY_DESPAWNED:
+			self.entities.pop(op['entity_id'], None)
+		elif op_type == OP_TRIGGER_FIRED:
+			self.triggers.add(op['trigger_id'])
+
+	def ops_since(self, version: int) -> Optional[List[Dict[str, Any]]]:
+		"""Operations after version, or None if the log no longer reaches back that far"""
+		if version >= self.version:
+			return []
+		if not self.log or self.log[0]['version'] > version + 1:
+			return None
+		return [op for op in self.log if op['version'] > version]
+
+	def snapshot(self) -> Dict[str, Any]:
+		"""Compact full state for late joiners"""
+		return {
+			'version': self.version,
+			'mission_id': self.mission_id,
+			'objectives': self.objectives,
+			'counters': self.counters,
+			'entities': self.entities,
+			'triggers': sorted(self.triggers)
+		}
+
+	def reset(self):
+		"""Forget everything, including buffered ops, for a different session"""
+		self.load_snapshot(MissionState().snapshot())
+		self.pending.clear()
+
+	def load_snapshot(self, snapshot: Dict[str, Any]):
+		"""Replace the state with a snapshot, keeping pending ops that are newer"""
+		self.version = snapshot['version']
+		self.mission_id = snapshot.get('mission_id')
+		self.objectives = dict(snapshot.get('objectives', {}))
+		self.counters = dict(snapshot.get('counters', {}))
+		self.entities = copy.deepcopy(snapshot.get('entities', {}))
+		self.triggers = set(snapshot.get('triggers', []))
+		self.log.clear()
+		self.pending = {version: op for version, op in self.pending.items() if version > self.version}
+		# Anything buffered right after the snapshot can go in now
+		if self.version + 1 in self.pending:
+			self.apply(self.pending.pop(self.version + 1))
@@ -0,0 +1,248 @@
+from collections import Counter, deque
+from typing import Dict, Optional
+import cProfile
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Sync pipeline stages, in the order a local update travels through them
+STAGE_SHM_READ = 'shm_read'  # Seqlock copy of the local state record
+STAGE_DECODE = 'decode'  # Record to state dict
+STAGE_FILTER = 'filter'  # Send filter decision
+STAGE_ENCODE = 'encode'  # Payload preparation before the socket emit
+STAGE_EMIT = 'emit'  # socketio emit of player_update
+STAGE_SERVER_HANDLE = 'server_handle'  # Validation and session state update
+STAGE_FANOUT = 'fanout'  # sync_update broadcast to the session room
+STAGE_RECEIVE = 'receive'  # Network client sync_update callback
+STAGE_APPLY = 'apply'  # Sync manager and remote player staging, per drained batch
+STAGE_UI_PLAYERS = 'ui.players'  # Player list batch
+STAGE_UI_MAP = 'ui.map'  # Map marker flush
+STAGES = [STAGE_SHM_READ, STAGE_DECODE, STAGE_FILTER, STAGE_ENCODE, STAGE_EMIT, STAGE_SERVER_HANDLE,
+		  STAGE_FANOUT, STAGE_RECEIVE, STAGE_APPLY, STAGE_UI_PLAYERS, STAGE_UI_MAP]
+
+# Histogram buckets grow by a factor of two from 1 us, the last one takes everything above ~4 s
+BUCKET_MIN = 1e-6
+BUCKET_COUNT = 24
+
+CAPTURE_SAMPLE = 'sample'
+CAPTURE_CPROFILE = 'cprofile'
+SAMPLE_INTERVAL = 0.002
+
+
+class RollingHistogram:
+	"""Log2 bucketed durations over the last window samples.
+
+	Bucket counts are kept in step with a deque of the raw samples, so a
+	sample leaving the window is subtracted from its bucket and percentiles
+	always describe recent behaviour.
+	"""
+
+	def __init__(self, window: int = 2048):
+		self.samples = deque(maxlen=window)
+		self.buckets = [0] * BUCKET_COUNT
+		self.total = 0  # Every sample ever recorded
+
+	@staticmethod
+	def bucket(seconds: float) -> int:
+		if seconds <= BUCKET_MIN:
+			return 0
+		return min(BUCKET_COUNT - 1, int(math.log2(seconds / BUCKET_MIN)) + 1)
+
+	def add(self, seconds: float):
+		if len(self.samples) == self.samples.maxlen:
+			self.buckets[self.bucket(self.samples[0])] -= 1
+		self.samples.append(seconds)
+		self.buckets[self.bucket(seconds)] += 1
+		self.total += 1
+
+	def percentile(self, fraction: float) -> float:
+		"""Duration below which fraction of the window lies, interpolated inside its bucket"""
+		target = fraction * len(self.samples)
+		seen = 0
+		for index, count in enumerate(self.buckets):
+			if count and seen + count >= target:
+				upper = BUCKET_MIN * 2 ** index
+				lower = upper / 2 if index else 0.0
+				return lower + (upper - lower) * (target - seen) / count
+			seen += count
+		return 0.0
+
+	def summary(self) -> Dict[str, float]:
+		samples = list(self.samples)
+		if not samples:
+			return {'count': self.total, 'mean': 0.0, 'p50': 0.0, 'p90': 0.0, 'p99': 0.0, 'max': 0.0}
+		peak = max(samples)
+		# A bucket edge can lie above every sample in it
+		return {
+			'count': self.total,
+			'mean': sum(samples) / len(samples),
+			'p50': min(self.percentile(0.5), peak),
+			'p90': min(self.percentile(0.9), peak),
+			'p99': min(self.percentile(0.99), peak),
+			'max': peak
+		}
+
+
+class ProfileCapture:
+	"""A running cProfile or sampling capture that writes its result to path.
+
+	Sampling captures cover every thread and stop on their own after
+	seconds. cProfile only sees the thread that started it, and stop() must
+	be called from that thread.
+	"""
+
+	def __init__(self, mode: str, seconds: float, path: str):
+		self.mode = mode
+		self.seconds = seconds
+		self.path = path
+		self.done = threading.Event()
+		self.samples = 0
+		self.profile = None
+		self.thread = None
+
+	def start(self):
+		if self.mode == CAPTURE_CPROFILE:
+			self.profile = cProfile.Profile()
+			self.profile.enable()
+		else:
+			self.thread = threading.Thread(target=self._sample, name="ProfileSampler", daemon=True)
+			self.thread.start()
+
+	def stop(self) -> str:
+		if self.mode == CAPTURE_CPROFILE and self.profile is not None and not self.done.is_set():
+			self.profile.disable()
+			self.profile.dump_stats(self.path)
+			self.done.set()
+		else:
+			self.done.wait(self.seconds + 1.0)
+		return self.path
+
+	def _sample(self):
+		"""Collect stacks of every other thread and write them in collapsed (flame graph) format"""
+		own = threading.get_ident()
+		names = {thread.ident: thread.name for thread in threading.enumerate()}
+		stacks = Counter()
+		deadline = time.perf_counter() + self.seconds
+		while time.perf_counter() < deadline:
+			for ident, frame in sys._current_frames().items():
+				if ident == own:
+					continue
+				calls = []
+				while frame is not None:
+					code = frame.f_code
+					calls.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+					frame = frame.f_back
+				calls.append(names.get(ident, str(ident)))
+				stacks[';'.join(reversed(calls))] += 1
+			self.samples += 1
+			time.sleep(SAMPLE_INTERVAL)
+		with open(self.path, 'w') as output:
+			for stack, count in stacks.most_common():
+				output.write(f"{stack} {count}\n")
+		self.done.set()
+
+
+class Profiler:
+	"""Opt-in stage timing for the sync pipeline.
+
+	Call sites read enabled once and take timestamps only when it is set:
+
+		timing = profiler.enabled
+		if timing: start = time.perf_counter()
+		...stage work...
+		if timing: profiler.lap(STAGE_X, start)
+
+	so a disabled profiler costs one branch per stage. SANSYNC_PROFILE=1
+	enables it at startup, the client console and enable() at runtime.
+	"""
+
+	def __init__(self, window: int = 2048):
+		self.enabled = False
+		self.window = window
+		self.histograms: Dict[str, RollingHistogram] = {}
+		self.lock = threading.Lock()
+		self.capture: Optional[ProfileCapture] = None
+		self.last_report = time.monotonic()
+
+	def enable(self):
+		self.enabled = True
+
+	def disable(self):
+		self.enabled = False
+
+	def reset(self):
+		with self.lock:
+			self.histograms.clear()
+
+	def record(self, stage: str, seconds: float):
+		with self.lock:
+			histogram = self.histograms.get(stage)
+			if histogram is None:
+				histogram = self.histograms[stage] = RollingHistogram(self.window)
+			histogram.add(seconds)
+
+	def lap(self, stage: str, start: float) -> float:
+		"""Record the time since start for stage and return now, the start of the next stage"""
+		now = time.perf_counter()
+		self.record(stage, now - start)
+		return now
+
+	def snapshot(self) -> Dict[str, Dict[str, float]]:
+		with self.lock:
+			return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+
+	def format_report(self) -> str:
+		snapshot = self.snapshot()
+		if not snapshot:
+			return "No profiling samples" + ("" if self.enabled else " (profiling is off)")
+		# Pipeline stages first in travel order, anything else after
+		order = [stage for stage in STAGES if stage in snapshot] + sorted(set(snapshot) - set(STAGES))
+		lines = [f"{'stage':<14}{'count':>8}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"]
+		for stage in order:
+			summary = snapshot[stage]
+			lines.append(f"{stage:<14}{summary['count']:>8}" + "".join(
+				f"{_format_us(summary[key]):>10}" for key in ('mean', 'p50', 'p90', 'p99', 'max')))
+		return "\n".join(lines)
+
+	def report_due(self, interval: float) -> bool:
+		"""True once every interval seconds, for periodic logging"""
+		now = time.monotonic()
+		if now - self.last_report < interval:
+			return False
+		self.last_report = now
+		return True
+
+	def start_capture(self, seconds: float, mode: str = CAPTURE_SAMPLE, path: Optional[str] = None) -> ProfileCapture:
+		"""Start a capture of the whole process, see ProfileCapture for how each mode ends"""
+		if mode not in (CAPTURE_SAMPLE, CAPTURE_CPROFILE):
+			raise ValueError(f"Unknown capture mode: {mode}")
+		if self.capture is not None and not self.capture.done.is_set():
+			raise RuntimeError("A profile capture is already running")
+		if path is None:
+			directory = os.getenv('SANSYNC_PROFILE_DIR') or tempfile.gettempdir()
+			extension = 'prof' if mode == CAPTURE_CPROFILE else 'folded'
+			path = os.path.join(directory, f"sansync-{mode}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}")
+		self.capture = ProfileCapture(mode, seconds, path)
+		self.capture.start()
+		return self.capture
+
+
+def _format_us(seconds: float) -> str:
+	if seconds >= 0.1:
+		return f"{seconds * 1000:.0f}ms"
+	if seconds >= 0.001:
+		return f"{seconds * 1000:.2f}ms"
+	return f"{seconds * 1e6:.1f}us"
+
+
+def env_enabled() -> bool:
+	return os.getenv('SANSYNC_PROFILE', '0').lower() in ('1', 'true', 'yes')
+
+
+# One profiler per process, shared by the client and the server code
+profiler = Profiler()
+if env_enabled():
+	profiler.enable()
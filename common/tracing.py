@@ -0,0 +1,204 @@
+from collections import deque
+from typing import Dict, Any, List, Optional, Callable, Tuple
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from common.profiling import RollingHistogram
+
+# Hops of a local update on its way into a peer's game, in order
+HOP_GAME_WRITE = 'game_write'  # Game side wrote the state record
+HOP_SHM_READ = 'shm_read'  # Sync worker read it from shared memory
+HOP_CLIENT_SEND = 'client_send'  # Handed to the socket
+HOP_SERVER_RECEIVE = 'server_receive'
+HOP_SERVER_SEND = 'server_send'  # Broadcast to the session
+HOP_PEER_RECEIVE = 'peer_receive'
+HOP_PEER_SHM_WRITE = 'peer_shm_write'  # Written to the peer's remote player slot
+HOPS = [HOP_GAME_WRITE, HOP_SHM_READ, HOP_CLIENT_SEND, HOP_SERVER_RECEIVE,
+		HOP_SERVER_SEND, HOP_PEER_RECEIVE, HOP_PEER_SHM_WRITE]
+
+# Payload field carrying {'id', 'stamps': [[hop, time], ...]}
+TRACE_KEY = 'trace'
+END_TO_END = 'end_to_end'
+MAX_TRACE_ID = 64  # Characters
+
+
+def segment_name(first: str, second: str) -> str:
+	return f"{first}->{second}"
+
+
+def valid_trace(trace: Any) -> bool:
+	"""Shape check for a trace from the network: a short id and at most one [hop, time] stamp per hop"""
+	if not isinstance(trace, dict):
+		return False
+	trace_id = trace.get('id')
+	stamps = trace.get('stamps')
+	if not isinstance(trace_id, str) or len(trace_id) > MAX_TRACE_ID:
+		return False
+	if not isinstance(stamps, list) or len(stamps) > len(HOPS):
+		return False
+	for stamp in stamps:
+		if not isinstance(stamp, list) or len(stamp) != 2 or stamp[0] not in HOPS:
+			return False
+		when = stamp[1]
+		if isinstance(when, bool) or not isinstance(when, (int, float)) or not math.isfinite(when):
+			return False
+	return True
+
+
+class Tracer:
+	"""Sampled end-to-end latency traces of player updates.
+
+	Every sample_every-th local update gets a trace field that each hop
+	appends a stamp to. Stamps are taken on the server timeline: the server
+	uses its own clock, clients convert with to_common_time, which the
+	network client points at its ClockSync. Whoever sees a trace stamps it,
+	enabled only decides whether this process starts new ones.
+
+	record() turns the gaps between consecutive stamps into per-segment
+	rolling histograms and keeps the most recent traces for export. The
+	server records the hops up to its broadcast, the receiving client the
+	complete trace.
+	"""
+
+	def __init__(self, sample_every: int = 20, keep: int = 1000, window: int = 2048):
+		self.enabled = False
+		self.sample_every = max(1, sample_every)
+		self.window = window
+		self.to_common_time: Callable[[float], float] = lambda local_time: local_time
+		self.histograms: Dict[str, RollingHistogram] = {}
+		self.traces = deque(maxlen=keep)  # Recorded traces, oldest first
+		self.lock = threading.Lock()
+		self.counter = itertools.count(1)
+		self.updates = 0
+		self.started = 0
+		self.skewed = 0  # Segments that came out negative, the clocks disagreed
+		self.rejected = 0  # Malformed traces dropped by validate()
+		self.last_report = time.monotonic()
+
+	def should_sample(self) -> bool:
+		if not self.enabled:
+			return False
+		self.updates += 1
+		return self.updates % self.sample_every == 0
+
+	def begin(self, origin: str, stamps: List[Tuple[str, float]]) -> Dict[str, Any]:
+		"""New trace from (hop, local time) stamps that happened before the payload existed"""
+		self.started += 1
+		return {
+			'id': f"{origin}-{next(self.counter)}",
+			'stamps': [[hop, self.to_common_time(local_time)] for hop, local_time in stamps]
+		}
+
+	def validate(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+		"""Drop the payload's trace unless valid_trace accepts it, returns the trace that is left"""
+		trace = payload.get(TRACE_KEY)
+		if trace is not None and not valid_trace(trace):
+			del payload[TRACE_KEY]
+			self.rejected += 1
+			return None
+		return trace
+
+	def stamp(self, payload: Dict[str, Any], hop: str, local_time: Optional[float] = None) -> Optional[Dict[str, Any]]:
+		"""Append hop to the payload's trace, a dict lookup for untraced payloads; returns the trace"""
+		trace = payload.get(TRACE_KEY)
+		if trace is None:
+			return None
+		trace['stamps'].append([hop, self.to_common_time(time.time() if local_time is None else local_time)])
+		return trace
+
+	def record(self, trace: Dict[str, Any]):
+		"""Add a trace's segments to the histograms and keep a copy for export"""
+		stamps = trace['stamps']
+		segments = [(segment_name(first[0], second[0]), second[1] - first[1])
+					for first, second in zip(stamps, stamps[1:])]
+		if len(stamps) > 1:
+			segments.append((END_TO_END, stamps[-1][1] - stamps[0][1]))
+		with self.lock:
+			for name, seconds in segments:
+				if seconds < 0:
+					self.skewed += 1
+					seconds = 0.0
+				histogram = self.histograms.get(name)
+				if histogram is None:
+					histogram = self.histograms[name] = RollingHistogram(self.window)
+				histogram.add(seconds)
+			self.traces.append({'id': trace['id'], 'stamps': [list(stamp) for stamp in stamps]})
+
+	def reset(self):
+		with self.lock:
+			self.histograms.clear()
+			self.traces.clear()
+			self.skewed = 0
+
+	def snapshot(self) -> Dict[str, Dict[str, float]]:
+		with self.lock:
+			return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+	def format_report(self) -> str:
+		snapshot = self.snapshot()
+		if not snapshot:
+			return "No traces recorded" + ("" if self.enabled else " (tracing is off)")
+		order = [segment_name(first, second) for first, second in zip(HOPS, HOPS[1:])] + [END_TO_END]
+		order = [name for name in order if name in snapshot] + sorted(set(snapshot) - set(order))
+		lines = [f"{'segment':<32}{'count':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"]
+		for name in order:
+			summary = snapshot[name]
+			lines.append(f"{name:<32}{summary['count']:>7}" + "".join(
+				f"{summary[key] * 1000:>8.2f}ms" for key in ('p50', 'p90', 'p99', 'max')))
+		if self.skewed:
+			lines.append(f"{self.skewed} negative segments clamped to 0, clock offset estimate is off")
+		return "\n".join(lines)
+
+	def report_due(self, interval: float) -> bool:
+		now = time.monotonic()
+		if now - self.last_report < interval:
+			return False
+		self.last_report = now
+		return True
+
+	def export_json(self, path: str) -> int:
+		"""Write recorded traces and segment summaries, returns the number of traces"""
+		with self.lock:
+			traces = list(self.traces)
+		with open(path, 'w') as output:
+			json.dump({'hops': HOPS, 'segments': self.snapshot(), 'traces': traces}, output, indent=1)
+		return len(traces)
+
+	def export_chrome(self, path: str) -> int:
+		"""Write recorded traces in Chrome trace event format (chrome://tracing, Perfetto).
+
+		Every segment gets its own lane, each trace is one complete event per
+		segment with the trace id in args.
+		"""
+		with self.lock:
+			traces = list(self.traces)
+		lanes: Dict[str, int] = {}
+		events = []
+		for trace in traces:
+			stamps = trace['stamps']
+			for first, second in zip(stamps, stamps[1:]):
+				name = segment_name(first[0], second[0])
+				lane = lanes.setdefault(name, len(lanes) + 1)
+				events.append({
+					'name': name, 'cat': 'sync', 'ph': 'X', 'pid': 1, 'tid': lane,
+					'ts': first[1] * 1e6, 'dur': max(0.0, second[1] - first[1]) * 1e6,
+					'args': {'trace': trace['id']}
+				})
+		for name, lane in lanes.items():
+			events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': lane, 'args': {'name': name}})
+		with open(path, 'w') as output:
+			json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, output)
+		return len(traces)
+
+
+def env_enabled() -> bool:
+	return os.getenv('SANSYNC_TRACE', '0').lower() in ('1', 'true', 'yes')
+
+
+# One tracer per process, like the profiler
+tracer = Tracer(sample_every=int(os.getenv('SANSYNC_TRACE_EVERY', '20')))
+if env_enabled():
+	tracer.enabled = True
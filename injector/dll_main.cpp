@@ -13,7 +13,36 @@ namespace {
 	void* g_MappedMemory = NULL;
 	std::mutex g_Mutex;
 	bool g_Initialized = false;
-	HANDLE g_CommandThread = NULL;
+	HANDLE g_CommandEvent = NULL;
+
+	uint32_t LoadAcquire(volatile uint32_t* value) {
+		return static_cast<uint32_t>(InterlockedCompareExchange(reinterpret_cast<volatile LONG*>(value), 0, 0));
+	}
+
+	void StoreRelease(volatile uint32_t* value, uint32_t newValue) {
+		InterlockedExchange(reinterpret_cast<volatile LONG*>(value), static_cast<LONG>(newValue));
+	}
+
+	CommandRingControl* GetCommandRing() {
+		return reinterpret_cast<CommandRingControl*>(
+			static_cast<char*>(g_MappedMemory) + SharedMemoryLayout::HEADER_SIZE);
+	}
+
+	PlayerStateRecord* GetStateRecord() {
+		return reinterpret_cast<PlayerStateRecord*>(
+			static_cast<char*>(g_MappedMemory) + 
+			SharedMemoryLayout::HEADER_SIZE + 
+			SharedMemoryLayout::COMMAND_BUFFER_SIZE);
+	}
+
+	RemotePlayerTable* GetRemotePlayerTable() {
+		return reinterpret_cast<RemotePlayerTable*>(
+			static_cast<char*>(g_MappedMemory) + SharedMemoryLayout::REMOTE_PLAYERS_OFFSET);
+	}
+
+	uint32_t RecordSize(uint32_t length) {
+		return (CommandRing::RECORD_HEADER_SIZE + length + 3) & ~3u;
+	}
 }
 
 // Implementation of exported functions
@@ -35,17 +64,8 @@ extern "C" {
 				return false;
 			}
 
-			std::cout << "Starting command thread..." << std::endl;
-			g_CommandThread = CreateThread(NULL, 0, 
-				(LPTHREAD_START_ROUTINE)SanSync::ProcessCommands, 
-				NULL, 0, NULL);
-
-			if (!g_CommandThread) {
-				error = GetLastError();
-				std::cout << "Failed to create command thread. Error: " << error << std::endl;
-				SanSync::CloseSharedMemory();
-				return false;
-			}
+			// The command ring is consumed by scripts/shared_memory.lua inside the
+			// game script runtime, the DLL must not drain it as a second consumer
 
 			std::cout << "Injecting hooks..." << std::endl;
 			if (!SanSync::InjectHooks()) {
@@ -72,17 +92,13 @@ extern "C" {
 		}
 
 		SanSync::RemoveHooks();
-		
-		if (g_CommandThread) {
-			TerminateThread(g_CommandThread, 0);
-			CloseHandle(g_CommandThread);
-			g_CommandThread = NULL;
-		}
 
 		SanSync::CloseSharedMemory();
 		g_Initialized = false;
 	}
 
+	// Producer side of the command ring. The ring is single-producer, so this
+	// is only for standalone testing while no client is attached.
 	SANSYNC_API bool WriteCommand(const char* command, size_t length) {
 		if (!g_Initialized || !g_MappedMemory || !command || length == 0) {
 			return false;
@@ -90,41 +106,105 @@ extern "C" {
 
 		std::lock_guard<std::mutex> lock(g_Mutex);
 		
-		if (length > SharedMemoryLayout::COMMAND_BUFFER_SIZE) {
+		CommandRingControl* ring = GetCommandRing();
+		if (ring->magic != CommandRing::MAGIC) {
+			return false;
+		}
+
+		char* data = reinterpret_cast<char*>(ring + 1);
+		uint32_t mask = ring->capacity - 1;
+		uint32_t head = ring->head;
+		uint32_t pos = head & mask;
+		uint32_t toEnd = ring->capacity - pos;
+		uint32_t recordSize = RecordSize(static_cast<uint32_t>(length));
+		uint32_t needed = recordSize <= toEnd ? recordSize : toEnd + recordSize;
+		uint32_t used = head - LoadAcquire(&ring->tail);
+
+		if (length >= ring->capacity || needed > ring->capacity - used) {
+			ring->overflows++;
+			ring->dropped++;
 			return false;
 		}
 
-		char* cmdBuffer = static_cast<char*>(g_MappedMemory) + SharedMemoryLayout::HEADER_SIZE;
-		memcpy(cmdBuffer, command, length);
-		cmdBuffer[length] = '\0';
+		if (recordSize > toEnd) {
+			memcpy(data + pos, &CommandRing::WRAP_MARKER, sizeof(uint32_t));
+			head += toEnd;
+			pos = 0;
+		}
+
+		uint32_t length32 = static_cast<uint32_t>(length);
+		memcpy(data + pos, &length32, sizeof(uint32_t));
+		memcpy(data + pos + CommandRing::RECORD_HEADER_SIZE, command, length);
+		StoreRelease(&ring->head, head + recordSize);
+		ring->written++;
+		SetEvent(g_CommandEvent);
 		return true;
 	}
 
-	SANSYNC_API bool ReadState(char* buffer, size_t bufferSize, size_t* bytesRead) {
-		if (!g_Initialized || !g_MappedMemory || !buffer || !bytesRead) {
+	SANSYNC_API bool ReadState(PlayerStateRecord* record) {
+		if (!g_Initialized || !g_MappedMemory || !record) {
 			return false;
 		}
 
 		std::lock_guard<std::mutex> lock(g_Mutex);
 		
-		char* stateBuffer = static_cast<char*>(g_MappedMemory) + 
-			SharedMemoryLayout::HEADER_SIZE + 
-			SharedMemoryLayout::COMMAND_BUFFER_SIZE;
+		PlayerStateRecord* state = GetStateRecord();
+		if (state->magic != PlayerState::MAGIC) {
+			return false;
+		}
 
-		size_t stateLength = strlen(stateBuffer);
-		if (stateLength == 0) {
-			*bytesRead = 0;
-			return true;
+		// Seqlock read: retry while a write is in progress or overlapped the copy
+		for (int attempt = 0; attempt < 1000; attempt++) {
+			uint32_t start = LoadAcquire(&state->sequence);
+			if (start & 1) {
+				YieldProcessor();
+				continue;
+			}
+
+			memcpy(record, state, sizeof(PlayerStateRecord));
+			MemoryBarrier();
+			if (LoadAcquire(&state->sequence) == start) {
+				return (record->flags & PlayerState::FLAG_VALID) != 0;
+			}
 		}
+		return false;
+	}
 
-		if (bufferSize < stateLength + 1) {
+	// Copies the active remote player slots from one consistent generation
+	SANSYNC_API bool ReadRemotePlayers(RemotePlayerSlot* slots, uint32_t maxSlots, uint32_t* count) {
+		if (!g_Initialized || !g_MappedMemory || !slots || !count) {
 			return false;
 		}
 
-		memcpy(buffer, stateBuffer, stateLength);
-		buffer[stateLength] = '\0';
-		*bytesRead = stateLength;
-		return true;
+		RemotePlayerTable* table = GetRemotePlayerTable();
+		if (table->magic != RemotePlayers::MAGIC) {
+			return false;
+		}
+
+		const RemotePlayerSlot* source = reinterpret_cast<const RemotePlayerSlot*>(table + 1);
+		uint32_t capacity = table->capacity < RemotePlayers::MAX_SLOTS ? table->capacity : RemotePlayers::MAX_SLOTS;
+
+		for (int attempt = 0; attempt < 1000; attempt++) {
+			uint32_t start = LoadAcquire(&table->generation);
+			if (start & 1) {
+				YieldProcessor();
+				continue;
+			}
+
+			uint32_t copied = 0;
+			for (uint32_t i = 0; i < capacity && copied < maxSlots; i++) {
+				if (source[i].flags & RemotePlayers::SLOT_ACTIVE) {
+					memcpy(&slots[copied++], &source[i], sizeof(RemotePlayerSlot));
+				}
+			}
+
+			MemoryBarrier();
+			if (LoadAcquire(&table->generation) == start) {
+				*count = copied;
+				return true;
+			}
+		}
+		return false;
 	}
 }
 
@@ -230,10 +310,22 @@ namespace SanSync {
 		
 		// Initialize memory
 		memset(g_MappedMemory, 0, SharedMemoryLayout::TOTAL_SIZE);
+		static_cast<SharedMemoryHeader*>(g_MappedMemory)->gamePid = GetCurrentProcessId();
+
+		// Opens the event if the client created it first
+		g_CommandEvent = CreateEventA(NULL, FALSE, FALSE, SANSYNC_COMMAND_EVENT_NAME);
+		if (!g_CommandEvent) {
+			std::cout << "Failed to create command event. Error: " << GetLastError() << std::endl;
+		}
 		return true;
 	}
 
 	void CloseSharedMemory() {
+		if (g_CommandEvent) {
+			CloseHandle(g_CommandEvent);
+			g_CommandEvent = NULL;
+		}
+
 		if (g_MappedMemory) {
 			UnmapViewOfFile(g_MappedMemory);
 			g_MappedMemory = NULL;
@@ -245,25 +337,6 @@ namespace SanSync {
 		}
 	}
 
-	void ProcessCommands() {
-		while (g_Initialized) {
-			Sleep(50);  // Reduce CPU usage
-			
-			if (!g_MappedMemory) {
-				continue;
-			}
-
-			std::lock_guard<std::mutex> lock(g_Mutex);
-			
-			char* cmdBuffer = static_cast<char*>(g_MappedMemory) + SharedMemoryLayout::HEADER_SIZE;
-			if (cmdBuffer[0] != '\0') {
-				// Process command here
-				// For now, just clear the command buffer
-				memset(cmdBuffer, 0, SharedMemoryLayout::COMMAND_BUFFER_SIZE);
-			}
-		}
-	}
-
 	bool InjectHooks() {
 		// TODO: Implement game-specific hooks
 		return true;
@@ -14,12 +14,149 @@
 #define SANSYNC_VERSION_MAJOR 1
 #define SANSYNC_VERSION_MINOR 0
 
+// Region header, mirrors client/shm_header.py. The client fills in the
+// layout; the game side sets gamePid and bumps heartbeat every frame so the
+// client can tell a hung game from a live one.
+struct SharedMemoryHeader {
+	uint32_t magic;
+	uint32_t version;
+	uint32_t flags;          // SharedMemoryHeaderInfo::INITIALIZED once the layout is valid
+	uint32_t creatorPid;
+	uint32_t commandOffset;
+	uint32_t stateOffset;
+	uint32_t remotePlayersOffset;
+	uint32_t gamePid;
+	volatile uint32_t heartbeat;
+	uint32_t responseOffset;
+	double heartbeatTime;    // Game side wall clock at the last beat, seconds
+	uint8_t reserved[80];
+};
+static_assert(sizeof(SharedMemoryHeader) == 128, "SharedMemoryHeader must match the Python layout");
+
+namespace SharedMemoryHeaderInfo {
+	const uint32_t MAGIC = 0x4D485353;  // 'SSHM'
+	const uint32_t VERSION = 6;
+	const uint32_t INITIALIZED = 0x1;
+}
+
+// Named auto-reset events signalled after every command write and state
+// write, so consumers can wait instead of polling. See client/shm_notify.py.
+#define SANSYNC_COMMAND_EVENT_NAME "GTAVCoopSharedMem_Command"
+#define SANSYNC_STATE_EVENT_NAME "GTAVCoopSharedMem_State"
+#define SANSYNC_RESPONSE_EVENT_NAME "GTAVCoopSharedMem_Response"
+
+// Command ring control block, mirrors client/command_ring.py.
+// Single producer (the client) and single consumer (scripts/shared_memory.lua).
+// The response ring uses the same layout with the roles swapped.
+// head/tail are free-running byte counters; producer and consumer
+// fields live on separate cache lines.
+struct CommandRingControl {
+	uint32_t magic;
+	uint32_t version;
+	uint32_t capacity;       // Data bytes, power of two
+	uint32_t policy;         // Overflow policy chosen by the producer
+	uint8_t reserved0[48];
+
+	// Producer cache line
+	volatile uint32_t head;
+	uint32_t written;
+	uint32_t dropped;
+	uint32_t overflows;
+	uint32_t highWatermark;
+	uint8_t reserved1[44];
+
+	// Consumer cache line
+	volatile uint32_t tail;
+	uint32_t read;
+	uint8_t reserved2[56];
+};
+static_assert(sizeof(CommandRingControl) == 192, "CommandRingControl must match the Python layout");
+
+namespace CommandRing {
+	const uint32_t MAGIC = 0x474E5253;  // 'SRNG'
+	const uint32_t WRAP_MARKER = 0xFFFFFFFF;
+	const uint32_t RECORD_HEADER_SIZE = 4;  // u32 length, payload padded to 4 bytes
+}
+
+// Local player state, mirrors client/state_record.py. Written by the game
+// side at the start of the state area and read in place by the client.
+// Readers copy it between two equal, even sequence values.
+struct PlayerStateRecord {
+	uint32_t magic;
+	uint32_t version;
+	volatile uint32_t sequence;  // Seqlock counter, odd while a write is in progress
+	uint32_t flags;          // PlayerState::FLAG_*
+	uint32_t pid;
+	uint32_t gameTime;       // GetGameTimer() in ms
+	double timestamp;        // Writer wall clock in seconds
+	float position[3];
+	float heading;
+	float velocity[3];
+	float health;
+	float armor;
+	uint32_t vehicleModel;
+	float vehicleHealth;
+	char vehicleName[16];
+	uint8_t reserved[36];
+};
+static_assert(sizeof(PlayerStateRecord) == 128, "PlayerStateRecord must match the Python layout");
+
+namespace PlayerState {
+	const uint32_t MAGIC = 0x54535053;  // 'SPST'
+	const uint32_t VERSION = 1;
+	const uint32_t FLAG_VALID = 0x1;
+	const uint32_t FLAG_IN_VEHICLE = 0x2;
+}
+
+// Remote player table, mirrors client/player_slots.py. The client rewrites
+// changed slots in one batch with the generation odd, readers copy the
+// table between two equal, even generation values once per frame.
+struct RemotePlayerTable {
+	uint32_t magic;
+	uint32_t version;
+	uint32_t capacity;
+	uint32_t slotSize;
+	volatile uint32_t generation;
+	uint32_t active;
+	uint8_t reserved[40];
+};
+static_assert(sizeof(RemotePlayerTable) == 64, "RemotePlayerTable must match the Python layout");
+
+struct RemotePlayerSlot {
+	char playerId[40];
+	uint32_t flags;          // RemotePlayers::SLOT_*
+	uint32_t sequence;       // Generation of the batch that last changed this slot
+	float position[3];
+	float heading;
+	float velocity[3];
+	float health;
+	uint32_t vehicleModel;
+	float vehicleHealth;
+	char vehicleName[16];
+	double timestamp;
+	uint8_t reserved[16];
+};
+static_assert(sizeof(RemotePlayerSlot) == 128, "RemotePlayerSlot must match the Python layout");
+
+namespace RemotePlayers {
+	const uint32_t MAGIC = 0x534C5052;  // 'RPLS'
+	const uint32_t MAX_SLOTS = 64;
+	const uint32_t SLOT_ACTIVE = 0x1;
+	const uint32_t SLOT_IN_VEHICLE = 0x2;
+}
+
 // Memory layout
 struct SharedMemoryLayout {
 	static const size_t HEADER_SIZE = 128;
-	static const size_t COMMAND_BUFFER_SIZE = 4096;
+	static const size_t COMMAND_RING_CAPACITY = 65536;
+	static const size_t COMMAND_BUFFER_SIZE = sizeof(CommandRingControl) + COMMAND_RING_CAPACITY;
 	static const size_t STATE_BUFFER_SIZE = 8192;
-	static const size_t TOTAL_SIZE = HEADER_SIZE + COMMAND_BUFFER_SIZE + STATE_BUFFER_SIZE;
+	static const size_t REMOTE_PLAYERS_OFFSET = HEADER_SIZE + COMMAND_BUFFER_SIZE + STATE_BUFFER_SIZE;
+	static const size_t REMOTE_PLAYERS_SIZE = sizeof(RemotePlayerTable) + RemotePlayers::MAX_SLOTS * sizeof(RemotePlayerSlot);
+	static const size_t RESPONSE_OFFSET = REMOTE_PLAYERS_OFFSET + REMOTE_PLAYERS_SIZE;
+	static const size_t RESPONSE_RING_CAPACITY = 16384;
+	static const size_t RESPONSE_BUFFER_SIZE = sizeof(CommandRingControl) + RESPONSE_RING_CAPACITY;
+	static const size_t TOTAL_SIZE = RESPONSE_OFFSET + RESPONSE_BUFFER_SIZE;
 };
 
 // Function declarations
@@ -27,14 +164,14 @@ extern "C" {
 	SANSYNC_API bool Initialize();
 	SANSYNC_API void Cleanup();
 	SANSYNC_API bool WriteCommand(const char* command, size_t length);
-	SANSYNC_API bool ReadState(char* buffer, size_t bufferSize, size_t* bytesRead);
+	SANSYNC_API bool ReadState(PlayerStateRecord* record);
+	SANSYNC_API bool ReadRemotePlayers(RemotePlayerSlot* slots, uint32_t maxSlots, uint32_t* count);
 }
 
 // Internal functions
 namespace SanSync {
 	bool CreateSharedMemory();
 	void CloseSharedMemory();
-	void ProcessCommands();
 	bool InjectHooks();
 	void RemoveHooks();
 }
\ No newline at end of file
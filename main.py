@@ -1,10 +1,11 @@
+from client.config import startup, load_config
+startup.track_imports()  # Per-module import times until the startup report
 import sys
 import os
 import ctypes
-from PyQt6.QtWidgets import QApplication, QMessageBox
-from PyQt6.QtCore import Qt
-from client.gui.main_window import MainWindow
-from dotenv import load_dotenv
+with startup.stage("import PyQt6"):
+	from PyQt6.QtWidgets import QApplication, QMessageBox
+	from PyQt6.QtCore import Qt, QCoreApplication
 
 def is_admin():
 	try:
@@ -13,9 +14,6 @@ def is_admin():
 		return False
 
 def setup_environment():
-	# Load environment variables
-	load_dotenv()
-	
 	# Create .env file from template if it doesn't exist
 	env_path = os.path.join(os.path.dirname(__file__), '.env')
 	if not os.path.exists(env_path):
@@ -23,6 +21,9 @@ def setup_environment():
 		if os.path.exists(template_path):
 			with open(template_path, 'r') as template, open(env_path, 'w') as env:
 				env.write(template.read())
+	
+	# Load environment variables, the only time .env is read
+	load_config(env_path)
 
 def main():
 	# Check if running as admin
@@ -34,12 +35,18 @@ def main():
 	# Setup environment
 	setup_environment()
 	
+	# The web map is imported after the application exists, which WebEngine only allows with shared contexts
+	QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+	
 	# Create Qt application
-	app = QApplication(sys.argv)
-	app.setStyle('Fusion')  # Modern style
+	with startup.stage("create QApplication"):
+		app = QApplication(sys.argv)
+		app.setStyle('Fusion')  # Modern style
 	
-	# Create and show main window
-	window = MainWindow()
+	# Create and show main window, heavy subsystems load after the first paint
+	MainWindow = startup.timed_import('client.gui.main_window').MainWindow
+	with startup.stage("build main window"):
+		window = MainWindow()
 	window.show()
 	
 	# Start application event loop
@@ -19,6 +19,78 @@ local function WaitForGame()
 	return true
 end
 
+-- Console requests, each returns a result table or raises an error string
+local requestHandlers = {}
+
+function requestHandlers.teleport(command)
+	local target = command.position
+	if not target then
+		local waypoint = natives.GetWaypointCoords()
+		if not waypoint then
+			error("No waypoint set", 0)
+		end
+		target = {x = waypoint.x, y = waypoint.y, z = waypoint.z}
+	end
+	natives.SetEntityCoords(natives.GetPlayerPed(), target.x, target.y, target.z)
+	return {message = string.format("Teleported to %.1f, %.1f, %.1f", target.x, target.y, target.z), position = target}
+end
+
+function requestHandlers.spawn_vehicle(command)
+	local model = natives.GetHashKey(command.model or "")
+	if not natives.IsModelAVehicle(model) then
+		error("Unknown vehicle model: " .. tostring(command.model), 0)
+	end
+	natives.RequestModel(model)
+	for attempt = 1, 100 do
+		if natives.HasModelLoaded(model) then
+			break
+		end
+		natives.Wait(10)
+	end
+	if not natives.HasModelLoaded(model) then
+		error("Timed out loading " .. tostring(command.model), 0)
+	end
+	local ped = natives.GetPlayerPed()
+	local pos = natives.GetEntityCoords(ped)
+	local vehicle = natives.CreateVehicle(model, pos.x, pos.y, pos.z, natives.GetEntityHeading(ped))
+	natives.SetPedIntoVehicle(ped, vehicle)
+	natives.SetModelAsNoLongerNeeded(model)
+	return {message = "Spawned " .. command.model, model = model}
+end
+
+function requestHandlers.heal(command)
+	local ped = natives.GetPlayerPed()
+	local health = natives.GetEntityMaxHealth(ped)
+	natives.SetEntityHealth(ped, health)
+	return {message = "Health restored", health = health}
+end
+
+function requestHandlers.repair(command)
+	local vehicle = natives.GetVehicle()
+	if vehicle == 0 then
+		error("Not in a vehicle", 0)
+	end
+	natives.SetVehicleFixed(vehicle)
+	return {message = "Vehicle repaired", health = natives.GetVehicleHealth()}
+end
+
+-- Commands with an id expect an answer on the response ring
+local function HandleRequest(command)
+	local handler = requestHandlers[command.type]
+	local response
+	if not handler then
+		response = {id = command.id, ok = false, error = "Unknown command: " .. tostring(command.type)}
+	else
+		local success, result = pcall(handler, command)
+		if success then
+			response = {id = command.id, ok = true, result = result}
+		else
+			response = {id = command.id, ok = false, error = tostring(result)}
+		end
+	end
+	sharedMem:write_response(response)
+end
+
 local function HandleCommand(command)
 	if not command or not currentPid then
 		return
@@ -44,6 +116,8 @@ local function HandleCommand(command)
 		end
 	elseif command.type == "toggle_console" then
 		print("Console toggle requested")
+	elseif command.id then
+		HandleRequest(command)
 	end
 end
 
@@ -54,20 +128,25 @@ local function GetCurrentGameState()
 
 	local ped = natives.GetPlayerPed(-1)
 	local pos = natives.GetEntityCoords(ped)
-	local health = natives.GetEntityHealth(ped)
+	local velocity = natives.GetEntityVelocity(ped)
 	
 	local state = {
 		pid = currentPid,
 		position = {x = pos.x, y = pos.y, z = pos.z},
-		health = health,
-		timestamp = natives.GetGameTimer()
+		heading = natives.GetEntityHeading(ped),
+		velocity = {x = velocity.x, y = velocity.y, z = velocity.z},
+		health = natives.GetEntityHealth(ped),
+		armor = natives.GetPedArmour(ped),
+		game_time = natives.GetGameTimer()
 	}
 	
 	local vehicle = natives.GetVehiclePedIsIn(ped, false)
 	if vehicle ~= 0 then
+		local model = natives.GetEntityModel(vehicle)
 		state.vehicle = {
+			model = model,
 			health = natives.GetVehicleEngineHealth(vehicle),
-			type = natives.GetDisplayNameFromVehicleModel(natives.GetEntityModel(vehicle))
+			type = natives.GetDisplayNameFromVehicleModel(model)
 		}
 	end
 	
@@ -99,11 +178,10 @@ local function Initialize()
 		end
 		print("Shared memory interface created successfully")
 		
-		-- Send initial state
+		-- Publish the pid, the record stays invalid until the first sampled state
 		local initialState = {
 			pid = currentPid,
-			initialized = true,
-			timestamp = natives.GetGameTimer()
+			game_time = natives.GetGameTimer()
 		}
 		if not sharedMem:write_state(initialState) then
 			error("Failed to write initial state")
@@ -118,26 +196,39 @@ local function Initialize()
 	-- Start command handling loop
 	natives.CreateThread(function()
 		while true do
-			if sharedMem then
+			-- Drain everything queued since the last frame
+			while sharedMem do
 				local success, command = pcall(sharedMem.read_command, sharedMem)
-				if success and command then
-					pcall(HandleCommand, command)
+				if not success or not command then
+					break
 				end
+				pcall(HandleCommand, command)
 			end
-			natives.Wait(50)  -- Check commands every 50ms
+			natives.Wait(0)  -- Check the command ring every frame, an empty check is two loads
 		end
 	end)
 	
 	-- Start state update loop
 	natives.CreateThread(function()
 		while true do
+			-- Beat even outside a session, the client uses it to detect a hung game
+			if sharedMem then
+				pcall(sharedMem.heartbeat, sharedMem)
+			end
+			
 			if sharedMem and isSessionActive then
 				local state = GetCurrentGameState()
 				if state then
 					pcall(sharedMem.write_state, sharedMem, state)
 				end
+				
+				-- Whole remote player table, published by the client once per sync frame
+				local success, players = pcall(sharedMem.read_remote_players, sharedMem)
+				if success and players then
+					playerStates = players
+				end
 			end
-			natives.Wait(100)  -- Update every 100ms
+			natives.Wait(0)  -- Sample every frame, the binary record is cheap to write
 		end
 	end)
 	
@@ -24,6 +24,39 @@ function natives.GetEntityHealth(entity)
 	return GetEntityHealth(entity)
 end
 
+function natives.GetEntityHeading(entity)
+	return GetEntityHeading(entity)
+end
+
+function natives.GetEntityVelocity(entity)
+	return GetEntityVelocity(entity)
+end
+
+function natives.GetPedArmour(ped)
+	return GetPedArmour(ped)
+end
+
+function natives.SetEntityCoords(entity, x, y, z)
+	return SetEntityCoords(entity, x, y, z, false, false, false, true)
+end
+
+function natives.SetEntityHealth(entity, health)
+	return SetEntityHealth(entity, health)
+end
+
+function natives.GetEntityMaxHealth(entity)
+	return GetEntityMaxHealth(entity)
+end
+
+-- Map functions
+function natives.GetWaypointCoords()
+	local blip = GetFirstBlipInfoId(8)  -- Waypoint sprite
+	if not DoesBlipExist(blip) then
+		return nil
+	end
+	return GetBlipInfoIdCoord(blip)
+end
+
 -- Vehicle functions
 function natives.GetVehicle()
 	local ped = natives.GetPlayerPed()
@@ -46,6 +79,38 @@ function natives.GetEntityModel(entity)
 	return GetEntityModel(entity)
 end
 
+function natives.GetHashKey(name)
+	return GetHashKey(name)
+end
+
+function natives.IsModelAVehicle(model)
+	return IsModelInCdimage(model) and IsModelAVehicle(model)
+end
+
+function natives.RequestModel(model)
+	return RequestModel(model)
+end
+
+function natives.HasModelLoaded(model)
+	return HasModelLoaded(model)
+end
+
+function natives.SetModelAsNoLongerNeeded(model)
+	return SetModelAsNoLongerNeeded(model)
+end
+
+function natives.CreateVehicle(model, x, y, z, heading)
+	return CreateVehicle(model, x, y, z, heading, true, false)
+end
+
+function natives.SetPedIntoVehicle(ped, vehicle)
+	return SetPedIntoVehicle(ped, vehicle, -1)  -- Driver seat
+end
+
+function natives.SetVehicleFixed(vehicle)
+	return SetVehicleFixed(vehicle)
+end
+
 -- ScriptHookV functions
 function natives.CreateThread(callback)
 	return CreateThread(callback)
@@ -25,10 +25,43 @@ local SharedMemory = {
 	MEMORY_NAME = "GTAVCoopSharedMem",
 	MEMORY_SIZE = 1024 * 1024,  -- 1MB
 	HEADER_SIZE = 128,  -- Updated to match Python implementation
-	COMMAND_BUFFER_SIZE = 4096,
-	STATE_BUFFER_SIZE = 8192
+	COMMAND_RING_CONTROL_SIZE = 192,  -- CommandRingControl in injector/sansync.h
+	COMMAND_RING_CAPACITY = 65536,
+	COMMAND_BUFFER_SIZE = 192 + 65536,
+	STATE_BUFFER_SIZE = 8192,
+	MAX_REMOTE_PLAYERS = 64,
+	RESPONSE_RING_CAPACITY = 16384,
+	STATE_EVENT_NAME = "GTAVCoopSharedMem_State",  -- SANSYNC_STATE_EVENT_NAME in injector/sansync.h
+	RESPONSE_EVENT_NAME = "GTAVCoopSharedMem_Response"  -- SANSYNC_RESPONSE_EVENT_NAME
 }
 
+-- Region header, see client/shm_header.py
+local HEADER_MAGIC = 0x4D485353
+local HEADER_VERSION = 6
+local HEADER_INITIALIZED = 0x1
+
+-- Command ring control block (u32 indices), see client/command_ring.py
+local RING_MAGIC = 0x474E5253
+local RING_WRAP_MARKER = 0xFFFFFFFF
+local RING_CAPACITY_INDEX = 2
+local RING_HEAD_INDEX = 16
+local RING_WRITTEN_INDEX = 17
+local RING_DROPPED_INDEX = 18
+local RING_TAIL_INDEX = 32
+local RING_READ_INDEX = 33
+
+-- Binary local player state, see client/state_record.py
+local STATE_MAGIC = 0x54535053
+local STATE_VERSION = 1
+local STATE_FLAG_VALID = 0x1
+local STATE_FLAG_IN_VEHICLE = 0x2
+
+-- Remote player table, see client/player_slots.py
+local SLOTS_MAGIC = 0x534C5052
+local SLOTS_VERSION = 1
+local SLOT_ACTIVE = 0x1
+local SLOT_IN_VEHICLE = 0x2
+
 -- FFI definitions for Windows API
 ffi.cdef[[
 	void* OpenFileMappingA(uint32_t dwDesiredAccess, int bInheritHandle, const char* lpName);
@@ -36,8 +69,78 @@ ffi.cdef[[
 					   uint32_t dwFileOffsetHigh, uint32_t dwFileOffsetLow, size_t dwNumberOfBytesToMap);
 	int UnmapViewOfFile(void* lpBaseAddress);
 	int CloseHandle(void* hObject);
+	void* CreateEventA(void* lpEventAttributes, int bManualReset, int bInitialState, const char* lpName);
+	int SetEvent(void* hEvent);
+	void GetSystemTimeAsFileTime(uint64_t* lpSystemTimeAsFileTime);
+
+	typedef struct {
+		uint32_t magic;
+		uint32_t version;
+		uint32_t flags;
+		uint32_t creator_pid;
+		uint32_t command_offset;
+		uint32_t state_offset;
+		uint32_t remote_players_offset;
+		uint32_t game_pid;
+		volatile uint32_t heartbeat;
+		uint32_t response_offset;
+		double heartbeat_time;
+		uint8_t reserved[80];
+	} SharedMemoryHeader;
+
+	typedef struct {
+		uint32_t magic;
+		uint32_t version;
+		volatile uint32_t sequence;
+		uint32_t flags;
+		uint32_t pid;
+		uint32_t game_time;
+		double timestamp;
+		float position[3];
+		float heading;
+		float velocity[3];
+		float health;
+		float armor;
+		uint32_t vehicle_model;
+		float vehicle_health;
+		char vehicle_name[16];
+		uint8_t reserved[36];
+	} PlayerStateRecord;
+
+	typedef struct {
+		uint32_t magic;
+		uint32_t version;
+		uint32_t capacity;
+		uint32_t slot_size;
+		volatile uint32_t generation;
+		uint32_t active;
+		uint8_t reserved[40];
+	} RemotePlayerTable;
+
+	typedef struct {
+		char player_id[40];
+		uint32_t flags;
+		uint32_t sequence;
+		float position[3];
+		float heading;
+		float velocity[3];
+		float health;
+		uint32_t vehicle_model;
+		float vehicle_health;
+		char vehicle_name[16];
+		double timestamp;
+		uint8_t reserved[16];
+	} RemotePlayerSlot;
 ]]
 
+-- Sub-millisecond Unix time, os.time() only has whole seconds.
+-- FILETIME counts 100ns intervals since 1601, the client compares against Unix time
+local filetime = ffi.new("uint64_t[1]")
+local function unix_time()
+	ffi.C.GetSystemTimeAsFileTime(filetime)
+	return tonumber(filetime[0] - 116444736000000000ULL) / 1e7
+end
+
 function SharedMemory:new()
 	local instance = {}
 	setmetatable(instance, self)
@@ -65,31 +168,53 @@ function SharedMemory:initialize()
 		error(string.format("Failed to map view of shared memory: %s", self.MEMORY_NAME))
 	end
 	
-	-- Initialize header
-	local header = {
-		version = 1,
-		command_offset = self.HEADER_SIZE,
-		state_offset = self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE,
-		initialized = true,
-		pid = natives.GetCurrentProcessId()  -- Add PID to header
-	}
+	-- Clear memory, the header is flagged initialized once the whole layout is in place
+	ffi.fill(self.memory, self.MEMORY_SIZE, 0)
+	local header = ffi.cast("SharedMemoryHeader*", self.memory)
+	self.header = header
+	header.magic = HEADER_MAGIC
+	header.version = HEADER_VERSION
+	header.creator_pid = natives.GetCurrentProcessId()
+	header.command_offset = self.HEADER_SIZE
+	header.state_offset = self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE
+	header.remote_players_offset = self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE + self.STATE_BUFFER_SIZE
+	header.game_pid = natives.GetCurrentProcessId()
 	
-	-- Encode header with error handling
-	local success, header_json = pcall(json.encode, header)
-	if not success then
-		error(string.format("Failed to encode header: %s", header_json))
-	end
+	-- Empty command ring
+	local ring = ffi.cast("uint32_t*", ffi.cast("char*", self.memory) + self.HEADER_SIZE)
+	ring[0] = RING_MAGIC
+	ring[1] = 1
+	ring[RING_CAPACITY_INDEX] = self.COMMAND_RING_CAPACITY
 	
-	header_json = header_json .. "|"
-	if #header_json > self.HEADER_SIZE then
-		error(string.format("Header data too large: %d bytes (max %d)", #header_json, self.HEADER_SIZE))
-	end
+	-- Empty state record at the start of the state area
+	self.state = ffi.cast("PlayerStateRecord*", ffi.cast("char*", self.memory) + self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE)
+	self.state.magic = STATE_MAGIC
+	self.state.version = STATE_VERSION
 	
-	-- Clear memory and write header
-	ffi.fill(self.memory, self.MEMORY_SIZE, 0)
-	ffi.copy(self.memory, header_json)
+	-- Empty remote player table after the state area
+	local table_ptr = ffi.cast("char*", self.memory) + self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE + self.STATE_BUFFER_SIZE
+	self.remote_table = ffi.cast("RemotePlayerTable*", table_ptr)
+	self.remote_slots = ffi.cast("RemotePlayerSlot*", table_ptr + ffi.sizeof("RemotePlayerTable"))
+	self.remote_table.magic = SLOTS_MAGIC
+	self.remote_table.version = SLOTS_VERSION
+	self.remote_table.capacity = self.MAX_REMOTE_PLAYERS
+	self.remote_table.slot_size = ffi.sizeof("RemotePlayerSlot")
+	
+	-- Empty response ring after the remote player table, this script is its producer
+	local remote_size = ffi.sizeof("RemotePlayerTable") + self.MAX_REMOTE_PLAYERS * ffi.sizeof("RemotePlayerSlot")
+	header.response_offset = header.remote_players_offset + remote_size
+	self.response_ring = ffi.cast("char*", self.memory) + header.response_offset
+	local response = ffi.cast("uint32_t*", self.response_ring)
+	response[0] = RING_MAGIC
+	response[1] = 1
+	response[RING_CAPACITY_INDEX] = self.RESPONSE_RING_CAPACITY
+	
+	-- Signalled after every state write so the client can wait instead of polling
+	self.state_event = ffi.C.CreateEventA(nil, 0, 0, self.STATE_EVENT_NAME)
+	self.response_event = ffi.C.CreateEventA(nil, 0, 0, self.RESPONSE_EVENT_NAME)
 	
-	print(string.format("Shared memory initialized with header (%d bytes)", #header_json))
+	header.flags = HEADER_INITIALIZED
+	print(string.format("Shared memory initialized (layout version %d)", HEADER_VERSION))
 	return true
 end
 
@@ -99,31 +224,13 @@ function SharedMemory:verify_header()
 		return false 
 	end
 	
-	local header_data = ffi.string(self.memory, self.HEADER_SIZE)
-	if not header_data then
-		print("Failed to read header data")
+	local header = ffi.cast("SharedMemoryHeader*", self.memory)
+	if header.magic ~= HEADER_MAGIC or header.version ~= HEADER_VERSION then
+		print(string.format("Unexpected shared memory layout version %d", header.version))
 		return false
 	end
 	
-	local terminator_pos = header_data:find("|")
-	if not terminator_pos then
-		print("No terminator found in header")
-		return false
-	end
-	
-	local header_json = header_data:sub(1, terminator_pos - 1)
-	if header_json:len() == 0 then
-		print("Empty header data")
-		return false
-	end
-	
-	local success, header = pcall(json.decode, header_json)
-	if not success then
-		print(string.format("Failed to decode header: %s", header))
-		return false
-	end
-	
-	if not header.initialized then
+	if bit.band(header.flags, HEADER_INITIALIZED) == 0 then
 		print("Header not properly initialized")
 		return false
 	end
@@ -137,25 +244,34 @@ function SharedMemory:read_command()
 		return nil
 	end
 	
-	local command_ptr = ffi.cast("char*", self.memory) + self.HEADER_SIZE
-	local command_data = ffi.string(command_ptr, self.COMMAND_BUFFER_SIZE)
-	
-	if command_data:len() == 0 then
+	-- Pop one record from the command ring (this script is the only consumer)
+	local ring_ptr = ffi.cast("char*", self.memory) + self.HEADER_SIZE
+	local ring = ffi.cast("volatile uint32_t*", ring_ptr)
+	if ring[0] ~= RING_MAGIC then
 		return nil
 	end
 	
-	local terminator_pos = command_data:find("|")
-	if not terminator_pos then
+	local tail = ring[RING_TAIL_INDEX]
+	if tail == ring[RING_HEAD_INDEX] then
 		return nil
 	end
 	
-	local command_json = command_data:sub(1, terminator_pos - 1)
-	if command_json:len() == 0 then
-		return nil
+	local capacity = ring[RING_CAPACITY_INDEX]
+	local data = ring_ptr + self.COMMAND_RING_CONTROL_SIZE
+	local pos = tail % capacity
+	local length = ffi.cast("uint32_t*", data + pos)[0]
+	if length == RING_WRAP_MARKER then
+		tail = tail + capacity - pos
+		pos = 0
+		length = ffi.cast("uint32_t*", data)[0]
 	end
 	
-	-- Clear command buffer after reading
-	ffi.fill(command_ptr, self.COMMAND_BUFFER_SIZE, 0)
+	local command_json = ffi.string(data + pos + 4, length)
+	
+	-- Release the record only after copying it out
+	local record_size = bit.band(4 + length + 3, bit.bnot(3))
+	ring[RING_TAIL_INDEX] = (tail + record_size) % 4294967296
+	ring[RING_READ_INDEX] = (ring[RING_READ_INDEX] + 1) % 4294967296
 	
 	-- Decode command
 	local success, command = pcall(json.decode, command_json)
@@ -167,38 +283,163 @@ function SharedMemory:read_command()
 	return command
 end
 
-function SharedMemory:write_state(state)
+-- Answer a command on the response ring: {id = ..., ok = true, result = ...}
+-- or {id = ..., ok = false, error = "..."}. Returns false if the ring is full.
+function SharedMemory:write_response(response)
 	if not self.memory then
-		print("Memory not initialized")
 		return false
 	end
 	
-	-- Add timestamp if not present
-	if not state.timestamp then
-		state.timestamp = natives.GetGameTimer()
-	end
+	local payload = try_json_encode(response)
+	local length = #payload
+	local ring = ffi.cast("volatile uint32_t*", self.response_ring)
+	local capacity = ring[RING_CAPACITY_INDEX]
+	local data = self.response_ring + self.COMMAND_RING_CONTROL_SIZE
+	local record_size = bit.band(4 + length + 3, bit.bnot(3))
 	
-	-- Encode state with error handling
-	local success, state_json = pcall(json.encode, state)
-	if not success then
-		print("Failed to encode state: " .. tostring(state_json))
+	local head = ring[RING_HEAD_INDEX]
+	local pos = head % capacity
+	local to_end = capacity - pos
+	local needed = record_size
+	if record_size > to_end then
+		needed = to_end + record_size
+	end
+	local used = (head - ring[RING_TAIL_INDEX]) % 4294967296
+	if needed > capacity - used then
+		ring[RING_DROPPED_INDEX] = (ring[RING_DROPPED_INDEX] + 1) % 4294967296
 		return false
 	end
 	
-	state_json = state_json .. "|"
-	if #state_json > self.STATE_BUFFER_SIZE then
-		print("State data too large: " .. #state_json .. " bytes (max " .. self.STATE_BUFFER_SIZE .. ")")
+	if record_size > to_end then
+		-- Not enough room before the end, skip to the start of the data area
+		ffi.cast("uint32_t*", data + pos)[0] = RING_WRAP_MARKER
+		head = (head + to_end) % 4294967296
+		pos = 0
+	end
+	ffi.cast("uint32_t*", data + pos)[0] = length
+	ffi.copy(data + pos + 4, payload, length)
+	
+	-- Publish: payload first, head last
+	ring[RING_HEAD_INDEX] = (head + record_size) % 4294967296
+	ring[RING_WRITTEN_INDEX] = (ring[RING_WRITTEN_INDEX] + 1) % 4294967296
+	
+	if self.response_event ~= nil then
+		ffi.C.SetEvent(self.response_event)
+	end
+	return true
+end
+
+function SharedMemory:write_state(state)
+	if not self.memory then
+		print("Memory not initialized")
 		return false
 	end
 	
-	local state_ptr = ffi.cast("char*", self.memory) + self.HEADER_SIZE + self.COMMAND_BUFFER_SIZE
-	ffi.fill(state_ptr, self.STATE_BUFFER_SIZE, 0)
-	ffi.copy(state_ptr, state_json)
+	local record = self.state
+	-- Seqlock write section: odd sequence while the fields are inconsistent
+	record.sequence = (record.sequence + 1) % 4294967296
+	
+	local position = state.position or {}
+	local velocity = state.velocity or {}
+	-- Only a real sample is valid, not the pid-only record written at startup
+	local flags = 0
+	if state.position then
+		flags = STATE_FLAG_VALID
+	end
+	
+	if state.vehicle then
+		flags = bit.bor(flags, STATE_FLAG_IN_VEHICLE)
+		record.vehicle_model = state.vehicle.model or 0
+		record.vehicle_health = state.vehicle.health or 0
+		ffi.fill(record.vehicle_name, 16, 0)
+		ffi.copy(record.vehicle_name, tostring(state.vehicle.type or ""):sub(1, 15))
+	else
+		record.vehicle_model = 0
+		record.vehicle_health = 0
+		ffi.fill(record.vehicle_name, 16, 0)
+	end
+	
+	record.pid = state.pid or 0
+	record.game_time = state.game_time or natives.GetGameTimer()
+	record.timestamp = state.timestamp or unix_time()
+	record.position[0] = position.x or 0
+	record.position[1] = position.y or 0
+	record.position[2] = position.z or 0
+	record.heading = state.heading or 0
+	record.velocity[0] = velocity.x or 0
+	record.velocity[1] = velocity.y or 0
+	record.velocity[2] = velocity.z or 0
+	record.health = state.health or 0
+	record.armor = state.armor or 0
+	record.flags = flags
+	record.sequence = (record.sequence + 1) % 4294967296
+	
+	if self.state_event ~= nil then
+		ffi.C.SetEvent(self.state_event)
+	end
 	
 	return true
 end
 
+-- Liveness beat for the client, call once per frame from the game thread
+function SharedMemory:heartbeat()
+	if not self.memory then
+		return
+	end
+	
+	self.header.heartbeat_time = unix_time()
+	self.header.heartbeat = (self.header.heartbeat + 1) % 4294967296
+end
+
+-- Read every active remote player slot from one consistent generation.
+-- Returns a table keyed by player id, or nil if the client kept writing.
+function SharedMemory:read_remote_players()
+	if not self.memory then
+		return nil
+	end
+	
+	local header = self.remote_table
+	for attempt = 1, 100 do
+		local start = header.generation
+		if start % 2 == 0 then
+			local players = {}
+			for i = 0, self.MAX_REMOTE_PLAYERS - 1 do
+				local slot = self.remote_slots[i]
+				if bit.band(slot.flags, SLOT_ACTIVE) ~= 0 then
+					local player = {
+						position = {x = slot.position[0], y = slot.position[1], z = slot.position[2]},
+						heading = slot.heading,
+						velocity = {x = slot.velocity[0], y = slot.velocity[1], z = slot.velocity[2]},
+						health = slot.health,
+						sequence = slot.sequence
+					}
+					if bit.band(slot.flags, SLOT_IN_VEHICLE) ~= 0 then
+						player.vehicle = {
+							model = slot.vehicle_model,
+							health = slot.vehicle_health,
+							type = ffi.string(slot.vehicle_name)
+						}
+					end
+					players[ffi.string(slot.player_id)] = player
+				end
+			end
+			if header.generation == start then
+				return players
+			end
+		end
+	end
+	return nil
+end
+
 function SharedMemory:close()
+	if self.state_event ~= nil then
+		ffi.C.CloseHandle(self.state_event)
+		self.state_event = nil
+	end
+	if self.response_event ~= nil then
+		ffi.C.CloseHandle(self.response_event)
+		self.response_event = nil
+	end
 	if self.memory then
 		ffi.C.UnmapViewOfFile(self.memory)
 		self.memory = nil
@@ -6,11 +6,15 @@ from flask import Flask, request
 from flask_socketio import SocketIO, emit, join_room, leave_room
 import json
 import uuid
-from dataclasses import dataclass, asdict
+import secrets
+from dataclasses import dataclass, asdict, field
 from typing import Dict, Set, Optional
 import time
 import os
 from dotenv import load_dotenv
+from common.mission_state import MissionState
+from common.profiling import profiler, env_enabled, STAGE_SERVER_HANDLE, STAGE_FANOUT
+from common.tracing import tracer, HOP_SERVER_RECEIVE, HOP_SERVER_SEND
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +25,11 @@ logger = logging.getLogger('SanSync')
 
 # Load environment variables
 load_dotenv()
+if env_enabled():
+	profiler.enable()  # The import above ran before .env was read
+PROFILE_LOG_INTERVAL = float(os.getenv('SANSYNC_PROFILE_INTERVAL', '30'))
+TRACE_LOG_INTERVAL = float(os.getenv('SANSYNC_TRACE_INTERVAL', '30'))
+TRACE_FILE = os.getenv('SANSYNC_TRACE_FILE')  # Chrome trace rewritten with every trace report
 
 # Configure logging level from environment
 log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
@@ -88,6 +97,8 @@ class Session:
 	players: Set[str]
 	created_at: float
 	game_state: Dict = None
+	update_seq: int = 0
+	missions: MissionState = field(default_factory=MissionState)
 
 	def to_dict(self):
 		return {
@@ -100,6 +111,73 @@ class Session:
 # Global state
 sessions: Dict[str, Session] = {}
 player_sessions: Dict[str, str] = {}  # Maps player_id to session_id
+sid_players: Dict[str, str] = {}  # Maps socket sid to stable player_id
+player_sids: Dict[str, str] = {}  # Maps player_id to its current socket sid
+resume_tokens: Dict[str, str] = {}  # Maps resume token to player_id
+suspended_players: Dict[str, float] = {}  # Maps player_id to resume deadline
+
+# Seconds a dropped player keeps its slot, state and host role
+RESUME_GRACE_PERIOD = float(os.getenv('RESUME_GRACE_PERIOD', '30'))
+
+def current_player_id() -> str:
+	"""Stable player ID of the requesting socket"""
+	return sid_players.get(request.sid, request.sid)
+
+def issue_resume_token(player_id: str) -> str:
+	"""Create a new resume token for a player, revoking the previous one"""
+	for token, owner in list(resume_tokens.items()):
+		if owner == player_id:
+			del resume_tokens[token]
+	token = secrets.token_urlsafe(32)
+	resume_tokens[token] = player_id
+	return token
+
+def revoke_resume_token(player_id: str):
+	for token, owner in list(resume_tokens.items()):
+		if owner == player_id:
+			del resume_tokens[token]
+
+def remove_player_from_session(player_id: str, session_id: str) -> bool:
+	"""Remove a player from a session, migrating the host role if needed"""
+	session = sessions.get(session_id)
+	if not session or player_id not in session.players:
+		return False
+
+	session.players.remove(player_id)
+	if session.game_state:
+		session.game_state.pop(player_id, None)
+
+	# Clean up session if empty
+	if len(session.players) == 0:
+		logger.info(f"Removing empty session {session_id}")
+		del sessions[session_id]
+	else:
+		# If host left, assign new host
+		if player_id == session.host_id:
+			new_host = next(iter(session.players))
+			session.host_id = new_host
+			logger.info(f"New host {new_host} assigned for session {session_id}")
+		socketio.emit('player_left', {'player_id': player_id}, room=session_id)
+
+	player_sessions.pop(player_id, None)
+	suspended_players.pop(player_id, None)
+	revoke_resume_token(player_id)
+	logger.info(f"Player {player_id} left session {session_id}")
+	return True
+
+def expire_suspended_player(player_id: str, deadline: float):
+	"""Drop a suspended player once its grace window has passed"""
+	socketio.sleep(max(0.0, deadline - time.time()))
+	if suspended_players.get(player_id) != deadline:
+		return  # Resumed or already gone
+
+	logger.info(f"Resume window expired for player {player_id}")
+	session_id = player_sessions.get(player_id)
+	if not session_id or not remove_player_from_session(player_id, session_id):
+		suspended_players.pop(player_id, None)
+		player_sessions.pop(player_id, None)
+		revoke_resume_token(player_id)
+	player_sids.pop(player_id, None)
 
 @socketio.on('connect')
 def handle_connect():
@@ -108,24 +186,37 @@ def handle_connect():
 	# Initialize player state
 	if request.sid not in player_sessions:
 		player_sessions[request.sid] = None
+	sid_players[request.sid] = request.sid
+	player_sids[request.sid] = request.sid
 	return {"status": "connected", "sid": request.sid}
 
 @socketio.on('disconnect')
-def handle_disconnect():
+def handle_disconnect(reason=None):
 	"""Handle client disconnection"""
 	logger.info(f"Client disconnected: {request.sid}")
-	player_id = request.sid
-	if player_id in player_sessions:
-		session_id = player_sessions[player_id]
-		if session_id:
-			handle_leave_session({'session_id': session_id})
-		del player_sessions[player_id]
+	player_id = sid_players.pop(request.sid, request.sid)
+	if player_sids.get(player_id, request.sid) != request.sid:
+		return  # The player already resumed on a newer socket
+
+	session_id = player_sessions.get(player_id)
+	if session_id and session_id in sessions and RESUME_GRACE_PERIOD > 0:
+		# Keep the slot around so a quick reconnect is invisible to other players
+		deadline = time.time() + RESUME_GRACE_PERIOD
+		suspended_players[player_id] = deadline
+		socketio.start_background_task(expire_suspended_player, player_id, deadline)
+		logger.info(f"Player {player_id} suspended for {RESUME_GRACE_PERIOD}s")
+		return
+
+	if session_id:
+		remove_player_from_session(player_id, session_id)
+	player_sessions.pop(player_id, None)
+	player_sids.pop(player_id, None)
 
 @socketio.on('create_session')
 def handle_create_session(data):
 	"""Create a new session"""
 	try:
-		player_id = request.sid
+		player_id = current_player_id()
 		session = Session(
 			id=str(uuid.uuid4()),
 			host_id=player_id,
@@ -136,7 +227,13 @@ def handle_create_session(data):
 		player_sessions[player_id] = session.id
 		join_room(session.id)
 		logger.info(f"Created session {session.id} for player {player_id}")
-		return {'status': 'created', 'session_id': session.id}
+		return {
+			'status': 'created',
+			'session_id': session.id,
+			'player_id': player_id,
+			'resume_token': issue_resume_token(player_id),
+			'mission_state': session.missions.snapshot()
+		}
 	except Exception as e:
 		logger.error(f"Error creating session: {e}")
 		return {'status': 'error', 'error': str(e)}
@@ -146,7 +243,7 @@ def handle_join_session(data):
 	"""Join an existing session"""
 	try:
 		session_id = data.get('session_id')
-		player_id = request.sid
+		player_id = current_player_id()
 		
 		if not session_id:
 			logger.warning(f"Join session attempt without session ID from {player_id}")
@@ -164,42 +261,89 @@ def handle_join_session(data):
 		# Notify other players
 		emit('player_joined', {'player_id': player_id}, room=session_id)
 		logger.info(f"Player {player_id} joined session {session_id}")
-		return {'status': 'joined'}
+		return {
+			'status': 'joined',
+			'player_id': player_id,
+			'resume_token': issue_resume_token(player_id),
+			'mission_state': session.missions.snapshot(),
+			'players': sorted(session.players)
+		}
 	except Exception as e:
 		logger.error(f"Error joining session: {e}")
 		return {'status': 'error', 'error': str(e)}
 
+@socketio.on('resume_session')
+def handle_resume_session(data):
+	"""Reattach a reconnected socket to the slot it held before dropping"""
+	try:
+		token = data.get('resume_token')
+		player_id = resume_tokens.get(token) if token else None
+		if not player_id:
+			logger.warning(f"Invalid resume attempt from {request.sid}")
+			return {'status': 'error', 'error': 'Invalid or expired resume token'}
+
+		session_id = player_sessions.get(player_id)
+		session = sessions.get(session_id) if session_id else None
+		if not session or player_id not in session.players:
+			revoke_resume_token(player_id)
+			return {'status': 'error', 'error': 'Session no longer exists'}
+
+		# Rebind the stable player ID to the new socket
+		new_sid = request.sid
+		# Drop the placeholders handle_connect created for the new socket
+		if player_sessions.get(new_sid) is None:
+			player_sessions.pop(new_sid, None)
+		player_sids.pop(new_sid, None)
+		sid_players[new_sid] = player_id
+		player_sids[player_id] = new_sid
+		suspended_players.pop(player_id, None)
+		join_room(session_id)
+
+		# Only send the states that changed since the client's last seen update
+		last_seq = data.get('last_seq', 0)
+		deltas = [
+			state for pid, state in (session.game_state or {}).items()
+			if pid != player_id and state.get('session_seq', 0) > last_seq
+		]
+
+		response = {
+			'status': 'resumed',
+			'session_id': session_id,
+			'player_id': player_id,
+			'is_host': session.host_id == player_id,
+			'resume_token': issue_resume_token(player_id),
+			'session_seq': session.update_seq,
+			'deltas': deltas,
+			# Deltas miss joins and leaves during the gap, the client diffs the roster
+			'players': sorted(session.players)
+		}
+
+		# Mission progress missed while away, as ops if the log still covers it
+		mission_ops = session.missions.ops_since(data.get('mission_version', 0))
+		if mission_ops is None:
+			response['mission_state'] = session.missions.snapshot()
+		else:
+			response['mission_ops'] = mission_ops
+
+		logger.info(f"Player {player_id} resumed session {session_id} with {len(deltas)} deltas")
+		return response
+	except Exception as e:
+		logger.error(f"Error resuming session: {e}")
+		return {'status': 'error', 'error': str(e)}
+
 @socketio.on('leave_session')
 def handle_leave_session(data):
 	"""Leave the current session"""
 	try:
 		session_id = data.get('session_id')
-		player_id = request.sid
+		player_id = current_player_id()
 		
 		if not session_id or session_id not in sessions:
 			logger.warning(f"Invalid leave session attempt from {player_id} for session {session_id}")
 			return {'status': 'error', 'error': 'Invalid session'}
 			
-		session = sessions[session_id]
-		if player_id in session.players:
-			session.players.remove(player_id)
-			
-			# Clean up session if empty
-			if len(session.players) == 0:
-				logger.info(f"Removing empty session {session_id}")
-				del sessions[session_id]
-			else:
-				# If host left, assign new host
-				if player_id == session.host_id:
-					new_host = next(iter(session.players))
-					session.host_id = new_host
-					logger.info(f"New host {new_host} assigned for session {session_id}")
-				emit('player_left', {'player_id': player_id}, room=session_id)
-				
+		if remove_player_from_session(player_id, session_id):
 			leave_room(session_id)
-			if player_id in player_sessions:
-				del player_sessions[player_id]
-			logger.info(f"Player {player_id} left session {session_id}")
 			return {'status': 'success'}
 	except Exception as e:
 		logger.error(f"Error leaving session: {e}")
@@ -208,8 +352,15 @@ def handle_leave_session(data):
 @socketio.on('player_update')
 def handle_player_update(data):
 	"""Handle player state updates"""
+	timing = profiler.enabled
+	if timing:
+		start = time.perf_counter()
 	try:
-		player_id = request.sid
+		# Traces come from the client, anything malformed is dropped before it is stamped or kept
+		if tracer.validate(data) is not None:
+			tracer.stamp(data, HOP_SERVER_RECEIVE)
+
+		player_id = current_player_id()
 		if not player_id:
 			logger.error("No player ID found in request")
 			return {'status': 'error', 'error': 'No player ID'}
@@ -228,17 +379,91 @@ def handle_player_update(data):
 		# Update game state
 		if not session.game_state:
 			session.game_state = {}
+		session.update_seq += 1
 		session.game_state[player_id] = data
 		
 		# Broadcast update to other players in session
 		data['player_id'] = player_id
+		data['session_seq'] = session.update_seq
+		data['server_timestamp'] = time.time()
+		if timing:
+			start = profiler.lap(STAGE_SERVER_HANDLE, start)
+		trace = tracer.stamp(data, HOP_SERVER_SEND)
+		if trace is not None and tracer.enabled:
+			# Recorded before the broadcast, clients append their hops to their own copies
+			tracer.record(trace)
+			if tracer.report_due(TRACE_LOG_INTERVAL):
+				logger.info(f"Update latency by hop:\n{tracer.format_report()}")
+				if TRACE_FILE:
+					tracer.export_chrome(TRACE_FILE)
 		emit('sync_update', data, room=session_id, include_self=False)
+		if timing:
+			profiler.lap(STAGE_FANOUT, start)
+			if profiler.report_due(PROFILE_LOG_INTERVAL):
+				logger.info(f"Sync pipeline stages:\n{profiler.format_report()}")
 		return {'status': 'success'}
 		
 	except Exception as e:
 		logger.error(f"Error handling player update: {e}")
 		return {'status': 'error', 'error': str(e)}
 
+@socketio.on('mission_op')
+def handle_mission_op(data):
+	"""Order a mission operation within the session and relay it"""
+	try:
+		player_id = current_player_id()
+		session_id = player_sessions.get(player_id)
+		if not session_id or session_id not in sessions:
+			return {'status': 'error', 'error': 'Not in session'}
+
+		error = MissionState.validate(data)
+		if error:
+			logger.warning(f"Rejected mission op from {player_id}: {error}")
+			return {'status': 'error', 'error': error}
+
+		missions = sessions[session_id].missions
+		op = dict(data)
+		op['version'] = missions.version + 1
+		op['player_id'] = player_id
+		missions.apply(op)
+
+		# Sender included, so every peer applies the same order
+		emit('mission_op', op, room=session_id)
+		return {'status': 'success', 'version': op['version']}
+	except Exception as e:
+		logger.error(f"Error handling mission op: {e}")
+		return {'status': 'error', 'error': str(e)}
+
+@socketio.on('get_mission_state')
+def handle_get_mission_state(data):
+	"""Return missed mission ops, or a snapshot if the log no longer covers them"""
+	try:
+		player_id = current_player_id()
+		session_id = player_sessions.get(player_id)
+		if not session_id or session_id not in sessions:
+			return {'status': 'error', 'error': 'Not in session'}
+
+		missions = sessions[session_id].missions
+		since_version = (data or {}).get('since_version')
+		if since_version is not None:
+			ops = missions.ops_since(since_version)
+			if ops is not None:
+				return {'status': 'success', 'ops': ops}
+		return {'status': 'success', 'snapshot': missions.snapshot()}
+	except Exception as e:
+		logger.error(f"Error getting mission state: {e}")
+		return {'status': 'error', 'error': str(e)}
+
+@socketio.on('time_sync')
+def handle_time_sync(data):
+	"""Answer a clock synchronization probe"""
+	server_receive = time.time()
+	return {
+		'client_time': (data or {}).get('client_time'),
+		'server_receive': server_receive,
+		'server_send': time.time()
+	}
+
 @socketio.on('get_sessions')
 def handle_get_sessions():
 	"""Get list of available sessions"""
@@ -39,5 +39,5 @@ else:
 		version='1.0',
 		description='GTA5 Co-op Mod',
 		author='SanSync Team',
-		packages=['client', 'server', 'scripts']
+		packages=['client', 'server', 'common', 'scripts']
 	)
\ No newline at end of file